@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import itertools
+import sys
+import timeit
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from rbfoptgo import names
+from rbfoptgo.aggregation import Aggregation
+from rbfoptgo.config import InvalidParameterCombinationRenderPolicy
+
+
+def make_history(rows: int, parameters: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Makes synthetic history of evaluations
+    :param rows: number of evaluations
+    :param parameters: number of parameters
+    :param seed: random seed
+    :return: evaluations in the same layout as evaluation log
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({f"p{i}": rng.integers(0, 100, size=rows) for i in range(parameters)})
+    df[names.Iteration] = np.arange(1, rows + 1)
+    df[names.Cost] = rng.normal(size=rows)
+    df[names.InvalidParameterCombination] = rng.random(size=rows) < 0.1
+    return df
+
+
+def legacy(df: pd.DataFrame, parameter_names: List[str]):
+    """
+    Reproduces the aggregations made by Renderer before the introduction of Aggregation:
+    the frame is prepared for every parameter and groups are reduced with Python lambda.
+    """
+    for col_name in parameter_names:
+        prepared = df[df.invalid_parameter_combination == False]  # pylint: disable=singleton-comparison
+        data = pd.DataFrame({col_name: prepared[col_name], names.Cost: prepared[names.Cost]})
+        data.groupby(col_name)[names.Cost].agg(lambda x: x.min()).reset_index()
+
+    prepared = df[df.invalid_parameter_combination == False]  # pylint: disable=singleton-comparison
+    for col_name_1, col_name_2 in itertools.combinations(parameter_names, 2):
+        data = prepared[[col_name_1, col_name_2, names.Cost]]
+        data.groupby([col_name_1, col_name_2])[names.Cost].agg(lambda x: x.min()).reset_index()
+
+
+def vectorized(df: pd.DataFrame, parameter_names: List[str]):
+    """
+    Makes the same aggregations with Aggregation
+    """
+    Aggregation(df, InvalidParameterCombinationRenderPolicy.omit).prepare(parameter_names)
+
+
+def main():
+    """
+    Compares aggregation performance on the large history, e.g.: PYTHONPATH=. python benchmarks/aggregation.py 100000 6
+    :return:
+    """
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    parameters = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+
+    df = make_history(rows, parameters)
+    parameter_names = [f"p{i}" for i in range(parameters)]
+
+    for func in (legacy, vectorized):
+        elapsed = min(timeit.repeat(lambda f=func: f(df, parameter_names), number=1, repeat=3))
+        print(f"{func.__name__:>10}: {elapsed:.3f}s ({rows} rows, {parameters} parameters)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import statistics
+import subprocess
+import sys
+import time
+
+# modules that should not be loaded before the first evaluation
+PLOTTING_MODULES = ("matplotlib", "adjustText", "colorhash")
+
+PROBE = f"""
+import sys
+import rbfoptgo.main
+print(",".join(m for m in {PLOTTING_MODULES!r} if m in sys.modules))
+"""
+
+
+def main():
+    """
+    Measures the time it takes rbfopt-go-wrapper to load its modules in a fresh interpreter,
+    e.g.: PYTHONPATH=. python benchmarks/startup.py 10
+    :return:
+    """
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    elapsed = []
+    loaded = ""
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        loaded = subprocess.run([sys.executable, "-c", PROBE], check=True, capture_output=True, text=True).stdout
+        elapsed.append(time.perf_counter() - started_at)
+
+    print(f"startup: min {min(elapsed):.3f}s, median {statistics.median(elapsed):.3f}s ({repeat} runs)")
+    print(f"plotting modules loaded: {loaded.strip() or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import argparse
+import pathlib
+import tempfile
+import time
+from typing import Callable
+
+import numpy as np
+
+from rbfoptgo.client import UnixSocketClient
+from rbfoptgo.common import ParameterValue
+from rbfoptgo.config import (Bound, Config, InvalidParameterCombinationRenderPolicy, Parameter, PlotConfig,
+                             RBFOptConfig, Transport)
+from rbfoptgo.evaluator import Evaluator
+
+
+def measure(name: str, evaluations: int, action: Callable):
+    """
+    Prints the time per evaluation
+    :param name: name of the case
+    :param evaluations: number of evaluations performed by action
+    :param action: the case itself
+    :return:
+    """
+    started_at = time.perf_counter()
+    action()
+    print(f"{name}: {(time.perf_counter() - started_at) / evaluations * 1e6:.1f} us/evaluation")
+
+
+def main():
+    """
+    Measures the overhead of cost function evaluation over Unix socket as the optimizer sees it:
+    client round trips, pipelined batches, and the same through Evaluator (which also writes the log).
+    Go side is served by BenchmarkUnixSocketPythonClient:
+    go test -run=^$ -bench=BenchmarkUnixSocketPythonClient ./optimization
+    :return:
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("socket_path", type=pathlib.Path)
+    parser.add_argument("--parameters", type=int, default=2)
+    parser.add_argument("--evaluations", type=int, default=10000)
+    args = parser.parse_args()
+
+    parameters = [Parameter(Bound(0, 10), f"p{i}") for i in range(args.parameters)]
+
+    # the values don't grow along the row, so that the test server of the Go side considers them valid
+    points = np.sort(np.random.default_rng(1).integers(0, 11, size=(args.evaluations, args.parameters)))[:, ::-1]
+    batch = [[ParameterValue(p.name, int(v)) for p, v in zip(parameters, point)] for point in points]
+
+    client = UnixSocketClient("", "", args.socket_path)
+    # connection is established by the first request
+    client.estimate_cost(batch[0])
+
+    measure("client", args.evaluations, lambda: [client.estimate_cost(parameter_values) for parameter_values in batch])
+    measure("client batch", args.evaluations, lambda: list(client.estimate_cost_batch(batch)))
+
+    with tempfile.TemporaryDirectory() as root_dir:
+        policy = InvalidParameterCombinationRenderPolicy.omit
+        config = Config(
+            root_dir=pathlib.Path(root_dir),
+            endpoint="",
+            rbfopt=RBFOptConfig(parameters, args.evaluations, args.evaluations, "lhd_maximin", 10, 1, 1),
+            plot=PlotConfig(policy, policy),
+            evaluation_cache=False,
+            transport=Transport.unix_socket,
+            checkpoint_interval=0,
+            resume=False,
+            log_sync_interval=0,
+            session_id="",
+            profile=False,
+        )
+        evaluator = Evaluator(config, client, config.rbfopt.var_names, config.root_dir)
+        raw_values = points.astype(np.float64)
+
+        measure("evaluator", args.evaluations, lambda: [evaluator.estimate_cost(row) for row in raw_values])
+        measure("evaluator batch", args.evaluations, lambda: evaluator.estimate_cost_batch(raw_values))
+
+
+if __name__ == '__main__':
+    main()
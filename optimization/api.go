@@ -7,22 +7,24 @@
 package optimization
 
 import (
+	"time"
+
 	"github.com/pkg/errors"
 )
 
 type estimateCostRequest struct {
 	ParameterValues []*ParameterValue `json:"parameter_values"`
+	Fast            bool              `json:"-"` // evaluate FastCostFunction instead of CostFunction
 }
 
-func (r *estimateCostRequest) applyValues(config *RBFOptConfig) error {
+func (r *estimateCostRequest) applyValues(config *RBFOptConfig, slot *Slot) error {
 	// apply all values to config first
 	for _, pv := range r.ParameterValues {
-		parameterDesc, err := config.getParameterByName(pv.Name)
-		if err != nil {
+		if _, err := config.getParameterByName(pv.Name); err != nil {
 			return errors.Wrapf(err, "get parameter by name: %s", pv.Name)
 		}
 
-		parameterDesc.ConfigModifier(pv.Value)
+		slot.ConfigModifiers[pv.Name](pv.Value)
 	}
 
 	return nil
@@ -31,6 +33,21 @@ func (r *estimateCostRequest) applyValues(config *RBFOptConfig) error {
 type estimateCostResponse struct {
 	Cost                        float64 `json:"cost"`
 	InvalidParameterCombination bool    `json:"invalid_parameter_combination"`
+	TimedOut                    bool    `json:"timed_out"`            // penalized, but not known to be invalid
+	QueueTime                   float64 `json:"queue_time"`           // seconds spent waiting for a free slot
+	ConfigModifierTime          float64 `json:"config_modifier_time"` // seconds spent applying parameter values
+	CostFunctionTime            float64 `json:"cost_function_time"`   // seconds spent in (Fast)CostFunction
+}
+
+type estimateCostBatchRequest struct {
+	Batch []*estimateCostRequest `json:"batch"`
+}
+
+// estimateCostBatchItem is streamed to client as soon as the evaluation of a particular point is finished
+type estimateCostBatchItem struct {
+	*estimateCostResponse
+	Index int    `json:"index"`
+	Error string `json:"error,omitempty"`
 }
 
 type registerReportRequest struct {
@@ -39,3 +56,49 @@ type registerReportRequest struct {
 
 type registerReportResponse struct {
 }
+
+// Remote evaluators protocol (see RunEvaluator)
+
+type registerEvaluatorRequest struct {
+	Pool string `json:"pool"`
+}
+
+type registerEvaluatorResponse struct {
+	EvaluatorID string `json:"evaluator_id"`
+}
+
+// pollTaskRequest waits for a point to evaluate; the response is empty (204) if there is none for a while
+type pollTaskRequest struct {
+	EvaluatorID string `json:"evaluator_id"`
+}
+
+type pollTaskResponse struct {
+	AssignmentID      string            `json:"assignment_id"` // identifies this particular attempt to evaluate the point
+	ParameterValues   []*ParameterValue `json:"parameter_values"`
+	HeartbeatInterval float64           `json:"heartbeat_interval"` // seconds
+}
+
+// heartbeatRequest is sent periodically while the point is being evaluated
+type heartbeatRequest struct {
+	EvaluatorID  string `json:"evaluator_id"`
+	AssignmentID string `json:"assignment_id"`
+}
+
+type heartbeatResponse struct {
+	Cancelled bool `json:"cancelled"` // the result is not needed anymore
+}
+
+type taskResultRequest struct {
+	EvaluatorID                 string  `json:"evaluator_id"`
+	AssignmentID                string  `json:"assignment_id"`
+	Cost                        float64 `json:"cost"`
+	InvalidParameterCombination bool    `json:"invalid_parameter_combination"`
+	Error                       string  `json:"error,omitempty"`
+}
+
+type evaluatorStats struct {
+	ID     string    `json:"id"`
+	Pool   string    `json:"pool"`
+	Busy   bool      `json:"busy"`
+	SeenAt time.Time `json:"seen_at"`
+}
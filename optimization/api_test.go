@@ -30,5 +30,5 @@ func TestEstimateCostRequest(t *testing.T) {
 		},
 	}
 
-	require.Error(t, ecr.applyValues(cfg))
+	require.Error(t, ecr.applyValues(cfg, <-newSlotPool(cfg, nil).slots))
 }
@@ -0,0 +1,240 @@
+//go:build testing && (linux || darwin)
+
+/*
+ * Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+ * Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+ * License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+ */
+
+package optimization
+
+import (
+	"context"
+	"fmt"
+	"math"
+	"math/rand"
+	"runtime"
+	"syscall"
+	"testing"
+	"time"
+
+	"github.com/pkg/errors"
+)
+
+// syntheticProblem is a well-known cost function used to measure the overhead of the optimizer
+type syntheticProblem struct {
+	name string
+	// bound of every parameter
+	bound *Bound
+	// makeCostFunction returns cost function of the given dimension reading parameter values from the slice
+	makeCostFunction func(dimension int, values []int) CostFunction
+}
+
+// benchmarkSeed is used for everything random in synthetic problems and optimizer,
+// so that results are comparable over time
+const benchmarkSeed = 42
+
+// scaled maps integer parameter value to the continuous domain of the classic functions
+func scaled(value int) float64 {
+	const scale = 10
+
+	return float64(value) / scale
+}
+
+var syntheticProblems = []*syntheticProblem{
+	{
+		name:  "rosenbrock",
+		bound: &Bound{Left: -20, Right: 20},
+		makeCostFunction: func(dimension int, values []int) CostFunction {
+			return func(context.Context) (Cost, error) {
+				var result float64
+
+				for i := 0; i < dimension-1; i++ {
+					x, y := scaled(values[i]), scaled(values[i+1])
+					result += 100*(y-x*x)*(y-x*x) + (1-x)*(1-x)
+				}
+
+				return result, nil
+			}
+		},
+	},
+	{
+		name:  "rastrigin",
+		bound: &Bound{Left: -51, Right: 51},
+		makeCostFunction: func(dimension int, values []int) CostFunction {
+			return func(context.Context) (Cost, error) {
+				result := 10 * float64(dimension)
+
+				for _, value := range values {
+					x := scaled(value)
+					result += x*x - 10*math.Cos(2*math.Pi*x)
+				}
+
+				return result, nil
+			}
+		},
+	},
+	{
+		// parameters are the numbers of items of every kind, overweight knapsack is an invalid combination
+		name:  "knapsack",
+		bound: &Bound{Left: 0, Right: 10},
+		makeCostFunction: func(dimension int, values []int) CostFunction {
+			const maxItemValue, maxItemWeight = 100, 50
+
+			//nolint:gosec // reproducible pseudo-random numbers are needed here
+			rng := rand.New(rand.NewSource(benchmarkSeed))
+
+			itemValues, itemWeights := make([]int, dimension), make([]int, dimension)
+			capacity := 0
+
+			for i := range itemValues {
+				itemValues[i] = 1 + rng.Intn(maxItemValue)
+				itemWeights[i] = 1 + rng.Intn(maxItemWeight)
+				capacity += itemWeights[i] * 3
+			}
+
+			return func(context.Context) (Cost, error) {
+				value, weight := 0, 0
+
+				for i, count := range values {
+					value += itemValues[i] * count
+					weight += itemWeights[i] * count
+				}
+
+				if weight > capacity {
+					return 0, ErrInvalidParameterCombination
+				}
+
+				return Cost(-value), nil
+			}
+		},
+	},
+}
+
+func (p *syntheticProblem) config(rootDir string, dimension int, maxEvaluations uint) *Config {
+	values := make([]int, dimension)
+	parameters := make([]*ParameterDescription, dimension)
+
+	for i := range parameters {
+		i := i
+		parameters[i] = &ParameterDescription{
+			Name:           fmt.Sprintf("x%d", i),
+			Bound:          &Bound{Left: p.bound.Left, Right: p.bound.Right},
+			ConfigModifier: func(value int) { values[i] = value },
+		}
+	}
+
+	return &Config{
+		RootDir: rootDir,
+		RBFOpt: &RBFOptConfig{
+			CostFunction:                    p.makeCostFunction(dimension, values),
+			Parameters:                      parameters,
+			MaxEvaluations:                  maxEvaluations,
+			MaxIterations:                   maxEvaluations,
+			InvalidParameterCombinationCost: 1e9,
+			Seed:                            benchmarkSeed,
+		},
+		Plot: &PlotConfig{
+			ScatterPlotPolicy:   Omit,
+			HeatmapRenderPolicy: Omit,
+			// rendering is measured separately
+			RenderMode: RenderSkip,
+		},
+	}
+}
+
+// childrenPeakRSS returns the largest resident set size among the optimizer processes finished so far (in megabytes)
+func childrenPeakRSS() (float64, error) {
+	var usage syscall.Rusage
+	if err := syscall.Getrusage(syscall.RUSAGE_CHILDREN, &usage); err != nil {
+		return 0, errors.Wrap(err, "getrusage")
+	}
+
+	// Maxrss is in kilobytes on Linux, and in bytes on macOS
+	peak := float64(usage.Maxrss) / (1 << 10)
+	if runtime.GOOS == "darwin" {
+		peak /= 1 << 10
+	}
+
+	return peak, nil
+}
+
+func renderPlots(rootDir string) (time.Duration, error) {
+	startedAt := time.Now()
+
+	if output, err := makeScriptCmd("rbfoptgo/render.py", rootDir).CombinedOutput(); err != nil {
+		return 0, errors.Wrapf(err, "render plots: %s", output)
+	}
+
+	return time.Since(startedAt), nil
+}
+
+// BenchmarkOptimize runs the whole optimization pipeline (Go server, Python optimizer and plot rendering)
+// on synthetic problems of growing size. Every iteration is a complete session, so it's worth limiting
+// the number of iterations, and comparing results with benchstat:
+//
+//	go test -tags=testing -run=^$ -bench=BenchmarkOptimize -benchtime=3x ./optimization
+//
+// Reported metrics: evaluations per second, Go server and transport overhead per evaluation
+// (everything but CostFunction on the Go side and optimizer steps on the Python side),
+// the peak RSS of optimizer processes (it never decreases, so run a single benchmark to measure it precisely),
+// and time to render plots.
+func BenchmarkOptimize(b *testing.B) {
+	dimensions := []int{2, 4, 8}
+	maxEvaluations := []uint{25, 50, 100}
+
+	for _, problem := range syntheticProblems {
+		for _, dimension := range dimensions {
+			for _, evaluations := range maxEvaluations {
+				name := fmt.Sprintf("%s/dimension=%d/evaluations=%d", problem.name, dimension, evaluations)
+
+				b.Run(name, func(b *testing.B) {
+					benchmarkOptimize(b, problem, dimension, evaluations)
+				})
+			}
+		}
+	}
+}
+
+func benchmarkOptimize(b *testing.B, problem *syntheticProblem, dimension int, maxEvaluations uint) {
+	var (
+		elapsed, rendering time.Duration
+		evaluations        int
+		wrapperOverhead    float64
+	)
+
+	for i := 0; i < b.N; i++ {
+		config := problem.config(b.TempDir(), dimension, maxEvaluations)
+
+		startedAt := time.Now()
+
+		report, err := Optimize(context.Background(), config)
+		if err != nil {
+			b.Fatal(err)
+		}
+
+		elapsed += time.Since(startedAt)
+		evaluations += report.Evaluations
+
+		if report.Timings != nil {
+			wrapperOverhead += report.Timings.Transport + report.Timings.Queue + report.Timings.ConfigModifier
+		}
+
+		duration, err := renderPlots(config.RootDir)
+		if err != nil {
+			b.Fatal(err)
+		}
+
+		rendering += duration
+	}
+
+	peakRSS, err := childrenPeakRSS()
+	if err != nil {
+		b.Fatal(err)
+	}
+
+	b.ReportMetric(float64(evaluations)/elapsed.Seconds(), "evaluations/s")
+	b.ReportMetric(1e3*wrapperOverhead/float64(evaluations), "wrapper-ms/evaluation")
+	b.ReportMetric(peakRSS, "peak-rss-MB")
+	b.ReportMetric(rendering.Seconds()/float64(b.N), "render-s/op")
+}
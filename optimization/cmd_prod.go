@@ -12,10 +12,17 @@ import (
 	"os/exec"
 )
 
-const rbfOptGoExecutable = "rbfopt-go-wrapper"
+const (
+	rbfOptGoExecutable       = "rbfopt-go-wrapper"
+	rbfOptGoWorkerExecutable = "rbfopt-go-worker"
+)
 
 func makeCmd(rootDir string) *exec.Cmd {
 	cmd := exec.Command(rbfOptGoExecutable, rootDir)
 
 	return cmd
 }
+
+func makeWorkerCmd() *exec.Cmd {
+	return exec.Command(rbfOptGoWorkerExecutable)
+}
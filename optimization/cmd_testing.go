@@ -17,14 +17,22 @@ import (
 )
 
 func makeCmd(rootDir string) *exec.Cmd {
+	return makeScriptCmd("rbfoptgo/main.py", rootDir)
+}
+
+func makeWorkerCmd() *exec.Cmd {
+	return makeScriptCmd("rbfoptgo/worker.py")
+}
+
+func makeScriptCmd(script string, args ...string) *exec.Cmd {
 	projectPath := filepath.Join(
 		build.Default.GOPATH,
 		"src/github.com/newcloudtechnologies/rbfopt-go",
 	)
 
-	rbfOptGoExecutable := filepath.Join(projectPath, "rbfoptgo/main.py")
+	rbfOptGoExecutable := filepath.Join(projectPath, script)
 
-	cmd := exec.Command(rbfOptGoExecutable, rootDir)
+	cmd := exec.Command(rbfOptGoExecutable, args...)
 	cmd.Env = os.Environ()
 	cmd.Env = append(cmd.Env, fmt.Sprintf("PYTHONPATH=%s", projectPath))
 
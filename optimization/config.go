@@ -8,8 +8,11 @@ package optimization
 
 import (
 	"context"
+	"encoding/json"
 	"fmt"
 	"math"
+	"path/filepath"
+	"time"
 
 	"github.com/pkg/errors"
 )
@@ -69,11 +72,106 @@ type RBFOptConfig struct {
 	MaxEvaluations uint                    `json:"max_evaluations"` // Evaluations limit
 	MaxIterations  uint                    `json:"max_iterations"`  // Iterations limit
 	InitStrategy   InitStrategy            `json:"init_strategy"`   // Strategy to select initial points
+	// FastCostFunction - cheap but less accurate version of CostFunction (optional), e.g. a short load test
+	// instead of a long one. RBFOpt uses it to screen candidate points, and evaluates CostFunction
+	// for the promising ones only. The initial sample is evaluated with it as well (one by one, rather than
+	// in a single batch). If Slots are used, it's taken from the slots instead.
+	FastCostFunction CostFunction `json:"-"`
+	// FastCostFunctionError - relative error of FastCostFunction: the value of CostFunction is expected
+	// to be within [cost - |cost| * error, cost + |cost| * error], where cost is the value of FastCostFunction
+	FastCostFunctionError float64 `json:"fast_cost_function_error"`
+	// MaxFastEvaluations - FastCostFunction evaluations limit (RBFOpt default is used if 0)
+	MaxFastEvaluations uint `json:"max_fast_evaluations"`
+	// Constraints - linear inequalities over parameters that any valid combination satisfies. Optimizer skips
+	// the points violating them, as well as the points already known as invalid parameter combinations.
+	Constraints []*Constraint `json:"constraints"`
+	// Screening - if set, optimizer ranks parameters by their influence on CostFunction before the main
+	// optimization, and freezes the insensitive ones (see ScreeningConfig and Report.Sensitivities).
+	Screening *ScreeningConfig `json:"screening,omitempty"`
+	// TimeLimit - wall-clock budget of the session (no limit if 0). It's checked after every evaluation
+	// and between them, so the evaluation in progress is not interrupted.
+	TimeLimit time.Duration `json:"-"`
+	// TargetCost - finish optimization as soon as CostFunction value is less or equal to it (if set)
+	TargetCost *Cost `json:"target_cost,omitempty"`
+	// StagnationEvaluations - finish optimization if the best cost hasn't improved
+	// within this number of evaluations (no limit if 0)
+	StagnationEvaluations uint `json:"stagnation_evaluations"`
+	// StagnationTolerance - the minimal relative improvement of the best cost that is not a stagnation
+	// (e.g. 0.01 means 1%)
+	StagnationTolerance float64 `json:"stagnation_tolerance"`
+	// EvaluationTimeout - deadline of a single CostFunction call (no deadline if 0). The context passed
+	// to CostFunction is cancelled when it's exceeded, and the point is reported to optimizer
+	// as an invalid parameter combination, so the optimization goes on.
+	EvaluationTimeout time.Duration `json:"-"`
+	// Seed - random seed of RBFOpt. Sessions with the same seed and deterministic CostFunction
+	// evaluate the same points in the same order, but only if the points are evaluated one by one
+	// (no Slots or Evaluators, so num_cpus is 1): parallel evaluations complete in arbitrary order,
+	// and so RBFOpt proposes different points. If 0, the seed is derived from the current time
+	// (the one actually used is available in Report).
+	Seed uint32 `json:"seed"`
 	// RBFOpt: reason: https://github.com/coin-or/rbfopt/issues/28
 	InvalidParameterCombinationCost Cost `json:"invalid_parameter_combination_cost"`
+	// Slots - isolated instances of your service that evaluate CostFunction concurrently.
+	// If set, CostFunction and ConfigModifier of every parameter are not used (and may be omitted),
+	// and optimizer will perform as many evaluations simultaneously as there are slots.
+	Slots []*Slot `json:"-"`
+	// Evaluators - if set, CostFunction is evaluated by remote evaluators (see RunEvaluator)
+	// instead of this process. CostFunction, ConfigModifier of every parameter and Slots are not used then.
+	Evaluators *EvaluatorPoolConfig `json:"-"`
 }
 
-//nolint:revive // too simple function to split
+// MarshalJSON renders RBFOptConfig to JSON.
+func (c *RBFOptConfig) MarshalJSON() ([]byte, error) {
+	type plain RBFOptConfig
+
+	data, err := json.Marshal(&struct {
+		*plain
+		NumCPUs           int     `json:"num_cpus"`
+		TimeLimit         float64 `json:"time_limit"`
+		EvaluationTimeout float64 `json:"evaluation_timeout"`
+		FastCostFunction  bool    `json:"fast_cost_function"`
+	}{
+		plain:             (*plain)(c),
+		NumCPUs:           c.parallelism(),
+		TimeLimit:         c.TimeLimit.Seconds(),
+		EvaluationTimeout: c.EvaluationTimeout.Seconds(),
+		FastCostFunction:  c.hasFastCostFunction(),
+	})
+	if err != nil {
+		return nil, errors.Wrap(err, "marshal json")
+	}
+
+	return data, nil
+}
+
+// parallelism returns the number of evaluations that can be performed simultaneously
+func (c *RBFOptConfig) parallelism() int {
+	if c.Evaluators != nil {
+		return c.Evaluators.Size
+	}
+
+	if len(c.Slots) == 0 {
+		return 1
+	}
+
+	return len(c.Slots)
+}
+
+// hasFastCostFunction checks if the cheap version of CostFunction is provided
+func (c *RBFOptConfig) hasFastCostFunction() bool {
+	// remote evaluators provide CostFunction only
+	if c.Evaluators != nil {
+		return false
+	}
+
+	if len(c.Slots) == 0 {
+		return c.FastCostFunction != nil
+	}
+
+	return c.Slots[0].FastCostFunction != nil
+}
+
+//nolint:revive,gocyclo,cyclop // too simple function to split
 func (c *RBFOptConfig) validate() error {
 	if c == nil {
 		return errors.New("empty")
@@ -83,14 +181,63 @@ func (c *RBFOptConfig) validate() error {
 		return errors.New("field Parameters is empty")
 	}
 
-	if c.CostFunction == nil {
+	// the functions are provided by slots or remote evaluators
+	external := len(c.Slots) > 0 || c.Evaluators != nil
+
+	if !external && c.CostFunction == nil {
 		return errors.New("field CostFunction is empty")
 	}
 
+	if c.Evaluators != nil {
+		if len(c.Slots) > 0 {
+			return errors.New("fields Slots and Evaluators are mutually exclusive")
+		}
+
+		if err := c.Evaluators.validate(); err != nil {
+			return errors.Wrap(err, "validate evaluators")
+		}
+	}
+
 	for _, param := range c.Parameters {
-		if err := param.validate(); err != nil {
+		validate := param.validate
+		if external {
+			validate = param.validateName
+		}
+
+		if err := validate(); err != nil {
 			return errors.Wrapf(err, "validate parameter '%s'", param.Name)
 		}
+
+		if err := param.validateScale(); err != nil {
+			return errors.Wrapf(err, "validate scale of parameter '%s'", param.Name)
+		}
+	}
+
+	for i, slot := range c.Slots {
+		if err := slot.validate(c.Parameters); err != nil {
+			return errors.Wrapf(err, "validate slot %d", i)
+		}
+
+		// any slot may be asked for the fast evaluation
+		if (slot.FastCostFunction != nil) != c.hasFastCostFunction() {
+			return errors.Errorf("field FastCostFunction must be set either in all slots or in none (slot %d)", i)
+		}
+	}
+
+	for i, constraint := range c.Constraints {
+		if err := constraint.validate(c.Parameters); err != nil {
+			return errors.Wrapf(err, "validate constraint %d", i)
+		}
+	}
+
+	if c.Screening != nil {
+		if err := c.Screening.validate(len(c.Parameters), c.MaxEvaluations); err != nil {
+			return errors.Wrap(err, "validate screening")
+		}
+	}
+
+	if c.FastCostFunctionError < 0 {
+		return errors.New("field FastCostFunctionError is negative")
 	}
 
 	if c.MaxEvaluations == 0 {
@@ -105,6 +252,18 @@ func (c *RBFOptConfig) validate() error {
 		return ErrTooHighInvalidParameterCombinationCost
 	}
 
+	if c.TimeLimit < 0 {
+		return errors.New("field TimeLimit is negative")
+	}
+
+	if c.EvaluationTimeout < 0 {
+		return errors.New("field EvaluationTimeout is negative")
+	}
+
+	if c.StagnationTolerance < 0 {
+		return errors.New("field StagnationTolerance is negative")
+	}
+
 	return nil
 }
 
@@ -146,10 +305,46 @@ func (p InvalidParameterCombinationRenderPolicy) MarshalJSON() ([]byte, error) {
 	return nil, errors.Wrapf(ErrUnknownInvalidParameterCombinationRenderPolicy, "%v", p)
 }
 
+// RenderMode determines when plots are rendered
+type RenderMode int8
+
+const (
+	// RenderInline - plots are rendered by optimizer before Optimize returns (the default)
+	RenderInline RenderMode = iota
+	// RenderSkip - plots are not rendered at all
+	RenderSkip
+	// RenderBackground - plots are rendered by the detached process that keeps running after Optimize returns
+	RenderBackground
+)
+
+// ErrUnknownRenderMode notifies about wrong RenderMode value
+var ErrUnknownRenderMode = errors.New("unknown RenderMode")
+
+// MarshalJSON renders RenderMode to JSON
+func (m RenderMode) MarshalJSON() ([]byte, error) {
+	switch m {
+	case RenderInline:
+		return []byte("\"inline\""), nil
+	case RenderSkip:
+		return []byte("\"skip\""), nil
+	case RenderBackground:
+		return []byte("\"background\""), nil
+	}
+
+	return nil, errors.Wrapf(ErrUnknownRenderMode, "%v", m)
+}
+
 // PlotConfig - plot renderer configuration
 type PlotConfig struct {
 	ScatterPlotPolicy   InvalidParameterCombinationRenderPolicy `json:"scatter_plot_policy"`
 	HeatmapRenderPolicy InvalidParameterCombinationRenderPolicy `json:"heatmap_render_policy"`
+	// Workers - number of processes rendering plots simultaneously (plots are rendered one by one if not set)
+	Workers uint `json:"workers"`
+	// InterpolationCache - keep heatmap grids interpolated from evaluations in RootDir,
+	// so that re-rendering plots for the same evaluations doesn't repeat the interpolation
+	InterpolationCache bool `json:"interpolation_cache"`
+	// RenderMode - when to render plots
+	RenderMode RenderMode `json:"render_mode"`
 }
 
 func (c *PlotConfig) String() string {
@@ -169,6 +364,100 @@ func (c *PlotConfig) validate() error {
 		return errors.New("field HeatmapRenderErrIPCPolicy is empty")
 	}
 
+	if c.RenderMode < RenderInline || c.RenderMode > RenderBackground {
+		return errors.Wrapf(ErrUnknownRenderMode, "%v", c.RenderMode)
+	}
+
+	return nil
+}
+
+// EvaluatorPoolConfig describes remote evaluators of CostFunction. Every evaluator owns an instance
+// of your service (e.g. a load test environment) and runs RunEvaluator, possibly on another host.
+// Points are dispatched to idle evaluators; the point is evaluated again by another one
+// if its evaluator stops sending heartbeats.
+type EvaluatorPoolConfig struct {
+	// Name - evaluators join the pool by name. The pool is shared by the sessions using the same Endpoint.
+	Name string
+	// Size - the number of points evaluated simultaneously (usually the number of evaluators)
+	Size int
+	// HeartbeatTimeout - evaluator is considered lost if it's silent for this time (30s if 0)
+	HeartbeatTimeout time.Duration
+	// MaxRetries - the number of attempts to evaluate a point again after the loss of evaluator (3 if 0)
+	MaxRetries int
+}
+
+const (
+	defaultHeartbeatTimeout = 30 * time.Second
+	defaultMaxRetries       = 3
+)
+
+func (c *EvaluatorPoolConfig) validate() error {
+	if c.Name == "" {
+		return errors.New("field Name is empty")
+	}
+
+	if c.Size <= 0 {
+		return errors.New("field Size must be positive")
+	}
+
+	if c.HeartbeatTimeout < 0 {
+		return errors.New("field HeartbeatTimeout is negative")
+	}
+
+	if c.MaxRetries < 0 {
+		return errors.New("field MaxRetries is negative")
+	}
+
+	return nil
+}
+
+func (c *EvaluatorPoolConfig) heartbeatTimeout() time.Duration {
+	if c.HeartbeatTimeout == 0 {
+		return defaultHeartbeatTimeout
+	}
+
+	return c.HeartbeatTimeout
+}
+
+func (c *EvaluatorPoolConfig) maxRetries() int {
+	if c.MaxRetries == 0 {
+		return defaultMaxRetries
+	}
+
+	return c.MaxRetries
+}
+
+// ScreeningConfig describes the screening phase performed before the main optimization (Morris method).
+// Every trajectory starts from a random point of the grid with Levels values of every parameter,
+// and changes parameters one at a time, so screening takes Trajectories * (len(Parameters) + 1) evaluations
+// of MaxEvaluations. The parameters with mean absolute effect on CostFunction less than Threshold
+// of the largest one are frozen at their values in the best evaluated point.
+type ScreeningConfig struct {
+	Trajectories uint    `json:"trajectories,omitempty"` // 4 if 0
+	Levels       uint    `json:"levels,omitempty"`       // 4 if 0
+	Threshold    float64 `json:"threshold,omitempty"`    // 0.1 if 0
+}
+
+const defaultScreeningTrajectories = 4
+
+func (c *ScreeningConfig) validate(dimension int, maxEvaluations uint) error {
+	if c.Levels == 1 {
+		return errors.New("field Levels must be at least 2")
+	}
+
+	if c.Threshold < 0 || c.Threshold >= 1 {
+		return errors.New("field Threshold must be within [0; 1)")
+	}
+
+	trajectories := c.Trajectories
+	if trajectories == 0 {
+		trajectories = defaultScreeningTrajectories
+	}
+
+	if evaluations := trajectories * uint(dimension+1); evaluations >= maxEvaluations {
+		return errors.Errorf("screening takes %d evaluations, it exceeds MaxEvaluations", evaluations)
+	}
+
 	return nil
 }
 
@@ -184,6 +473,40 @@ type Config struct {
 	RootDir string `json:"root_dir"`
 	// Endpoint for the server that will work as a middleware
 	Endpoint string `json:"endpoint"`
+	// Transport used by optimizer to request CostFunction values
+	Transport Transport `json:"transport"`
+	// EvaluationCache - memoize CostFunction values in RootDir, so that the same combination of parameters
+	// is never evaluated twice, neither within a session, nor in the later sessions
+	// sharing the same RootDir and parameter bounds.
+	EvaluationCache bool `json:"evaluation_cache"`
+	// CheckpointInterval - number of RBFOpt iterations between the checkpoints of the session state
+	// saved in RootDir (1 by default).
+	CheckpointInterval uint `json:"checkpoint_interval"`
+	// Resume - continue the session interrupted by a crash of optimizer from the latest checkpoint in RootDir
+	// instead of starting a new one. Evaluations made by the interrupted session are not repeated.
+	Resume bool `json:"resume"`
+	// LogSyncInterval - number of evaluations between fsync calls on the evaluation log (evaluations.csv in RootDir).
+	// Every evaluation is appended to the log as soon as it's finished; if LogSyncInterval is 0,
+	// the log is fsync'ed only on checkpoints.
+	LogSyncInterval uint `json:"log_sync_interval"`
+	// Profile - run optimizer under Python profiler. Optimization and rendering are profiled separately,
+	// the statistics are saved to RootDir: optimization.prof and render.prof (cProfile format),
+	// optimization.txt and render.txt (summaries of the heaviest calls). The statistics of PlotConfig.Workers
+	// are merged into render.prof, so the time spent by concurrent workers is summed up there.
+	Profile bool `json:"profile"`
+	// WarmStartRootDirs - RootDirs of the previous sessions optimizing the same parameters (optional),
+	// e.g. the ones made for the previous release of the service. Their optima and best evaluations
+	// replace up to a half of the random points of the initial sample (the rest keeps covering the whole space),
+	// and are evaluated again, since the costs may have changed.
+	WarmStartRootDirs []string `json:"warm_start_root_dirs"`
+	// WarmStartReuseCosts - trust the costs recorded by the previous sessions: the points taken from them
+	// are passed to optimizer with these costs and are not evaluated again, so the initial sample takes
+	// fewer evaluations. Use it if the environment hasn't changed since the previous sessions. The points moved
+	// to the values of the parameters fixed in the current session (e.g. by screening) are evaluated anyway.
+	WarmStartReuseCosts bool `json:"warm_start_reuse_costs"`
+	// Worker - long-lived optimizer process shared by Optimize calls (optional).
+	// If not set, every Optimize call starts optimizer from scratch.
+	Worker *Worker `json:"-"`
 }
 
 func (c *Config) validate() error {
@@ -199,6 +522,18 @@ func (c *Config) validate() error {
 		c.Endpoint = "0.0.0.0:8080"
 	}
 
+	if c.CheckpointInterval == 0 {
+		c.CheckpointInterval = 1
+	}
+
+	if c.Transport != HTTP && c.Transport != UnixSocket {
+		return errors.Wrapf(ErrUnknownTransport, "%v", c.Transport)
+	}
+
+	if err := c.validateWarmStart(); err != nil {
+		return errors.Wrap(err, "validate warm start")
+	}
+
 	if err := c.RBFOpt.validate(); err != nil {
 		return errors.Wrap(err, "validate RBFOpt")
 	}
@@ -209,3 +544,18 @@ func (c *Config) validate() error {
 
 	return nil
 }
+
+func (c *Config) validateWarmStart() error {
+	for _, rootDir := range c.WarmStartRootDirs {
+		if rootDir == "" {
+			return errors.New("empty root dir")
+		}
+
+		// the log of the current session is overwritten before the warm start
+		if filepath.Clean(rootDir) == filepath.Clean(c.RootDir) {
+			return errors.New("the session can't warm start from its own RootDir, use Resume instead")
+		}
+	}
+
+	return nil
+}
@@ -10,6 +10,7 @@ import (
 	"context"
 	"math"
 	"testing"
+	"time"
 
 	"github.com/stretchr/testify/require"
 )
@@ -123,6 +124,119 @@ func TestRBFOptConfig(t *testing.T) {
 
 		require.Error(t, c.validate())
 	})
+
+	t.Run("invalid time limit", func(t *testing.T) {
+		c := &RBFOptConfig{
+			Parameters: []*ParameterDescription{
+				{
+					Bound: &Bound{
+						Left:  1,
+						Right: 2,
+					},
+					ConfigModifier: func(i int) {},
+					Name:           "crab",
+				},
+			},
+			CostFunction: func(ctx context.Context) (Cost, error) {
+				return 0, nil
+			},
+			MaxEvaluations:                  100,
+			MaxIterations:                   100,
+			InvalidParameterCombinationCost: 100,
+			TimeLimit:                       -time.Second,
+		}
+
+		require.Error(t, c.validate())
+	})
+
+	t.Run("invalid evaluation timeout", func(t *testing.T) {
+		c := &RBFOptConfig{
+			Parameters: []*ParameterDescription{
+				{
+					Bound: &Bound{
+						Left:  1,
+						Right: 2,
+					},
+					ConfigModifier: func(i int) {},
+					Name:           "crab",
+				},
+			},
+			CostFunction: func(ctx context.Context) (Cost, error) {
+				return 0, nil
+			},
+			MaxEvaluations:                  100,
+			MaxIterations:                   100,
+			InvalidParameterCombinationCost: 100,
+			EvaluationTimeout:               -time.Second,
+		}
+
+		require.Error(t, c.validate())
+	})
+
+	t.Run("screening exceeds evaluations limit", func(t *testing.T) {
+		c := &RBFOptConfig{
+			Parameters: []*ParameterDescription{
+				{
+					Bound: &Bound{
+						Left:  1,
+						Right: 2,
+					},
+					ConfigModifier: func(i int) {},
+					Name:           "crab",
+				},
+			},
+			CostFunction: func(ctx context.Context) (Cost, error) {
+				return 0, nil
+			},
+			MaxEvaluations:                  8,
+			MaxIterations:                   100,
+			InvalidParameterCombinationCost: 100,
+			Screening:                       &ScreeningConfig{},
+		}
+
+		require.Error(t, c.validate())
+
+		c.MaxEvaluations = 9
+		require.NoError(t, c.validate())
+
+		c.Screening.Threshold = 1
+		require.Error(t, c.validate())
+	})
+
+	t.Run("fast cost function in some slots only", func(t *testing.T) {
+		costFunction := func(ctx context.Context) (Cost, error) {
+			return 0, nil
+		}
+
+		newSlot := func(fastCostFunction CostFunction) *Slot {
+			return &Slot{
+				ConfigModifiers:  map[string]ConfigModifier{"crab": func(i int) {}},
+				CostFunction:     costFunction,
+				FastCostFunction: fastCostFunction,
+			}
+		}
+
+		c := &RBFOptConfig{
+			Parameters: []*ParameterDescription{
+				{
+					Bound: &Bound{
+						Left:  1,
+						Right: 2,
+					},
+					Name: "crab",
+				},
+			},
+			Slots:                           []*Slot{newSlot(costFunction), newSlot(nil)},
+			MaxEvaluations:                  100,
+			MaxIterations:                   100,
+			InvalidParameterCombinationCost: 100,
+		}
+
+		require.Error(t, c.validate())
+
+		c.Slots[1].FastCostFunction = costFunction
+		require.NoError(t, c.validate())
+	})
 }
 
 func TestPlotConfig(t *testing.T) {
@@ -139,6 +253,15 @@ func TestPlotConfig(t *testing.T) {
 		}
 		require.Error(t, c.validate())
 	})
+
+	t.Run("invalid render mode", func(t *testing.T) {
+		c := &PlotConfig{
+			ScatterPlotPolicy:   Omit,
+			HeatmapRenderPolicy: Omit,
+			RenderMode:          RenderBackground + 1,
+		}
+		require.Error(t, c.validate())
+	})
 }
 
 func TestConfig(t *testing.T) {
@@ -154,6 +277,18 @@ func TestConfig(t *testing.T) {
 		require.Error(t, c.validate())
 	})
 
+	t.Run("warm start from own root dir", func(t *testing.T) {
+		c := &Config{
+			RootDir:           "/tmp/crab",
+			Endpoint:          "localhost:8080",
+			WarmStartRootDirs: []string{"/tmp/lobster", "/tmp/crab/"},
+		}
+		require.Error(t, c.validateWarmStart())
+
+		c.WarmStartRootDirs = c.WarmStartRootDirs[:1]
+		require.NoError(t, c.validateWarmStart())
+	})
+
 	t.Run("invalid RBFOpt", func(t *testing.T) {
 		c := &Config{
 			RootDir:  "/tmp/crab",
@@ -8,6 +8,8 @@ package optimization
 
 import (
 	"context"
+	"sync"
+	"time"
 
 	"github.com/go-logr/logr"
 	"github.com/pkg/errors"
@@ -15,8 +17,12 @@ import (
 
 type costEstimator struct {
 	config      *Config
+	slots       *slotPool
 	finalReport *Report
 	attempts    int
+	timeouts    int
+	metrics     *stageMetrics
+	mutex       sync.Mutex
 }
 
 func (ce *costEstimator) estimateCost(
@@ -24,17 +30,72 @@ func (ce *costEstimator) estimateCost(
 	request *estimateCostRequest,
 ) (*estimateCostResponse, error) {
 	logger := logr.FromContextOrDiscard(ctx)
+
+	// take an instance of service that is not busy with other requests
+	startedAt := time.Now()
+
+	slot, err := ce.slots.acquire(ctx)
+	if err != nil {
+		return nil, errors.Wrap(err, "acquire slot")
+	}
+
+	defer ce.slots.release(slot)
+
+	costFunction, costFunctionStage, err := selectCostFunction(slot, request)
+	if err != nil {
+		return nil, errors.Wrap(err, "select cost function")
+	}
+
+	response := &estimateCostResponse{
+		QueueTime: ce.metrics.observe(stageQueue, startedAt).Seconds(),
+	}
+
 	// apply all values to config first
-	if err := request.applyValues(ce.config.RBFOpt); err != nil {
+	startedAt = time.Now()
+
+	if err = request.applyValues(ce.config.RBFOpt, slot); err != nil {
 		return nil, errors.Wrap(err, "modify parameters")
 	}
 
-	ce.attempts++
+	response.ConfigModifierTime = ce.metrics.observe(stageConfigModifier, startedAt).Seconds()
+
+	ce.mutex.Lock()
+	if !request.Fast {
+		ce.attempts++
+	}
+	attempts := ce.attempts
+	ce.mutex.Unlock()
 
 	// then run cost estimation
-	cost, err := ce.config.RBFOpt.CostFunction(ctx)
+	startedAt = time.Now()
+
+	evaluationCtx, cancel := ce.evaluationContext(ctx)
+	cost, err := costFunction(evaluationCtx)
+	// the deadline of evaluation is exceeded, while the request itself is still alive
+	timedOut := errors.Is(evaluationCtx.Err(), context.DeadlineExceeded) && ctx.Err() == nil
 
-	response := &estimateCostResponse{Cost: cost}
+	cancel()
+
+	response.Cost = cost
+	response.CostFunctionTime = ce.metrics.observe(costFunctionStage, startedAt).Seconds()
+
+	if timedOut {
+		// penalize the point, so that the optimization goes on
+		ce.mutex.Lock()
+		ce.timeouts++
+		ce.mutex.Unlock()
+
+		logger.Info(
+			"evaluation timed out",
+			"timeout", ce.config.RBFOpt.EvaluationTimeout, "request", request, "error", err,
+		)
+
+		response.InvalidParameterCombination = true
+		response.TimedOut = true
+		response.Cost = ce.config.RBFOpt.InvalidParameterCombinationCost
+
+		return response, nil
+	}
 
 	if err != nil {
 		// notify optimizer about the invalid combination of parameters
@@ -54,17 +115,85 @@ func (ce *costEstimator) estimateCost(
 		)
 	}
 
-	logger.V(1).Info("estimate cost", "attempts", ce.attempts, "request", request, "response", response)
+	logger.V(1).Info("estimate cost", "attempts", attempts, "request", request, "response", response)
 
 	return response, nil
 }
 
+// selectCostFunction returns the function requested to evaluate and the stage it's timed as
+func selectCostFunction(slot *Slot, request *estimateCostRequest) (CostFunction, stage, error) {
+	if !request.Fast {
+		return slot.CostFunction, stageCostFunction, nil
+	}
+
+	if slot.FastCostFunction == nil {
+		return nil, stageFastCostFunction, errors.New("FastCostFunction is not set")
+	}
+
+	return slot.FastCostFunction, stageFastCostFunction, nil
+}
+
+// evaluationContext limits the time of CostFunction call if EvaluationTimeout is set
+func (ce *costEstimator) evaluationContext(ctx context.Context) (context.Context, context.CancelFunc) {
+	if ce.config.RBFOpt.EvaluationTimeout == 0 {
+		return context.WithCancel(ctx)
+	}
+
+	return context.WithTimeout(ctx, ce.config.RBFOpt.EvaluationTimeout)
+}
+
+// estimateCostBatch evaluates all the points concurrently (as far as slots allow),
+// the results are sent to the channel in the order of completion.
+func (ce *costEstimator) estimateCostBatch(
+	ctx context.Context,
+	request *estimateCostBatchRequest,
+) <-chan *estimateCostBatchItem {
+	// the first failure makes no sense to wait for the rest of evaluations
+	ctx, cancel := context.WithCancel(ctx)
+
+	results := make(chan *estimateCostBatchItem, len(request.Batch))
+
+	var wg sync.WaitGroup
+
+	for i, subRequest := range request.Batch {
+		wg.Add(1)
+
+		go func(i int, subRequest *estimateCostRequest) {
+			defer wg.Done()
+
+			item := &estimateCostBatchItem{Index: i}
+
+			response, err := ce.estimateCost(ctx, subRequest)
+			if err != nil {
+				cancel()
+
+				item.Error = err.Error()
+			} else {
+				item.estimateCostResponse = response
+			}
+
+			results <- item
+		}(i, subRequest)
+	}
+
+	go func() {
+		wg.Wait()
+		cancel()
+		close(results)
+	}()
+
+	return results
+}
+
 func (ce *costEstimator) registerReport(
 	ctx context.Context,
 	request *registerReportRequest,
 ) (*registerReportResponse, error) {
 	logger := logr.FromContextOrDiscard(ctx)
 
+	ce.mutex.Lock()
+	defer ce.mutex.Unlock()
+
 	if ce.finalReport != nil {
 		return nil, errors.New("report has been already registered")
 	}
@@ -81,6 +210,34 @@ func (ce *costEstimator) registerReport(
 	return &registerReportResponse{}, nil
 }
 
-func newCostEstimator(settings *Config) *costEstimator {
-	return &costEstimator{config: settings}
+func (ce *costEstimator) report() *Report {
+	ce.mutex.Lock()
+	defer ce.mutex.Unlock()
+
+	return ce.finalReport
+}
+
+// evaluations returns the number of cost function calls made so far
+func (ce *costEstimator) evaluations() int {
+	ce.mutex.Lock()
+	defer ce.mutex.Unlock()
+
+	return ce.attempts
+}
+
+// timedOutEvaluations returns the number of cost function calls that exceeded EvaluationTimeout
+func (ce *costEstimator) timedOutEvaluations() int {
+	ce.mutex.Lock()
+	defer ce.mutex.Unlock()
+
+	return ce.timeouts
+}
+
+// newCostEstimator makes an estimator evaluating CostFunction either locally, or with remote evaluators (if any)
+func newCostEstimator(settings *Config, evaluators *evaluatorPool) *costEstimator {
+	return &costEstimator{
+		config:  settings,
+		slots:   newSlotPool(settings.RBFOpt, evaluators),
+		metrics: &stageMetrics{},
+	}
 }
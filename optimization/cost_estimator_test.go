@@ -0,0 +1,234 @@
+/*
+ * Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+ * Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+ * License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+ */
+
+package optimization
+
+import (
+	"context"
+	"sync"
+	"testing"
+	"time"
+
+	"github.com/stretchr/testify/require"
+)
+
+func TestCostEstimatorSlots(t *testing.T) {
+	const slotCount = 4
+
+	// every slot has its own configuration; cost function blocks until all the slots are busy
+	var (
+		barrier sync.WaitGroup
+		values  [slotCount]int
+	)
+
+	barrier.Add(slotCount)
+
+	slots := make([]*Slot, slotCount)
+	for i := range slots {
+		i := i
+		slots[i] = &Slot{
+			ConfigModifiers: map[string]ConfigModifier{"x": func(v int) { values[i] = v }},
+			CostFunction: func(ctx context.Context) (Cost, error) {
+				barrier.Done()
+				barrier.Wait()
+
+				return Cost(-values[i]), nil
+			},
+		}
+	}
+
+	config := &Config{
+		RBFOpt: &RBFOptConfig{
+			Parameters:                      []*ParameterDescription{{Name: "x", Bound: &Bound{Left: 0, Right: 10}}},
+			Slots:                           slots,
+			MaxEvaluations:                  10,
+			MaxIterations:                   10,
+			InvalidParameterCombinationCost: 10,
+		},
+	}
+	require.NoError(t, config.RBFOpt.validate())
+	require.Equal(t, slotCount, config.RBFOpt.parallelism())
+
+	estimator := newCostEstimator(config, nil)
+
+	ctx, cancel := context.WithTimeout(context.Background(), 10*time.Second)
+	defer cancel()
+
+	var wg sync.WaitGroup
+
+	costs := make([]Cost, slotCount)
+	for i := 0; i < slotCount; i++ {
+		i := i
+
+		wg.Add(1)
+
+		go func() {
+			defer wg.Done()
+
+			request := &estimateCostRequest{ParameterValues: []*ParameterValue{{Name: "x", Value: i}}}
+			response, err := estimator.estimateCost(ctx, request)
+			require.NoError(t, err)
+
+			costs[i] = response.Cost
+		}()
+	}
+
+	wg.Wait()
+
+	for i, cost := range costs {
+		require.Equal(t, Cost(-i), cost)
+	}
+}
+
+func TestCostEstimatorBatch(t *testing.T) {
+	newSlot := func() *Slot {
+		var x int
+
+		return &Slot{
+			ConfigModifiers: map[string]ConfigModifier{"x": func(v int) { x = v }},
+			CostFunction: func(ctx context.Context) (Cost, error) {
+				if x > 5 {
+					return 0, ErrInvalidParameterCombination
+				}
+
+				return Cost(-x), nil
+			},
+		}
+	}
+
+	config := &Config{
+		RBFOpt: &RBFOptConfig{
+			Parameters:                      []*ParameterDescription{{Name: "x", Bound: &Bound{Left: 0, Right: 10}}},
+			Slots:                           []*Slot{newSlot(), newSlot()},
+			MaxEvaluations:                  10,
+			MaxIterations:                   10,
+			InvalidParameterCombinationCost: 10,
+		},
+	}
+
+	estimator := newCostEstimator(config, nil)
+
+	request := &estimateCostBatchRequest{}
+	for i := 0; i < 8; i++ {
+		request.Batch = append(request.Batch, &estimateCostRequest{
+			ParameterValues: []*ParameterValue{{Name: "x", Value: i}},
+		})
+	}
+
+	received := make(map[int]*estimateCostBatchItem)
+	for item := range estimator.estimateCostBatch(context.Background(), request) {
+		require.Empty(t, item.Error)
+		received[item.Index] = item
+	}
+
+	require.Len(t, received, len(request.Batch))
+
+	for i, item := range received {
+		if i > 5 {
+			require.True(t, item.InvalidParameterCombination)
+			require.Equal(t, config.RBFOpt.InvalidParameterCombinationCost, item.Cost)
+		} else {
+			require.False(t, item.InvalidParameterCombination)
+			require.Equal(t, Cost(-i), item.Cost)
+		}
+	}
+}
+
+func TestCostEstimatorEvaluationTimeout(t *testing.T) {
+	var x int
+
+	config := &Config{
+		RBFOpt: &RBFOptConfig{
+			Parameters: []*ParameterDescription{
+				{Name: "x", Bound: &Bound{Left: 0, Right: 10}, ConfigModifier: func(v int) { x = v }},
+			},
+			// evaluation of large values hangs until the context is cancelled
+			CostFunction: func(ctx context.Context) (Cost, error) {
+				if x > 5 {
+					<-ctx.Done()
+
+					return 0, ctx.Err()
+				}
+
+				return Cost(-x), nil
+			},
+			MaxEvaluations:                  10,
+			MaxIterations:                   10,
+			InvalidParameterCombinationCost: 10,
+			EvaluationTimeout:               50 * time.Millisecond,
+		},
+	}
+
+	estimator := newCostEstimator(config, nil)
+
+	t.Run("in time", func(t *testing.T) {
+		request := &estimateCostRequest{ParameterValues: []*ParameterValue{{Name: "x", Value: 3}}}
+		response, err := estimator.estimateCost(context.Background(), request)
+		require.NoError(t, err)
+		require.False(t, response.InvalidParameterCombination)
+		require.False(t, response.TimedOut)
+		require.Equal(t, Cost(-3), response.Cost)
+	})
+
+	t.Run("deadline exceeded", func(t *testing.T) {
+		// the point is penalized instead of failing the whole session
+		request := &estimateCostRequest{ParameterValues: []*ParameterValue{{Name: "x", Value: 7}}}
+		response, err := estimator.estimateCost(context.Background(), request)
+		require.NoError(t, err)
+		require.True(t, response.InvalidParameterCombination)
+		require.True(t, response.TimedOut)
+		require.Equal(t, config.RBFOpt.InvalidParameterCombinationCost, response.Cost)
+		require.Equal(t, 1, estimator.timedOutEvaluations())
+	})
+
+	t.Run("request cancelled", func(t *testing.T) {
+		ctx, cancel := context.WithTimeout(context.Background(), 10*time.Millisecond)
+		defer cancel()
+
+		request := &estimateCostRequest{ParameterValues: []*ParameterValue{{Name: "x", Value: 7}}}
+		_, err := estimator.estimateCost(ctx, request)
+		require.ErrorIs(t, err, context.DeadlineExceeded)
+		require.Equal(t, 1, estimator.timedOutEvaluations())
+	})
+}
+
+func TestCostEstimatorFastCostFunction(t *testing.T) {
+	var x int
+
+	config := &Config{
+		RBFOpt: &RBFOptConfig{
+			Parameters: []*ParameterDescription{
+				{Name: "x", Bound: &Bound{Left: 0, Right: 10}, ConfigModifier: func(v int) { x = v }},
+			},
+			CostFunction:                    func(ctx context.Context) (Cost, error) { return Cost(-x), nil },
+			FastCostFunction:                func(ctx context.Context) (Cost, error) { return Cost(-x - 1), nil },
+			MaxEvaluations:                  10,
+			MaxIterations:                   10,
+			InvalidParameterCombinationCost: 10,
+		},
+	}
+	require.NoError(t, config.RBFOpt.validate())
+	require.True(t, config.RBFOpt.hasFastCostFunction())
+
+	estimator := newCostEstimator(config, nil)
+
+	request := &estimateCostRequest{ParameterValues: []*ParameterValue{{Name: "x", Value: 3}}, Fast: true}
+	response, err := estimator.estimateCost(context.Background(), request)
+	require.NoError(t, err)
+	require.Equal(t, Cost(-4), response.Cost)
+
+	request = &estimateCostRequest{ParameterValues: []*ParameterValue{{Name: "x", Value: 3}}}
+	response, err = estimator.estimateCost(context.Background(), request)
+	require.NoError(t, err)
+	require.Equal(t, Cost(-3), response.Cost)
+
+	// fast evaluations are accounted separately
+	require.Equal(t, 1, estimator.evaluations())
+
+	_, counts := estimator.metrics.snapshot()
+	require.Equal(t, 1, counts[stageCostFunction])
+	require.Equal(t, 1, counts[stageFastCostFunction])
+}
@@ -0,0 +1,206 @@
+/*
+ * Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+ * Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+ * License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+ */
+
+package optimization
+
+import (
+	"bytes"
+	"context"
+	"encoding/json"
+	"net/http"
+	"time"
+
+	"github.com/go-logr/logr"
+	"github.com/pkg/errors"
+)
+
+// evaluatorRetryInterval - how long evaluator waits before the next attempt to join the pool
+// (e.g. there is no optimization in progress, so the server is not started)
+const evaluatorRetryInterval = time.Second
+
+// remoteEvaluatorClient evaluates the points of the pool with its own slot
+type remoteEvaluatorClient struct {
+	urlHead    string
+	pool       string
+	slot       *Slot
+	httpClient *http.Client
+	logger     logr.Logger
+	id         string
+}
+
+// RunEvaluator joins the pool of remote evaluators at the Endpoint of optimizer server (see EvaluatorPoolConfig),
+// and evaluates the points with the slot until the context is cancelled. Evaluator waits for the server
+// if it's not available, and joins the pool again if it has been considered lost,
+// so it may outlive many optimization sessions.
+// One may want to pass logger within context to have detailed logs.
+func RunEvaluator(ctx context.Context, endpoint, pool string, slot *Slot) error {
+	if slot == nil || slot.CostFunction == nil {
+		return errors.New("field CostFunction of slot is empty")
+	}
+
+	c := &remoteEvaluatorClient{
+		urlHead:    "http://" + endpoint,
+		pool:       pool,
+		slot:       slot,
+		httpClient: &http.Client{},
+		logger:     logr.FromContextOrDiscard(ctx).WithValues("pool", pool),
+	}
+
+	for {
+		err := c.serve(ctx)
+		if ctx.Err() != nil {
+			return nil
+		}
+
+		c.logger.Info("evaluator disconnected", "error", err.Error())
+
+		select {
+		case <-time.After(evaluatorRetryInterval):
+		case <-ctx.Done():
+			return nil
+		}
+	}
+}
+
+// serve registers evaluator and handles the points until the first error
+func (c *remoteEvaluatorClient) serve(ctx context.Context) error {
+	response := &registerEvaluatorResponse{}
+	if err := c.call(ctx, "/evaluators/register", &registerEvaluatorRequest{Pool: c.pool}, response); err != nil {
+		return errors.Wrap(err, "register")
+	}
+
+	c.id = response.EvaluatorID
+	c.logger.Info("evaluator registered", "evaluator_id", c.id)
+
+	for {
+		task := &pollTaskResponse{}
+		if err := c.call(ctx, "/evaluators/poll", &pollTaskRequest{EvaluatorID: c.id}, task); err != nil {
+			return errors.Wrap(err, "poll task")
+		}
+
+		// there is nothing to evaluate for a while
+		if task.AssignmentID == "" {
+			continue
+		}
+
+		result := c.evaluate(ctx, task)
+		if ctx.Err() != nil {
+			return errors.Wrap(ctx.Err(), "evaluate")
+		}
+
+		// the point is not needed anymore, or it has been already evaluated by another evaluator
+		if err := c.call(ctx, "/evaluators/result", result, nil); err != nil && !errors.Is(err, errUnknownAssignment) {
+			return errors.Wrap(err, "send result")
+		}
+	}
+}
+
+func (c *remoteEvaluatorClient) evaluate(ctx context.Context, task *pollTaskResponse) *taskResultRequest {
+	result := &taskResultRequest{EvaluatorID: c.id, AssignmentID: task.AssignmentID}
+
+	for _, pv := range task.ParameterValues {
+		configModifier, exists := c.slot.ConfigModifiers[pv.Name]
+		if !exists {
+			result.Error = errors.Errorf("ConfigModifier for parameter '%s' is empty", pv.Name).Error()
+
+			return result
+		}
+
+		configModifier(pv.Value)
+	}
+
+	ctx, cancel := context.WithCancel(ctx)
+	defer cancel()
+
+	// heartbeats stop as soon as the evaluation is finished
+	go c.sendHeartbeats(ctx, cancel, task)
+
+	cost, err := c.slot.CostFunction(ctx)
+
+	switch {
+	case errors.Is(err, ErrInvalidParameterCombination):
+		result.InvalidParameterCombination = true
+	case err != nil:
+		result.Error = err.Error()
+	default:
+		result.Cost = cost
+	}
+
+	return result
+}
+
+// sendHeartbeats keeps the assignment alive, and cancels the evaluation if the server doesn't need it anymore
+func (c *remoteEvaluatorClient) sendHeartbeats(ctx context.Context, cancel context.CancelFunc, task *pollTaskResponse) {
+	ticker := time.NewTicker(time.Duration(task.HeartbeatInterval * float64(time.Second)))
+	defer ticker.Stop()
+
+	request := &heartbeatRequest{EvaluatorID: c.id, AssignmentID: task.AssignmentID}
+
+	for {
+		select {
+		case <-ctx.Done():
+			return
+		case <-ticker.C:
+		}
+
+		response := &heartbeatResponse{}
+
+		err := c.call(ctx, "/evaluators/heartbeat", request, response)
+
+		switch {
+		case errors.Is(err, errUnknownEvaluator), errors.Is(err, errUnknownAssignment):
+			// the point has been given to another evaluator
+			cancel()
+		case err != nil:
+			// keep trying: the server considers evaluator lost only after the heartbeat timeout
+			c.logger.Error(err, "send heartbeat")
+		case response.Cancelled:
+			cancel()
+		}
+	}
+}
+
+// call posts the request to the server and decodes the response (if any)
+func (c *remoteEvaluatorClient) call(ctx context.Context, path string, request, response interface{}) error {
+	body, err := json.Marshal(request)
+	if err != nil {
+		return errors.Wrap(err, "json marshal")
+	}
+
+	httpRequest, err := http.NewRequestWithContext(ctx, http.MethodPost, c.urlHead+path, bytes.NewReader(body))
+	if err != nil {
+		return errors.Wrap(err, "new request")
+	}
+
+	httpResponse, err := c.httpClient.Do(httpRequest)
+	if err != nil {
+		return errors.Wrap(err, "do request")
+	}
+
+	defer func() { _ = httpResponse.Body.Close() }()
+
+	switch httpResponse.StatusCode {
+	case http.StatusOK:
+	case http.StatusNoContent:
+		return nil
+	case http.StatusNotFound:
+		return errUnknownEvaluator
+	case http.StatusGone:
+		return errUnknownAssignment
+	default:
+		return errors.Errorf("invalid status code %d", httpResponse.StatusCode)
+	}
+
+	if response == nil {
+		return nil
+	}
+
+	if err = json.NewDecoder(httpResponse.Body).Decode(response); err != nil {
+		return errors.Wrap(err, "json decode")
+	}
+
+	return nil
+}
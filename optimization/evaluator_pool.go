@@ -0,0 +1,505 @@
+/*
+ * Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+ * Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+ * License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+ */
+
+package optimization
+
+import (
+	"context"
+	"encoding/json"
+	"net/http"
+	"sort"
+	"sync"
+	"time"
+
+	"github.com/go-logr/logr"
+	"github.com/pkg/errors"
+)
+
+const (
+	// evaluatorPollTimeout - how long the poll request waits for a point to evaluate
+	evaluatorPollTimeout = 5 * time.Second
+	// evaluatorIdleTimeout - idle evaluator that hasn't polled for this time is forgotten
+	evaluatorIdleTimeout = time.Minute
+)
+
+var (
+	errUnknownEvaluator  = errors.New("unknown evaluator")
+	errUnknownAssignment = errors.New("unknown assignment")
+	errEvaluatorLost     = errors.New("evaluator lost")
+)
+
+// remoteTask is a point waiting for evaluation, or being evaluated by a remote evaluator
+type remoteTask struct {
+	ctx              context.Context // context of CostFunction call
+	parameterValues  []*ParameterValue
+	heartbeatTimeout time.Duration
+	results          chan *taskResultRequest
+	// the current attempt; guarded by evaluatorRegistry mutex
+	assignmentID string
+	evaluatorID  string
+	heartbeatAt  time.Time
+}
+
+// remoteEvaluator is a process that has joined the pool of evaluators
+type remoteEvaluator struct {
+	id     string
+	pool   *evaluatorPool
+	task   *remoteTask // the point in progress
+	seenAt time.Time
+}
+
+// evaluatorPool dispatches points to the evaluators that joined it
+type evaluatorPool struct {
+	name     string
+	tasks    chan *remoteTask // points wait here until an evaluator is idle
+	registry *evaluatorRegistry
+	logger   logr.Logger
+}
+
+// slots makes virtual slots sending the points to the pool, so that they are queued like the local ones
+func (p *evaluatorPool) slots(config *RBFOptConfig) []*Slot {
+	slots := make([]*Slot, config.Evaluators.Size)
+
+	for i := range slots {
+		values := make([]*ParameterValue, len(config.Parameters))
+		slot := &Slot{ConfigModifiers: make(map[string]ConfigModifier, len(config.Parameters))}
+
+		for j, param := range config.Parameters {
+			value := &ParameterValue{Name: param.Name}
+			values[j] = value
+			slot.ConfigModifiers[param.Name] = func(v int) { value.Value = v }
+		}
+
+		slot.CostFunction = func(ctx context.Context) (Cost, error) {
+			return p.evaluate(ctx, config.Evaluators, values)
+		}
+
+		slots[i] = slot
+	}
+
+	return slots
+}
+
+// evaluate sends the point to an idle evaluator and waits for the result.
+// If the evaluator is lost, the point is sent to another one.
+func (p *evaluatorPool) evaluate(
+	ctx context.Context,
+	config *EvaluatorPoolConfig,
+	parameterValues []*ParameterValue,
+) (Cost, error) {
+	task := &remoteTask{
+		ctx:              ctx,
+		parameterValues:  make([]*ParameterValue, len(parameterValues)),
+		heartbeatTimeout: config.heartbeatTimeout(),
+		results:          make(chan *taskResultRequest, 1),
+	}
+
+	for i, pv := range parameterValues {
+		task.parameterValues[i] = &ParameterValue{Name: pv.Name, Value: pv.Value}
+	}
+
+	for attempt := 1; ; attempt++ {
+		select {
+		case p.tasks <- task:
+		case <-ctx.Done():
+			return 0, errors.Wrap(ctx.Err(), "wait for idle evaluator")
+		}
+
+		result, err := p.wait(ctx, task)
+		if err == nil {
+			return result.cost()
+		}
+
+		if !errors.Is(err, errEvaluatorLost) || attempt > config.maxRetries() {
+			return 0, errors.Wrapf(err, "attempt %d", attempt)
+		}
+
+		p.logger.Info("evaluator lost, retrying", "attempt", attempt, "parameter_values", task.parameterValues)
+	}
+}
+
+func (p *evaluatorPool) wait(ctx context.Context, task *remoteTask) (*taskResultRequest, error) {
+	const checksPerTimeout = 4
+
+	ticker := time.NewTicker(task.heartbeatTimeout / checksPerTimeout)
+	defer ticker.Stop()
+
+	for {
+		select {
+		case result := <-task.results:
+			return result, nil
+		case <-ctx.Done():
+			// evaluator learns about the cancellation from the heartbeat response
+			return nil, errors.Wrap(ctx.Err(), "wait for evaluation")
+		case <-ticker.C:
+			if p.registry.lost(task) {
+				return nil, errEvaluatorLost
+			}
+		}
+	}
+}
+
+func (r *taskResultRequest) cost() (Cost, error) {
+	switch {
+	case r.Error != "":
+		return 0, errors.Errorf("remote evaluation: %s", r.Error)
+	case r.InvalidParameterCombination:
+		return r.Cost, ErrInvalidParameterCombination
+	default:
+		return r.Cost, nil
+	}
+}
+
+// evaluatorRegistry keeps the pools and evaluators of a server
+type evaluatorRegistry struct {
+	pools      map[string]*evaluatorPool
+	evaluators map[string]*remoteEvaluator
+	done       chan struct{} // closed when the server stops
+	logger     logr.Logger
+	mutex      sync.Mutex
+}
+
+// pool returns the pool with the given name, creating it if necessary
+func (r *evaluatorRegistry) pool(name string) *evaluatorPool {
+	r.mutex.Lock()
+	defer r.mutex.Unlock()
+
+	return r.poolLocked(name)
+}
+
+func (r *evaluatorRegistry) poolLocked(name string) *evaluatorPool {
+	pool, exists := r.pools[name]
+	if !exists {
+		pool = &evaluatorPool{
+			name:     name,
+			tasks:    make(chan *remoteTask),
+			registry: r,
+			logger:   r.logger.WithValues("pool", name),
+		}
+		r.pools[name] = pool
+	}
+
+	return pool
+}
+
+func (r *evaluatorRegistry) register(poolName string) (*remoteEvaluator, error) {
+	id, err := newID()
+	if err != nil {
+		return nil, errors.Wrap(err, "new evaluator id")
+	}
+
+	r.mutex.Lock()
+	defer r.mutex.Unlock()
+
+	r.pruneLocked()
+
+	evaluator := &remoteEvaluator{id: id, pool: r.poolLocked(poolName), seenAt: time.Now()}
+	r.evaluators[id] = evaluator
+
+	r.logger.Info("evaluator registered", "evaluator_id", id, "pool", poolName)
+
+	return evaluator, nil
+}
+
+// pruneLocked forgets idle evaluators that don't poll anymore
+func (r *evaluatorRegistry) pruneLocked() {
+	for id, evaluator := range r.evaluators {
+		if evaluator.task == nil && time.Since(evaluator.seenAt) > evaluatorIdleTimeout {
+			delete(r.evaluators, id)
+		}
+	}
+}
+
+func (r *evaluatorRegistry) touch(evaluatorID string) (*remoteEvaluator, error) {
+	r.mutex.Lock()
+	defer r.mutex.Unlock()
+
+	evaluator, exists := r.evaluators[evaluatorID]
+	if !exists {
+		return nil, errUnknownEvaluator
+	}
+
+	evaluator.seenAt = time.Now()
+
+	return evaluator, nil
+}
+
+// poll waits for a point to evaluate and assigns it to the evaluator; returns nil if there is none for a while
+func (r *evaluatorRegistry) poll(ctx context.Context, evaluatorID string) (*pollTaskResponse, error) {
+	evaluator, err := r.touch(evaluatorID)
+	if err != nil {
+		return nil, err
+	}
+
+	assignmentID, err := newID()
+	if err != nil {
+		return nil, errors.Wrap(err, "new assignment id")
+	}
+
+	timer := time.NewTimer(evaluatorPollTimeout)
+	defer timer.Stop()
+
+	var task *remoteTask
+
+	select {
+	case task = <-evaluator.pool.tasks:
+	case <-timer.C:
+		return nil, nil
+	case <-ctx.Done():
+		return nil, errors.Wrap(ctx.Err(), "wait for task")
+	case <-r.done:
+		return nil, nil
+	}
+
+	r.mutex.Lock()
+	task.assignmentID = assignmentID
+	task.evaluatorID = evaluator.id
+	task.heartbeatAt = time.Now()
+	evaluator.task = task
+	evaluator.seenAt = task.heartbeatAt
+	r.mutex.Unlock()
+
+	const heartbeatsPerTimeout = 4
+
+	response := &pollTaskResponse{
+		AssignmentID:      assignmentID,
+		ParameterValues:   task.parameterValues,
+		HeartbeatInterval: (task.heartbeatTimeout / heartbeatsPerTimeout).Seconds(),
+	}
+
+	return response, nil
+}
+
+// assignmentLocked returns the evaluator and the task it's working on
+func (r *evaluatorRegistry) assignmentLocked(evaluatorID, assignmentID string) (*remoteEvaluator, *remoteTask, error) {
+	evaluator, exists := r.evaluators[evaluatorID]
+	if !exists {
+		return nil, nil, errUnknownEvaluator
+	}
+
+	evaluator.seenAt = time.Now()
+
+	if evaluator.task == nil || evaluator.task.assignmentID != assignmentID {
+		return nil, nil, errUnknownAssignment
+	}
+
+	return evaluator, evaluator.task, nil
+}
+
+func (r *evaluatorRegistry) heartbeat(request *heartbeatRequest) (*heartbeatResponse, error) {
+	r.mutex.Lock()
+	defer r.mutex.Unlock()
+
+	_, task, err := r.assignmentLocked(request.EvaluatorID, request.AssignmentID)
+	if err != nil {
+		return nil, err
+	}
+
+	task.heartbeatAt = time.Now()
+
+	return &heartbeatResponse{Cancelled: task.ctx.Err() != nil}, nil
+}
+
+func (r *evaluatorRegistry) complete(request *taskResultRequest) error {
+	r.mutex.Lock()
+	evaluator, task, err := r.assignmentLocked(request.EvaluatorID, request.AssignmentID)
+
+	if err == nil {
+		evaluator.task = nil
+		task.assignmentID = ""
+	}
+	r.mutex.Unlock()
+
+	if err != nil {
+		return err
+	}
+
+	// nobody waits for the result of the cancelled task, and the channel is buffered
+	select {
+	case task.results <- request:
+	default:
+	}
+
+	return nil
+}
+
+// lost checks if the evaluator of the task has been silent for too long, and if so, forgets it
+func (r *evaluatorRegistry) lost(task *remoteTask) bool {
+	r.mutex.Lock()
+	defer r.mutex.Unlock()
+
+	if task.assignmentID == "" || time.Since(task.heartbeatAt) <= task.heartbeatTimeout {
+		return false
+	}
+
+	// the late requests of the evaluator will be rejected, so it will have to register again
+	delete(r.evaluators, task.evaluatorID)
+	r.logger.Info("evaluator lost", "evaluator_id", task.evaluatorID, "silent_for", time.Since(task.heartbeatAt))
+
+	task.assignmentID = ""
+
+	return true
+}
+
+func (r *evaluatorRegistry) stats() []*evaluatorStats {
+	r.mutex.Lock()
+	r.pruneLocked()
+
+	result := make([]*evaluatorStats, 0, len(r.evaluators))
+	for _, evaluator := range r.evaluators {
+		result = append(result, &evaluatorStats{
+			ID:     evaluator.id,
+			Pool:   evaluator.pool.name,
+			Busy:   evaluator.task != nil,
+			SeenAt: evaluator.seenAt,
+		})
+	}
+	r.mutex.Unlock()
+
+	sort.Slice(result, func(i, j int) bool { return result[i].ID < result[j].ID })
+
+	return result
+}
+
+// close releases the evaluators waiting for points
+func (r *evaluatorRegistry) close() {
+	close(r.done)
+}
+
+func newEvaluatorRegistry(logger logr.Logger) *evaluatorRegistry {
+	return &evaluatorRegistry{
+		pools:      map[string]*evaluatorPool{},
+		evaluators: map[string]*remoteEvaluator{},
+		done:       make(chan struct{}),
+		logger:     logger,
+	}
+}
+
+// Evaluators
+
+type evaluatorHandlerFunc func(r *http.Request) (interface{}, int, error)
+
+// evaluatorHandler serves the requests of remote evaluators, which don't belong to any session
+func (s *server) evaluatorHandler(handler evaluatorHandlerFunc) http.HandlerFunc {
+	return func(w http.ResponseWriter, r *http.Request) {
+		logger := s.annotateLogger(s.logger, r)
+
+		defer func() {
+			if err := r.Body.Close(); err != nil {
+				logger.Error(err, "request body close")
+			}
+		}()
+
+		if r.Method != http.MethodPost {
+			w.WriteHeader(http.StatusMethodNotAllowed)
+
+			return
+		}
+
+		response, statusCode, err := handler(r)
+
+		switch {
+		case err != nil:
+			logger.Error(err, "request handling finished")
+			w.WriteHeader(statusCode)
+		case response == nil:
+			w.WriteHeader(http.StatusNoContent)
+		default:
+			if err = json.NewEncoder(w).Encode(response); err != nil {
+				logger.Error(err, "json encode")
+			}
+		}
+	}
+}
+
+// evaluatorStatusCode tells the evaluator whether it should register again, or drop the assignment
+func evaluatorStatusCode(err error) int {
+	switch {
+	case errors.Is(err, errUnknownEvaluator):
+		return http.StatusNotFound
+	case errors.Is(err, errUnknownAssignment):
+		return http.StatusGone
+	default:
+		return http.StatusInternalServerError
+	}
+}
+
+func (s *server) registerEvaluator(r *http.Request) (interface{}, int, error) {
+	request := &registerEvaluatorRequest{}
+	if err := json.NewDecoder(r.Body).Decode(request); err != nil {
+		return nil, http.StatusBadRequest, errors.Wrap(err, "json decode")
+	}
+
+	if request.Pool == "" {
+		return nil, http.StatusBadRequest, errors.New("empty pool name")
+	}
+
+	evaluator, err := s.evaluators.register(request.Pool)
+	if err != nil {
+		return nil, http.StatusInternalServerError, errors.Wrap(err, "register evaluator")
+	}
+
+	return &registerEvaluatorResponse{EvaluatorID: evaluator.id}, http.StatusOK, nil
+}
+
+func (s *server) pollTask(r *http.Request) (interface{}, int, error) {
+	request := &pollTaskRequest{}
+	if err := json.NewDecoder(r.Body).Decode(request); err != nil {
+		return nil, http.StatusBadRequest, errors.Wrap(err, "json decode")
+	}
+
+	response, err := s.evaluators.poll(r.Context(), request.EvaluatorID)
+	if err != nil {
+		return nil, evaluatorStatusCode(err), errors.Wrap(err, "poll task")
+	}
+
+	if response == nil {
+		return nil, http.StatusNoContent, nil
+	}
+
+	return response, http.StatusOK, nil
+}
+
+func (s *server) heartbeat(r *http.Request) (interface{}, int, error) {
+	request := &heartbeatRequest{}
+	if err := json.NewDecoder(r.Body).Decode(request); err != nil {
+		return nil, http.StatusBadRequest, errors.Wrap(err, "json decode")
+	}
+
+	response, err := s.evaluators.heartbeat(request)
+	if err != nil {
+		return nil, evaluatorStatusCode(err), errors.Wrap(err, "heartbeat")
+	}
+
+	return response, http.StatusOK, nil
+}
+
+func (s *server) taskResult(r *http.Request) (interface{}, int, error) {
+	request := &taskResultRequest{}
+	if err := json.NewDecoder(r.Body).Decode(request); err != nil {
+		return nil, http.StatusBadRequest, errors.Wrap(err, "json decode")
+	}
+
+	if err := s.evaluators.complete(request); err != nil {
+		return nil, evaluatorStatusCode(err), errors.Wrap(err, "complete task")
+	}
+
+	return nil, http.StatusNoContent, nil
+}
+
+func (s *server) evaluatorsHandler(w http.ResponseWriter, r *http.Request) {
+	logger := s.annotateLogger(s.logger, r)
+
+	if r.Method != http.MethodGet {
+		w.WriteHeader(http.StatusMethodNotAllowed)
+
+		return
+	}
+
+	if err := json.NewEncoder(w).Encode(s.evaluators.stats()); err != nil {
+		logger.Error(err, "json encode")
+	}
+}
@@ -0,0 +1,199 @@
+/*
+ * Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+ * Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+ * License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+ */
+
+package optimization
+
+import (
+	"context"
+	"testing"
+	"time"
+
+	"github.com/go-logr/logr"
+	"github.com/stretchr/testify/require"
+)
+
+// testEvaluator stands for a remote host with its own instance of service
+type testEvaluator struct {
+	x         int
+	served    int
+	started   chan struct{} // receives a signal when the evaluation begins (if not nil)
+	hang      bool          // evaluation never finishes by itself
+	cancelRun context.CancelFunc
+	done      chan struct{}
+}
+
+func (e *testEvaluator) run(t *testing.T, endpoint, pool string) {
+	t.Helper()
+
+	ctx, cancel := context.WithCancel(context.Background())
+	e.cancelRun = cancel
+	e.done = make(chan struct{})
+
+	slot := &Slot{
+		ConfigModifiers: map[string]ConfigModifier{"x": func(v int) { e.x = v }},
+		CostFunction: func(ctx context.Context) (Cost, error) {
+			e.served++
+
+			if e.started != nil {
+				e.started <- struct{}{}
+			}
+
+			if e.hang {
+				<-ctx.Done()
+
+				return 0, ctx.Err()
+			}
+
+			if e.x > 5 {
+				return 0, ErrInvalidParameterCombination
+			}
+
+			return Cost(-e.x), nil
+		},
+	}
+
+	go func() {
+		defer close(e.done)
+		require.NoError(t, RunEvaluator(ctx, endpoint, pool, slot))
+	}()
+
+	t.Cleanup(e.stop)
+}
+
+func (e *testEvaluator) stop() {
+	e.cancelRun()
+	<-e.done
+}
+
+func newTestEvaluatorPool(t *testing.T, size int) (*server, *costEstimator) {
+	t.Helper()
+
+	srv, err := servers.acquire(logr.Discard(), "127.0.0.1:0")
+	require.NoError(t, err)
+	t.Cleanup(func() { servers.release(srv) })
+
+	config := &Config{
+		RBFOpt: &RBFOptConfig{
+			Parameters:                      []*ParameterDescription{{Name: "x", Bound: &Bound{Left: 0, Right: 10}}},
+			MaxEvaluations:                  10,
+			MaxIterations:                   10,
+			InvalidParameterCombinationCost: 10,
+			Evaluators: &EvaluatorPoolConfig{
+				Name:             t.Name(),
+				Size:             size,
+				HeartbeatTimeout: 200 * time.Millisecond,
+				MaxRetries:       1,
+			},
+		},
+	}
+	require.NoError(t, config.RBFOpt.validate())
+	require.Equal(t, size, config.RBFOpt.parallelism())
+
+	return srv, newCostEstimator(config, srv.evaluators.pool(config.RBFOpt.Evaluators.Name))
+}
+
+func TestEvaluatorPool(t *testing.T) {
+	t.Run("points are dispatched to evaluators", func(t *testing.T) {
+		const evaluatorCount = 3
+
+		srv, estimator := newTestEvaluatorPool(t, evaluatorCount)
+
+		evaluators := make([]*testEvaluator, evaluatorCount)
+		for i := range evaluators {
+			evaluators[i] = &testEvaluator{}
+			evaluators[i].run(t, srv.listener.Addr().String(), t.Name())
+		}
+
+		request := &estimateCostBatchRequest{}
+		for i := 0; i < 9; i++ {
+			request.Batch = append(request.Batch, &estimateCostRequest{
+				ParameterValues: []*ParameterValue{{Name: "x", Value: i}},
+			})
+		}
+
+		received := 0
+
+		for item := range estimator.estimateCostBatch(context.Background(), request) {
+			require.Empty(t, item.Error)
+
+			if item.Index > 5 {
+				require.True(t, item.InvalidParameterCombination)
+				require.Equal(t, estimator.config.RBFOpt.InvalidParameterCombinationCost, item.Cost)
+			} else {
+				require.False(t, item.InvalidParameterCombination)
+				require.Equal(t, Cost(-item.Index), item.Cost)
+			}
+
+			received++
+		}
+
+		require.Equal(t, len(request.Batch), received)
+
+		served := 0
+
+		for _, evaluator := range evaluators {
+			evaluator.stop()
+			served += evaluator.served
+		}
+
+		require.Equal(t, len(request.Batch), served)
+		require.Len(t, srv.evaluators.stats(), evaluatorCount)
+	})
+
+	t.Run("point is retried after evaluator loss", func(t *testing.T) {
+		srv, estimator := newTestEvaluatorPool(t, 1)
+		endpoint := srv.listener.Addr().String()
+
+		lost := &testEvaluator{started: make(chan struct{}, 1), hang: true}
+		lost.run(t, endpoint, t.Name())
+
+		// the evaluator goes away in the middle of evaluation
+		go func() {
+			<-lost.started
+			lost.stop()
+
+			healthy := &testEvaluator{}
+			healthy.run(t, endpoint, t.Name())
+		}()
+
+		request := &estimateCostRequest{ParameterValues: []*ParameterValue{{Name: "x", Value: 3}}}
+		response, err := estimator.estimateCost(context.Background(), request)
+		require.NoError(t, err)
+		require.Equal(t, Cost(-3), response.Cost)
+	})
+
+	t.Run("evaluation is cancelled on the evaluator side", func(t *testing.T) {
+		srv, estimator := newTestEvaluatorPool(t, 1)
+
+		evaluator := &testEvaluator{hang: true}
+		evaluator.run(t, srv.listener.Addr().String(), t.Name())
+
+		ctx, cancel := context.WithTimeout(context.Background(), 100*time.Millisecond)
+		defer cancel()
+
+		request := &estimateCostRequest{ParameterValues: []*ParameterValue{{Name: "x", Value: 3}}}
+		_, err := estimator.estimateCost(ctx, request)
+		require.ErrorIs(t, err, context.DeadlineExceeded)
+
+		// evaluator learns about cancellation from heartbeat, and becomes idle again
+		require.Eventually(t, func() bool {
+			stats := srv.evaluators.stats()
+
+			return len(stats) == 1 && !stats[0].Busy
+		}, 5*time.Second, 10*time.Millisecond)
+	})
+}
+
+func TestEvaluatorPoolConfig(t *testing.T) {
+	c := &EvaluatorPoolConfig{Name: "pool", Size: 2}
+	require.NoError(t, c.validate())
+	require.Equal(t, defaultHeartbeatTimeout, c.heartbeatTimeout())
+	require.Equal(t, defaultMaxRetries, c.maxRetries())
+
+	require.Error(t, (&EvaluatorPoolConfig{Size: 2}).validate())
+	require.Error(t, (&EvaluatorPoolConfig{Name: "pool"}).validate())
+	require.Error(t, (&EvaluatorPoolConfig{Name: "pool", Size: 2, MaxRetries: -1}).validate())
+}
@@ -0,0 +1,115 @@
+/*
+ * Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+ * Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+ * License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+ */
+
+package optimization
+
+import (
+	"fmt"
+	"io"
+	"sync"
+	"time"
+
+	"github.com/pkg/errors"
+)
+
+// stage is a part of evaluation processing on the Go side that is timed separately
+type stage int8
+
+const (
+	// stageRequest - handling of the whole request, including the decoding and encoding of messages
+	stageRequest stage = iota
+	// stageQueue - waiting for a free slot
+	stageQueue
+	// stageConfigModifier - applying parameter values with ConfigModifier
+	stageConfigModifier
+	// stageCostFunction - CostFunction call
+	stageCostFunction
+	// stageFastCostFunction - FastCostFunction call
+	stageFastCostFunction
+	stageCount
+)
+
+var stageNames = [stageCount]string{"request", "queue", "config_modifier", "cost_function", "fast_cost_function"}
+
+// stageMetrics accumulates the time spent at every stage
+type stageMetrics struct {
+	durations [stageCount]time.Duration
+	counts    [stageCount]int
+	mutex     sync.Mutex
+}
+
+// observe records the time passed since the beginning of a stage, and returns it
+func (m *stageMetrics) observe(s stage, startedAt time.Time) time.Duration {
+	duration := time.Since(startedAt)
+
+	m.mutex.Lock()
+	m.durations[s] += duration
+	m.counts[s]++
+	m.mutex.Unlock()
+
+	return duration
+}
+
+func (m *stageMetrics) snapshot() ([stageCount]time.Duration, [stageCount]int) {
+	m.mutex.Lock()
+	defer m.mutex.Unlock()
+
+	return m.durations, m.counts
+}
+
+// writeMetrics renders statistics of the sessions in Prometheus text exposition format
+func writeMetrics(w io.Writer, sessions []*session) error {
+	write := func(format string, args ...interface{}) error {
+		_, err := fmt.Fprintf(w, format, args...)
+
+		return errors.Wrap(err, "write")
+	}
+
+	counters := []struct {
+		name, help string
+		value      func(stats *sessionStats) int
+	}{
+		{"rbfopt_evaluations_total", "Number of CostFunction calls.", func(s *sessionStats) int { return s.Evaluations }},
+		{"rbfopt_failures_total", "Number of failed requests.", func(s *sessionStats) int { return s.Failures }},
+		{"rbfopt_timeouts_total", "Number of timed out CostFunction calls.", func(s *sessionStats) int { return s.Timeouts }},
+	}
+
+	for _, counter := range counters {
+		if err := write("# HELP %s %s\n# TYPE %s counter\n", counter.name, counter.help, counter.name); err != nil {
+			return err
+		}
+
+		for _, sess := range sessions {
+			if err := write("%s{session=%q} %d\n", counter.name, sess.id, counter.value(sess.stats())); err != nil {
+				return err
+			}
+		}
+	}
+
+	const name = "rbfopt_stage_duration_seconds"
+
+	if err := write("# HELP %s Time spent at the stage of evaluation.\n# TYPE %s summary\n", name, name); err != nil {
+		return err
+	}
+
+	for _, sess := range sessions {
+		durations, counts := sess.estimator.metrics.snapshot()
+
+		for s := stage(0); s < stageCount; s++ {
+			labels := fmt.Sprintf("session=%q,stage=%q", sess.id, stageNames[s])
+
+			if err := write("%s_sum{%s} %g\n", name, labels, durations[s].Seconds()); err != nil {
+				return err
+			}
+
+			if err := write("%s_count{%s} %d\n", name, labels, counts[s]); err != nil {
+				return err
+			}
+		}
+	}
+
+	return nil
+}
@@ -27,6 +27,34 @@ type Report struct {
 	Iterations      int               `json:"iterations"`
 	Evaluations     int               `json:"evaluations"`
 	FastEvaluations int               `json:"fast_evaluations"`
+	Seed            uint32            `json:"seed"`         // Random seed used by RBFOpt
+	StopReason      StopReason        `json:"stop_reason"`  // The reason why optimization has finished
+	CacheHits       int               `json:"cache_hits"`   // Evaluations answered by the evaluation cache
+	CacheMisses     int               `json:"cache_misses"` // Evaluations that required CostFunction call
+	Rejections      int               `json:"rejections"`   // Evaluations skipped as infeasible (see Constraints)
+	Timings         *Timings          `json:"timings"`      // Time spent at every stage of evaluations
+	// Sensitivities - the result of screening phase (if any), from the most influential parameter
+	Sensitivities []*ParameterSensitivity `json:"sensitivities"`
+}
+
+// ParameterSensitivity describes the influence of a parameter on CostFunction, estimated by screening
+type ParameterSensitivity struct {
+	Name   string  `json:"name"`
+	MuStar float64 `json:"mu_star"` // Mean absolute change of cost per the whole range of parameter
+	Sigma  float64 `json:"sigma"`   // Standard deviation of the changes: non-linearity and interactions
+	// Effects - the number of changes measured (the ones involving invalid parameter combinations are skipped)
+	Effects int  `json:"effects"`
+	Frozen  bool `json:"frozen"` // Parameter was fixed at Value during the main optimization
+	Value   int  `json:"value"`
+}
+
+// Timings contains the total time (in seconds) spent at every stage of evaluations
+type Timings struct {
+	Optimizer      float64 `json:"optimizer"`       // RBFOpt model and search steps
+	Transport      float64 `json:"transport"`       // requests from Python optimizer to Go side
+	Queue          float64 `json:"queue"`           // waiting for a free Slot
+	ConfigModifier float64 `json:"config_modifier"` // ConfigModifier calls
+	CostFunction   float64 `json:"cost_function"`   // CostFunction calls
 }
 
 // Optimize is an entry point for the optimization routines.
@@ -39,11 +67,30 @@ func Optimize(ctx context.Context, config *Config) (*Report, error) {
 		return nil, errors.Wrap(err, "validate config")
 	}
 
-	// run HTTP server that will redirect requests from Python optimizer to your Go service
-	estimator := newCostEstimator(config)
+	// run HTTP server that will redirect requests from Python optimizer to your Go service;
+	// the server is shared by all the concurrent sessions with the same endpoint
+	srv, err := servers.acquire(logger, config.Endpoint)
+	if err != nil {
+		return nil, errors.Wrap(err, "acquire server")
+	}
+
+	defer servers.release(srv)
+
+	// points are dispatched to remote evaluators (if any) by the server they've joined
+	var evaluators *evaluatorPool
+	if config.RBFOpt.Evaluators != nil {
+		evaluators = srv.evaluators.pool(config.RBFOpt.Evaluators.Name)
+	}
+
+	estimator := newCostEstimator(config, evaluators)
+
+	sess, err := newSession(ctx, logger, estimator)
+	if err != nil {
+		return nil, errors.Wrap(err, "new session")
+	}
 
-	srv := newServer(logger, config.Endpoint, estimator)
-	defer srv.quit(ctx)
+	srv.register(sess)
+	defer srv.unregister(sess)
 
 	// create root directory for configs and artifacts if necessary
 	if _, err := os.Stat(config.RootDir); err != nil {
@@ -51,6 +98,10 @@ func Optimize(ctx context.Context, config *Config) (*Report, error) {
 			return nil, errors.Wrap(err, "stat directory")
 		}
 
+		if config.Resume {
+			return nil, errors.Wrap(err, "nothing to resume")
+		}
+
 		logger.Info("check root dir", "error", err)
 
 		if err = os.MkdirAll(config.RootDir, 0755); err != nil {
@@ -58,18 +109,24 @@ func Optimize(ctx context.Context, config *Config) (*Report, error) {
 		}
 	}
 
+	if config.Transport == UnixSocket {
+		if err := sess.serveUnixSocket(unixSocketPath(config.RootDir)); err != nil {
+			return nil, errors.Wrap(err, "serve unix socket")
+		}
+	}
+
 	// run Python optimizer
-	ctxLogger := logr.NewContext(ctx, logger)
-	if err := runRbfOpt(ctxLogger, config); err != nil {
-		if srv.lastError != nil {
-			return nil, errors.Wrap(srv.lastError, "run rbfopt")
+	ctxLogger := logr.NewContext(ctx, sess.logger)
+	if err := runRbfOpt(ctxLogger, config, sess.id); err != nil {
+		if lastErr := sess.getLastError(); lastErr != nil {
+			return nil, errors.Wrap(lastErr, "run rbfopt")
 		}
 
 		return nil, errors.Wrap(err, "run rbfopt")
 	}
 
 	// obtain final report
-	report := estimator.finalReport
+	report := estimator.report()
 	if report == nil {
 		return nil, errors.New("protocol error: report is nil")
 	}
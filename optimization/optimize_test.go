@@ -193,6 +193,217 @@ func TestOptimize(t *testing.T) {
 		}
 	})
 
+	t.Run("resume", func(t *testing.T) {
+		cfg := &serviceConfig{paramX: 0, paramY: 0, paramZ: 0}
+
+		var calls int
+
+		config := &optimization.Config{
+			RootDir: makeRootDirPath(),
+			RBFOpt: &optimization.RBFOptConfig{
+				CostFunction: func(ctx context.Context) (optimization.Cost, error) {
+					calls++
+
+					return cfg.costFunction(ctx)
+				},
+				Parameters: []*optimization.ParameterDescription{
+					{
+						Name:           "x",
+						Bound:          &optimization.Bound{Left: 0, Right: 10},
+						ConfigModifier: cfg.setParamX,
+					},
+					{
+						Name:           "y",
+						Bound:          &optimization.Bound{Left: 0, Right: 10},
+						ConfigModifier: cfg.setParamY,
+					},
+					{
+						Name:           "z",
+						Bound:          &optimization.Bound{Left: 0, Right: 10},
+						ConfigModifier: cfg.setParamZ,
+					},
+				},
+				MaxEvaluations:                  25,
+				MaxIterations:                   25,
+				InvalidParameterCombinationCost: 10,
+			},
+			Plot: &optimization.PlotConfig{
+				ScatterPlotPolicy:   optimization.Omit,
+				HeatmapRenderPolicy: optimization.Omit,
+			},
+		}
+
+		logger := newLogger()
+		ctx := logr.NewContext(context.Background(), logger)
+
+		report, err := optimization.Optimize(ctx, config)
+		require.NoError(t, err)
+
+		// the session is already finished, so resumed one must reproduce its result without evaluations
+		calls = 0
+		config.Resume = true
+
+		resumedReport, err := optimization.Optimize(ctx, config)
+		require.NoError(t, err)
+		require.Equal(t, 0, calls)
+		require.Equal(t, report.Cost, resumedReport.Cost)
+		require.Equal(t, report.Evaluations, resumedReport.Evaluations)
+	})
+
+	t.Run("worker", func(t *testing.T) {
+		logger := newLogger()
+		ctx := logr.NewContext(context.Background(), logger)
+
+		worker, err := optimization.NewWorker(ctx)
+		require.NoError(t, err)
+
+		defer func() { require.NoError(t, worker.Close()) }()
+
+		// the same worker serves several sessions
+		for i := 0; i < 2; i++ {
+			cfg := &serviceConfig{paramX: 0, paramY: 0, paramZ: 0}
+
+			config := &optimization.Config{
+				RootDir: fmt.Sprintf("%s_worker_%d", makeRootDirPath(), i),
+				RBFOpt: &optimization.RBFOptConfig{
+					CostFunction: cfg.costFunction,
+					Parameters: []*optimization.ParameterDescription{
+						{
+							Name:           "x",
+							Bound:          &optimization.Bound{Left: 0, Right: 10},
+							ConfigModifier: cfg.setParamX,
+						},
+						{
+							Name:           "y",
+							Bound:          &optimization.Bound{Left: 0, Right: 10},
+							ConfigModifier: cfg.setParamY,
+						},
+						{
+							Name:           "z",
+							Bound:          &optimization.Bound{Left: 0, Right: 10},
+							ConfigModifier: cfg.setParamZ,
+						},
+					},
+					MaxEvaluations:                  25,
+					MaxIterations:                   25,
+					InvalidParameterCombinationCost: 10,
+				},
+				Plot: &optimization.PlotConfig{
+					ScatterPlotPolicy:   optimization.Omit,
+					HeatmapRenderPolicy: optimization.Omit,
+					RenderMode:          optimization.RenderSkip,
+				},
+				Worker: worker,
+			}
+
+			report, err := optimization.Optimize(ctx, config)
+			require.NoError(t, err)
+			require.Equal(t, optimization.Cost(-110), report.Cost)
+		}
+	})
+
+	t.Run("cancel worker session", func(t *testing.T) {
+		logger := newLogger()
+		ctx := logr.NewContext(context.Background(), logger)
+
+		worker, err := optimization.NewWorker(ctx)
+		require.NoError(t, err)
+
+		defer func() { require.NoError(t, worker.Close()) }()
+
+		makeConfig := func(rootDir string, costFunction optimization.CostFunction) *optimization.Config {
+			return &optimization.Config{
+				RootDir: rootDir,
+				RBFOpt: &optimization.RBFOptConfig{
+					CostFunction: costFunction,
+					Parameters: []*optimization.ParameterDescription{
+						{
+							Name:           "x",
+							Bound:          &optimization.Bound{Left: 0, Right: 10},
+							ConfigModifier: func(int) {},
+						},
+					},
+					MaxEvaluations:                  2,
+					MaxIterations:                   2,
+					InvalidParameterCombinationCost: 10,
+				},
+				Plot: &optimization.PlotConfig{
+					ScatterPlotPolicy:   optimization.Omit,
+					HeatmapRenderPolicy: optimization.Omit,
+					RenderMode:          optimization.RenderSkip,
+				},
+				Worker: worker,
+			}
+		}
+
+		// the session hangs on the first evaluation, ignoring cancellation
+		evaluating, release := make(chan struct{}, 1), make(chan struct{})
+		defer close(release)
+
+		hanging := func(context.Context) (optimization.Cost, error) {
+			select {
+			case evaluating <- struct{}{}:
+			default:
+			}
+			<-release
+
+			return 0, nil
+		}
+
+		sessionCtx, cancel := context.WithCancel(ctx)
+		defer cancel()
+
+		errs := make(chan error, 1)
+
+		go func() {
+			_, err := optimization.Optimize(sessionCtx, makeConfig(makeRootDirPath()+"_cancelled", hanging))
+			errs <- err
+		}()
+
+		<-evaluating
+		cancel()
+
+		select {
+		case err = <-errs:
+			require.ErrorIs(t, err, context.Canceled)
+		case <-time.After(10 * time.Second):
+			t.Fatal("cancelled session hasn't returned")
+		}
+
+		// the worker is still alive
+		constant := func(context.Context) (optimization.Cost, error) { return 1, nil }
+		report, err := optimization.Optimize(ctx, makeConfig(makeRootDirPath()+"_next", constant))
+		require.NoError(t, err)
+		require.Equal(t, optimization.Cost(1), report.Cost)
+	})
+
+	t.Run("nothing to resume", func(t *testing.T) {
+		config := &optimization.Config{
+			RootDir: "/tmp/rbfopt_nonexistent",
+			RBFOpt: &optimization.RBFOptConfig{
+				CostFunction: func(ctx context.Context) (optimization.Cost, error) { return 0, nil },
+				Parameters: []*optimization.ParameterDescription{
+					{
+						Name:           "x",
+						Bound:          &optimization.Bound{Left: 0, Right: 10},
+						ConfigModifier: func(int) {},
+					},
+				},
+				MaxEvaluations:                  25,
+				MaxIterations:                   25,
+				InvalidParameterCombinationCost: 10,
+			},
+			Plot: &optimization.PlotConfig{
+				ScatterPlotPolicy:   optimization.Omit,
+				HeatmapRenderPolicy: optimization.Omit,
+			},
+			Resume: true,
+		}
+
+		_, err := optimization.Optimize(context.Background(), config)
+		require.Error(t, err)
+	})
+
 	t.Run("invalid config", func(t *testing.T) {
 		var c *optimization.Config
 
@@ -7,6 +7,7 @@
 package optimization
 
 import (
+	"math/bits"
 	"regexp"
 
 	"github.com/pkg/errors"
@@ -21,16 +22,59 @@ type Bound struct {
 	Right int `json:"right"`
 }
 
+// Scale determines how optimizer explores the range of parameter values.
+type Scale int8
+
+const (
+	// Linear - the range is explored uniformly (the default)
+	Linear Scale = iota
+	// Log - the range is explored uniformly in logarithmic scale, so small values are explored
+	// as thoroughly as the large ones (e.g. buffer sizes). Bound.Left must be positive.
+	Log
+	// PowerOfTwo - only the powers of two are explored (e.g. queue depths). Both bounds must be powers of two.
+	PowerOfTwo
+)
+
+// ErrUnknownScale notifies about wrong Scale value
+var ErrUnknownScale = errors.New("unknown Scale")
+
+// MarshalJSON renders Scale to JSON
+func (s Scale) MarshalJSON() ([]byte, error) {
+	switch s {
+	case Linear:
+		return []byte("\"linear\""), nil
+	case Log:
+		return []byte("\"log\""), nil
+	case PowerOfTwo:
+		return []byte("\"power_of_two\""), nil
+	}
+
+	return nil, errors.Wrapf(ErrUnknownScale, "%v", s)
+}
+
 // ParameterDescription is something you want to optimization in your service configuration.
 type ParameterDescription struct {
 	Bound          *Bound         `json:"bound"`
 	ConfigModifier ConfigModifier `json:"-"`
 	Name           string         `json:"name"`
+	Scale          Scale          `json:"scale"`
 }
 
 const namePattern = "[a-zA-Z0-9_]"
 
 func (pd *ParameterDescription) validate() error {
+	if err := pd.validateName(); err != nil {
+		return err
+	}
+
+	if pd.ConfigModifier == nil {
+		return errors.New("parameter ConfigModifier is empty")
+	}
+
+	return nil
+}
+
+func (pd *ParameterDescription) validateName() error {
 	matched, err := regexp.MatchString(namePattern, pd.Name)
 	if err != nil {
 		return errors.Wrap(err, "regexp match string")
@@ -40,8 +84,68 @@ func (pd *ParameterDescription) validate() error {
 		return errors.Errorf("name '%s' does not match pattern '%s'", pd.Name, namePattern)
 	}
 
-	if pd.ConfigModifier == nil {
-		return errors.New("parameter ConfigModifier is empty")
+	return nil
+}
+
+func (pd *ParameterDescription) validateScale() error {
+	switch pd.Scale {
+	case Linear:
+		return nil
+	case Log, PowerOfTwo:
+	default:
+		return errors.Wrapf(ErrUnknownScale, "%v", pd.Scale)
+	}
+
+	if pd.Bound == nil {
+		return errors.New("field Bound is empty")
+	}
+
+	if pd.Bound.Left <= 0 {
+		return errors.Errorf("left bound %d must be positive in non-linear scale", pd.Bound.Left)
+	}
+
+	if pd.Scale == PowerOfTwo {
+		for _, value := range []int{pd.Bound.Left, pd.Bound.Right} {
+			if bits.OnesCount(uint(value)) != 1 {
+				return errors.Errorf("bound %d is not a power of two", value)
+			}
+		}
+	}
+
+	return nil
+}
+
+// Constraint is a linear inequality that parameter values must satisfy to make a valid combination:
+// sum(Coefficients[name] * value) <= UpperBound. Optimizer treats the points violating any constraint
+// as invalid parameter combinations by itself, without calling ConfigModifier and CostFunction.
+type Constraint struct {
+	Coefficients map[string]float64 `json:"coefficients"` // Keys are the names of parameters
+	UpperBound   float64            `json:"upper_bound"`
+}
+
+func (c *Constraint) validate(parameters []*ParameterDescription) error {
+	if c == nil {
+		return errors.New("empty constraint")
+	}
+
+	if len(c.Coefficients) == 0 {
+		return errors.New("field Coefficients is empty")
+	}
+
+	for name := range c.Coefficients {
+		known := false
+
+		for _, param := range parameters {
+			if param.Name == name {
+				known = true
+
+				break
+			}
+		}
+
+		if !known {
+			return errors.Errorf("param '%s' does not exist", name)
+		}
 	}
 
 	return nil
@@ -29,3 +29,53 @@ func TestParameterDescription(t *testing.T) {
 		require.Error(t, pd.validate())
 	})
 }
+
+func TestParameterScale(t *testing.T) {
+	t.Run("linear", func(t *testing.T) {
+		pd := &ParameterDescription{Bound: &Bound{Left: -10, Right: 10}}
+		require.NoError(t, pd.validateScale())
+	})
+
+	t.Run("log", func(t *testing.T) {
+		pd := &ParameterDescription{Bound: &Bound{Left: 1, Right: 262144}, Scale: Log}
+		require.NoError(t, pd.validateScale())
+
+		pd.Bound.Left = 0
+		require.Error(t, pd.validateScale())
+	})
+
+	t.Run("power of two", func(t *testing.T) {
+		pd := &ParameterDescription{Bound: &Bound{Left: 16, Right: 262144}, Scale: PowerOfTwo}
+		require.NoError(t, pd.validateScale())
+
+		pd.Bound.Right = 262143
+		require.Error(t, pd.validateScale())
+	})
+
+	t.Run("unknown", func(t *testing.T) {
+		pd := &ParameterDescription{Bound: &Bound{Left: 1, Right: 2}, Scale: 3}
+		require.ErrorIs(t, pd.validateScale(), ErrUnknownScale)
+
+		_, err := pd.Scale.MarshalJSON()
+		require.ErrorIs(t, err, ErrUnknownScale)
+	})
+}
+
+func TestConstraint(t *testing.T) {
+	parameters := []*ParameterDescription{{Name: "x"}, {Name: "y"}}
+
+	t.Run("valid", func(t *testing.T) {
+		c := &Constraint{Coefficients: map[string]float64{"x": 1, "y": -2}, UpperBound: 10}
+		require.NoError(t, c.validate(parameters))
+	})
+
+	t.Run("empty coefficients", func(t *testing.T) {
+		c := &Constraint{UpperBound: 10}
+		require.Error(t, c.validate(parameters))
+	})
+
+	t.Run("unknown parameter", func(t *testing.T) {
+		c := &Constraint{Coefficients: map[string]float64{"z": 1}, UpperBound: 10}
+		require.Error(t, c.validate(parameters))
+	})
+}
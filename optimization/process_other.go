@@ -0,0 +1,33 @@
+//go:build !(linux || darwin)
+
+/*
+ * Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+ * Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+ * License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+ */
+
+package optimization
+
+import (
+	"os"
+	"os/exec"
+
+	"github.com/pkg/errors"
+)
+
+// setProcessGroup does nothing: process groups are not supported by the platform
+func setProcessGroup(*exec.Cmd) {}
+
+// killProcessGroup kills the process with pid only: process groups are not supported by the platform
+func killProcessGroup(pid int) error {
+	process, err := os.FindProcess(pid)
+	if err != nil {
+		return errors.Wrap(err, "find process")
+	}
+
+	if err = process.Kill(); err != nil && !errors.Is(err, os.ErrProcessDone) {
+		return errors.Wrap(err, "kill process")
+	}
+
+	return nil
+}
@@ -0,0 +1,33 @@
+//go:build linux || darwin
+
+/*
+ * Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+ * Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+ * License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+ */
+
+package optimization
+
+import (
+	"bytes"
+	"context"
+	"os/exec"
+	"testing"
+	"time"
+
+	"github.com/stretchr/testify/require"
+)
+
+func TestRunCommandCancel(t *testing.T) {
+	// the child inherits stdout, so the command can't be waited for until the child is killed too
+	cmd := exec.Command("sh", "-c", "sleep 30 & wait")
+	cmd.Stdout = &bytes.Buffer{}
+
+	ctx, cancel := context.WithTimeout(context.Background(), 100*time.Millisecond)
+	defer cancel()
+
+	startedAt := time.Now()
+
+	require.ErrorIs(t, runCommand(ctx, cmd), context.DeadlineExceeded)
+	require.Greater(t, 5*time.Second, time.Since(startedAt))
+}
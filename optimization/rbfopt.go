@@ -21,15 +21,22 @@ import (
 )
 
 type rbfOptWrapper struct {
-	ctx    context.Context
-	config *Config
+	ctx       context.Context
+	config    *Config
+	sessionID string
+}
+
+// sessionConfig is a config passed to Python part
+type sessionConfig struct {
+	*Config
+	SessionID string `json:"session_id"` // Python optimizer sends it within every request to the server
 }
 
 func (r *rbfOptWrapper) run() error {
 	// render config to JSON because it will be used by Python part
 	path := filepath.Join(r.config.RootDir, "config.json")
 
-	data, err := json.Marshal(r.config)
+	data, err := json.Marshal(&sessionConfig{Config: r.config, SessionID: r.sessionID})
 	if err != nil {
 		return errors.Wrap(err, "marshal json")
 	}
@@ -38,6 +45,14 @@ func (r *rbfOptWrapper) run() error {
 		return errors.Wrap(err, "write file")
 	}
 
+	if r.config.Worker != nil {
+		if err = r.config.Worker.run(r.ctx, r.config.RootDir); err != nil {
+			return errors.Wrap(err, "run session on worker")
+		}
+
+		return nil
+	}
+
 	cmd := makeCmd(r.config.RootDir)
 	if err = r.executeCommand(r.ctx, cmd); err != nil {
 		return errors.Wrap(err, "execute command")
@@ -62,7 +77,7 @@ func (*rbfOptWrapper) executeCommand(ctx context.Context, cmd *exec.Cmd) error {
 	cmd.Stdout = stdoutBuf
 	cmd.Stderr = stderrBuf
 
-	err = cmd.Run()
+	runErr := runCommand(ctx, cmd)
 
 	// print
 
@@ -84,17 +99,45 @@ func (*rbfOptWrapper) executeCommand(ctx context.Context, cmd *exec.Cmd) error {
 		}
 	}
 
-	if err != nil {
-		return errors.Wrap(err, "cmd run")
+	if runErr != nil {
+		return errors.Wrap(runErr, "cmd run")
 	}
 
 	return nil
 }
 
-func runRbfOpt(ctx context.Context, config *Config) error {
+// runCommand waits for the command to finish, or kills it with all its children as soon as the context is cancelled
+func runCommand(ctx context.Context, cmd *exec.Cmd) error {
+	// optimizer spawns processes on its own (multiprocessing manager, renderers),
+	// and the output is not drained until all of them exit
+	setProcessGroup(cmd)
+
+	if err := cmd.Start(); err != nil {
+		return errors.Wrap(err, "cmd start")
+	}
+
+	done := make(chan error, 1)
+
+	go func() { done <- cmd.Wait() }()
+
+	select {
+	case err := <-done:
+		return errors.Wrap(err, "cmd wait")
+	case <-ctx.Done():
+		if err := killProcessGroup(cmd.Process.Pid); err != nil {
+			_ = cmd.Process.Kill()
+		}
+		<-done
+
+		return errors.Wrap(ctx.Err(), "wait for optimizer")
+	}
+}
+
+func runRbfOpt(ctx context.Context, config *Config, sessionID string) error {
 	wrapper := &rbfOptWrapper{
-		ctx:    ctx,
-		config: config,
+		ctx:       ctx,
+		config:    config,
+		sessionID: sessionID,
 	}
 
 	if err := wrapper.run(); err != nil {
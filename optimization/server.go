@@ -9,46 +9,120 @@ package optimization
 import (
 	"context"
 	"encoding/json"
+	"net"
 	"net/http"
+	"sort"
+	"sync"
+	"time"
 
 	"github.com/go-logr/logr"
 	"github.com/pkg/errors"
 )
 
+// server redirects requests from Python optimizers to the sessions they belong to.
+// It's shared by all the sessions with the same endpoint, so a lot of optimizations
+// may run concurrently within one process.
 type server struct {
 	httpServer *http.Server
-	estimator  *costEstimator
-	lastError  error
+	listener   net.Listener
+	sessions   map[string]*session
+	evaluators *evaluatorRegistry
+	refs       int // guarded by serverRegistry mutex
 	logger     logr.Logger
+	mutex      sync.Mutex
 }
 
 // Estimate Cost
 func (s *server) estimateCostHandler(w http.ResponseWriter, r *http.Request) {
-	s.middleware(w, r, s.estimateCost)
+	s.middleware(w, r, s.estimateCost(false))
 }
 
+// Estimate Fast Cost
+func (s *server) estimateFastCostHandler(w http.ResponseWriter, r *http.Request) {
+	s.middleware(w, r, s.estimateCost(true))
+}
+
+// estimateCost makes a handler evaluating either CostFunction or FastCostFunction
+//
 //nolint:dupl // TODO: need to use more advanced web framework
-func (s *server) estimateCost(ctx context.Context, w http.ResponseWriter, r *http.Request) (int, error) {
+func (*server) estimateCost(fast bool) handlerFunc {
+	return func(ctx context.Context, sess *session, w http.ResponseWriter, r *http.Request) (int, error) {
+		if r.Method != http.MethodGet {
+			return http.StatusMethodNotAllowed, errors.New("invalid method")
+		}
+
+		decoder := json.NewDecoder(r.Body)
+		request := &estimateCostRequest{Fast: fast}
+
+		err := decoder.Decode(request)
+		if err != nil {
+			return http.StatusBadRequest, errors.Wrap(err, "json decode")
+		}
+
+		response, err := sess.estimator.estimateCost(ctx, request)
+		if err != nil {
+			return http.StatusInternalServerError, errors.Wrap(err, "estimate cost")
+		}
+
+		encoder := json.NewEncoder(w)
+		if err = encoder.Encode(response); err != nil {
+			return http.StatusInternalServerError, errors.Wrap(err, "json encode")
+		}
+
+		return http.StatusOK, nil
+	}
+}
+
+// Estimate Cost Batch
+func (s *server) estimateCostBatchHandler(w http.ResponseWriter, r *http.Request) {
+	s.middleware(w, r, s.estimateCostBatch)
+}
+
+func (*server) estimateCostBatch(
+	ctx context.Context,
+	sess *session,
+	w http.ResponseWriter,
+	r *http.Request,
+) (int, error) {
 	if r.Method != http.MethodGet {
 		return http.StatusMethodNotAllowed, errors.New("invalid method")
 	}
 
 	decoder := json.NewDecoder(r.Body)
-	request := &estimateCostRequest{}
+	request := &estimateCostBatchRequest{}
 
-	err := decoder.Decode(request)
-	if err != nil {
+	if err := decoder.Decode(request); err != nil {
 		return http.StatusBadRequest, errors.Wrap(err, "json decode")
 	}
 
-	response, err := s.estimator.estimateCost(ctx, request)
-	if err != nil {
-		return http.StatusInternalServerError, errors.Wrap(err, "estimate cost")
+	if len(request.Batch) == 0 {
+		return http.StatusBadRequest, errors.New("empty batch")
 	}
 
+	// results are streamed as newline-delimited JSON as soon as they are ready,
+	// so the status is sent with the first of them, and the failures are reported in-band with the "error" field
 	encoder := json.NewEncoder(w)
-	if err = encoder.Encode(response); err != nil {
-		return http.StatusInternalServerError, errors.Wrap(err, "json encode")
+	flusher, _ := w.(http.Flusher)
+
+	var batchErr error
+
+	for item := range sess.estimator.estimateCostBatch(ctx, request) {
+		if item.Error != "" && batchErr == nil {
+			batchErr = errors.Errorf("point %d: %s", item.Index, item.Error)
+		}
+
+		if err := encoder.Encode(item); err != nil {
+			return http.StatusOK, errors.Wrap(err, "json encode")
+		}
+
+		if flusher != nil {
+			flusher.Flush()
+		}
+	}
+
+	// the error is only logged: the client has already got the status and the failed item
+	if batchErr != nil {
+		return http.StatusOK, errors.Wrap(batchErr, "estimate cost batch")
 	}
 
 	return http.StatusOK, nil
@@ -60,8 +134,9 @@ func (s *server) registerReportHandler(w http.ResponseWriter, r *http.Request) {
 }
 
 //nolint:dupl // TODO: need to use more advanced web framework
-func (s *server) registerReport(
+func (*server) registerReport(
 	ctx context.Context,
+	sess *session,
 	w http.ResponseWriter,
 	r *http.Request,
 ) (int, error) {
@@ -77,7 +152,7 @@ func (s *server) registerReport(
 		return http.StatusBadRequest, errors.Wrap(err, "json decode")
 	}
 
-	response, err := s.estimator.registerReport(ctx, request)
+	response, err := sess.estimator.registerReport(ctx, request)
 	if err != nil {
 		return http.StatusInternalServerError, errors.Wrap(err, "json encode")
 	}
@@ -90,11 +165,90 @@ func (s *server) registerReport(
 	return http.StatusOK, nil
 }
 
-type handlerFunc func(ctx context.Context, w http.ResponseWriter, r *http.Request) (int, error)
+// Sessions
+func (s *server) sessionsHandler(w http.ResponseWriter, r *http.Request) {
+	logger := s.annotateLogger(s.logger, r)
+
+	if r.Method != http.MethodGet {
+		w.WriteHeader(http.StatusMethodNotAllowed)
+
+		return
+	}
+
+	encoder := json.NewEncoder(w)
+	if err := encoder.Encode(s.stats()); err != nil {
+		logger.Error(err, "json encode")
+	}
+}
+
+// Metrics
+func (s *server) metricsHandler(w http.ResponseWriter, r *http.Request) {
+	logger := s.annotateLogger(s.logger, r)
+
+	if r.Method != http.MethodGet {
+		w.WriteHeader(http.StatusMethodNotAllowed)
+
+		return
+	}
+
+	w.Header().Set("Content-Type", "text/plain; version=0.0.4")
+
+	if err := writeMetrics(w, s.list()); err != nil {
+		logger.Error(err, "write metrics")
+	}
+}
+
+// handlerFunc returns the status of response and the error to log. The status is ignored if the handler has already
+// started the response (e.g. streamed a part of it): the errors are reported in-band then.
+type handlerFunc func(ctx context.Context, sess *session, w http.ResponseWriter, r *http.Request) (int, error)
+
+// responseWriter tracks whether the response is started, since its status can't be changed after that
+type responseWriter struct {
+	http.ResponseWriter
+	started bool
+}
+
+func (w *responseWriter) WriteHeader(statusCode int) {
+	w.started = true
+	w.ResponseWriter.WriteHeader(statusCode)
+}
+
+func (w *responseWriter) Write(data []byte) (int, error) {
+	w.started = true
+
+	n, err := w.ResponseWriter.Write(data)
+
+	return n, errors.Wrap(err, "write")
+}
+
+// Flush sends the streamed response to the client
+func (w *responseWriter) Flush() {
+	if flusher, ok := w.ResponseWriter.(http.Flusher); ok {
+		flusher.Flush()
+	}
+}
 
 func (s *server) middleware(w http.ResponseWriter, r *http.Request, handler handlerFunc) {
-	logger := s.annotateLogger(r)
-	ctx := logr.NewContext(r.Context(), logger)
+	sess := s.session(r.Header.Get(sessionIDHeader))
+	if sess == nil {
+		s.annotateLogger(s.logger, r).Error(
+			errors.New("unknown session"), "request handling finished",
+			"session_id", r.Header.Get(sessionIDHeader),
+		)
+		w.WriteHeader(http.StatusNotFound)
+
+		return
+	}
+
+	logger := s.annotateLogger(sess.logger, r)
+
+	// evaluations are interrupted if either the client has gone or the Optimize call is cancelled
+	ctx, cancel := sess.requestContext(r.Context())
+	defer cancel()
+
+	ctx = logr.NewContext(ctx, logger)
+
+	defer sess.estimator.metrics.observe(stageRequest, time.Now())
 
 	logger.V(0).Info("request handling started")
 
@@ -104,12 +258,16 @@ func (s *server) middleware(w http.ResponseWriter, r *http.Request, handler hand
 		}
 	}()
 
-	statusCode, err := handler(ctx, w, r)
-	w.WriteHeader(statusCode)
+	rw := &responseWriter{ResponseWriter: w}
+
+	statusCode, err := handler(ctx, sess, rw, r)
+	if !rw.started {
+		w.WriteHeader(statusCode)
+	}
 
 	if err != nil {
 		// cache errors
-		s.lastError = err
+		sess.setLastError(err)
 
 		logger.Error(err, "request handling finished")
 	} else {
@@ -117,8 +275,55 @@ func (s *server) middleware(w http.ResponseWriter, r *http.Request, handler hand
 	}
 }
 
-func (s *server) annotateLogger(r *http.Request) logr.Logger {
-	return s.logger.WithValues(
+func (s *server) register(sess *session) {
+	s.mutex.Lock()
+	s.sessions[sess.id] = sess
+	s.mutex.Unlock()
+}
+
+func (s *server) unregister(sess *session) {
+	s.mutex.Lock()
+	delete(s.sessions, sess.id)
+	s.mutex.Unlock()
+
+	sess.close()
+}
+
+func (s *server) session(id string) *session {
+	s.mutex.Lock()
+	defer s.mutex.Unlock()
+
+	return s.sessions[id]
+}
+
+// list returns the sessions in progress ordered by ID
+func (s *server) list() []*session {
+	s.mutex.Lock()
+	result := make([]*session, 0, len(s.sessions))
+
+	for _, sess := range s.sessions {
+		result = append(result, sess)
+	}
+	s.mutex.Unlock()
+
+	sort.Slice(result, func(i, j int) bool { return result[i].id < result[j].id })
+
+	return result
+}
+
+func (s *server) stats() []*sessionStats {
+	sessions := s.list()
+
+	result := make([]*sessionStats, len(sessions))
+	for i, sess := range sessions {
+		result[i] = sess.stats()
+	}
+
+	return result
+}
+
+func (*server) annotateLogger(logger logr.Logger, r *http.Request) logr.Logger {
+	return logger.WithValues(
 		"url", r.URL,
 		"method", r.Method,
 		"remote_addr", r.RemoteAddr,
@@ -126,12 +331,19 @@ func (s *server) annotateLogger(r *http.Request) logr.Logger {
 }
 
 func (s *server) quit(ctx context.Context) {
+	s.evaluators.close()
+
 	if err := s.httpServer.Shutdown(ctx); err != nil {
 		s.logger.Error(err, "http server shutdown")
 	}
 }
 
-func newServer(logger logr.Logger, endpoint string, estimator *costEstimator) *server {
+func newServer(logger logr.Logger, endpoint string) (*server, error) {
+	listener, err := net.Listen("tcp", endpoint)
+	if err != nil {
+		return nil, errors.Wrap(err, "listen")
+	}
+
 	handler := http.NewServeMux()
 
 	srv := &server{
@@ -139,18 +351,99 @@ func newServer(logger logr.Logger, endpoint string, estimator *costEstimator) *s
 			Addr:    endpoint,
 			Handler: handler,
 		},
-		estimator: estimator,
-		logger:    logger,
+		listener:   listener,
+		sessions:   map[string]*session{},
+		evaluators: newEvaluatorRegistry(logger),
+		logger:     logger,
 	}
 
 	handler.HandleFunc("/estimate_cost", srv.estimateCostHandler)
+	handler.HandleFunc("/estimate_fast_cost", srv.estimateFastCostHandler)
+	handler.HandleFunc("/estimate_cost_batch", srv.estimateCostBatchHandler)
 	handler.HandleFunc("/register_report", srv.registerReportHandler)
+	handler.HandleFunc("/sessions", srv.sessionsHandler)
+	handler.HandleFunc("/metrics", srv.metricsHandler)
+	handler.HandleFunc("/evaluators", srv.evaluatorsHandler)
+	handler.HandleFunc("/evaluators/register", srv.evaluatorHandler(srv.registerEvaluator))
+	handler.HandleFunc("/evaluators/poll", srv.evaluatorHandler(srv.pollTask))
+	handler.HandleFunc("/evaluators/heartbeat", srv.evaluatorHandler(srv.heartbeat))
+	handler.HandleFunc("/evaluators/result", srv.evaluatorHandler(srv.taskResult))
 
 	go func() {
-		if err := srv.httpServer.ListenAndServe(); !errors.Is(err, http.ErrServerClosed) {
-			srv.logger.Error(err, "http server listen and serve")
+		if err := srv.httpServer.Serve(listener); !errors.Is(err, http.ErrServerClosed) {
+			srv.logger.Error(err, "http server serve")
 		}
 	}()
 
-	return srv
+	return srv, nil
+}
+
+// serverShutdownTimeout - how long the server waits for the requests in progress when the last session has finished
+const serverShutdownTimeout = 10 * time.Second
+
+// serverRegistry keeps the servers shared by the sessions with the same endpoint
+type serverRegistry struct {
+	servers  map[string]*server
+	stopping map[string]chan struct{} // closed when the server that was listening the endpoint is stopped
+	mutex    sync.Mutex
+}
+
+var servers = &serverRegistry{servers: map[string]*server{}, stopping: map[string]chan struct{}{}}
+
+// acquire returns the server listening the endpoint, starting it if necessary
+func (sr *serverRegistry) acquire(logger logr.Logger, endpoint string) (*server, error) {
+	sr.mutex.Lock()
+	defer sr.mutex.Unlock()
+
+	// the endpoint is busy until the previous server is stopped
+	for stopped, found := sr.stopping[endpoint]; found; stopped, found = sr.stopping[endpoint] {
+		sr.mutex.Unlock()
+		<-stopped
+		sr.mutex.Lock()
+	}
+
+	srv, exists := sr.servers[endpoint]
+	if !exists {
+		var err error
+		if srv, err = newServer(logger, endpoint); err != nil {
+			return nil, errors.Wrap(err, "new server")
+		}
+
+		sr.servers[endpoint] = srv
+	}
+
+	srv.refs++
+
+	return srv, nil
+}
+
+// release stops the server when the last session using it has finished
+func (sr *serverRegistry) release(srv *server) {
+	sr.mutex.Lock()
+
+	srv.refs--
+	if srv.refs > 0 {
+		sr.mutex.Unlock()
+
+		return
+	}
+
+	endpoint, stopped := srv.httpServer.Addr, make(chan struct{})
+	delete(sr.servers, endpoint)
+	sr.stopping[endpoint] = stopped
+	sr.mutex.Unlock()
+
+	// the shutdown waits for the requests in progress (e.g. CostFunction ignoring the cancelled context),
+	// so it's performed in background: the session returns promptly, and the endpoint stays busy until it's done
+	go func() {
+		ctx, cancel := context.WithTimeout(context.Background(), serverShutdownTimeout)
+		defer cancel()
+
+		srv.quit(ctx)
+
+		sr.mutex.Lock()
+		delete(sr.stopping, endpoint)
+		sr.mutex.Unlock()
+		close(stopped)
+	}()
 }
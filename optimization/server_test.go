@@ -0,0 +1,196 @@
+/*
+ * Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+ * Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+ * License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+ */
+
+package optimization
+
+import (
+	"bytes"
+	"context"
+	"encoding/json"
+	"io"
+	"net/http"
+	"strings"
+	"testing"
+	"time"
+
+	"github.com/go-logr/logr"
+	"github.com/stretchr/testify/require"
+)
+
+func newTestSession(t *testing.T, srv *server, scale int) *session {
+	var x int
+
+	config := &Config{
+		RootDir: t.TempDir(),
+		RBFOpt: &RBFOptConfig{
+			Parameters: []*ParameterDescription{
+				{Name: "x", Bound: &Bound{Left: 0, Right: 10}, ConfigModifier: func(v int) { x = v }},
+			},
+			CostFunction: func(ctx context.Context) (Cost, error) {
+				return Cost(-x * scale), nil
+			},
+			InvalidParameterCombinationCost: 10,
+		},
+	}
+
+	sess, err := newSession(context.Background(), logr.Discard(), newCostEstimator(config, nil))
+	require.NoError(t, err)
+
+	srv.register(sess)
+	t.Cleanup(func() { srv.unregister(sess) })
+
+	return sess
+}
+
+func doTestRequest(t *testing.T, srv *server, method, path, sessionID string, payload interface{}) *http.Response {
+	body, err := json.Marshal(payload)
+	require.NoError(t, err)
+
+	request, err := http.NewRequest(method, "http://"+srv.listener.Addr().String()+path, bytes.NewReader(body))
+	require.NoError(t, err)
+	request.Header.Set(sessionIDHeader, sessionID)
+
+	response, err := http.DefaultClient.Do(request)
+	require.NoError(t, err)
+	t.Cleanup(func() { _ = response.Body.Close() })
+
+	return response
+}
+
+func TestServerRegistry(t *testing.T) {
+	const endpoint = "127.0.0.1:0"
+
+	srv, err := servers.acquire(logr.Discard(), endpoint)
+	require.NoError(t, err)
+
+	// the server is stopped with the last session, so the endpoint is free for the new one
+	servers.release(srv)
+
+	restarted, err := servers.acquire(logr.Discard(), endpoint)
+	require.NoError(t, err)
+	require.False(t, srv == restarted)
+
+	servers.release(restarted)
+
+	// the server is stopped in background
+	require.Eventually(t, func() bool {
+		servers.mutex.Lock()
+		defer servers.mutex.Unlock()
+
+		return len(servers.stopping) == 0
+	}, serverShutdownTimeout, 10*time.Millisecond)
+}
+
+func TestServerSessions(t *testing.T) {
+	const endpoint = "127.0.0.1:0"
+
+	srv, err := servers.acquire(logr.Discard(), endpoint)
+	require.NoError(t, err)
+
+	// the second optimization on the same endpoint shares the server
+	shared, err := servers.acquire(logr.Discard(), endpoint)
+	require.NoError(t, err)
+	require.True(t, srv == shared)
+
+	defer servers.release(srv)
+	defer servers.release(shared)
+
+	sessions := []*session{newTestSession(t, srv, 1), newTestSession(t, srv, 2)}
+
+	t.Run("requests are routed by session id", func(t *testing.T) {
+		for i, sess := range sessions {
+			request := &estimateCostRequest{ParameterValues: []*ParameterValue{{Name: "x", Value: 3}}}
+			response := doTestRequest(t, srv, http.MethodGet, "/estimate_cost", sess.id, request)
+			require.Equal(t, http.StatusOK, response.StatusCode)
+
+			result := &estimateCostResponse{}
+			require.NoError(t, json.NewDecoder(response.Body).Decode(result))
+			require.Equal(t, Cost(-3*(i+1)), result.Cost)
+		}
+	})
+
+	t.Run("unknown session", func(t *testing.T) {
+		request := &estimateCostRequest{ParameterValues: []*ParameterValue{{Name: "x", Value: 3}}}
+		response := doTestRequest(t, srv, http.MethodGet, "/estimate_cost", "unknown", request)
+		require.Equal(t, http.StatusNotFound, response.StatusCode)
+	})
+
+	t.Run("reports are registered per session", func(t *testing.T) {
+		request := &registerReportRequest{Report: &Report{Cost: -30}}
+		response := doTestRequest(t, srv, http.MethodPost, "/register_report", sessions[1].id, request)
+		require.Equal(t, http.StatusOK, response.StatusCode)
+
+		require.Nil(t, sessions[0].estimator.report())
+		require.Equal(t, Cost(-30), sessions[1].estimator.report().Cost)
+	})
+
+	t.Run("stats", func(t *testing.T) {
+		response := doTestRequest(t, srv, http.MethodGet, "/sessions", "", nil)
+		require.Equal(t, http.StatusOK, response.StatusCode)
+
+		var stats []*sessionStats
+		require.NoError(t, json.NewDecoder(response.Body).Decode(&stats))
+		require.Len(t, stats, len(sessions))
+
+		for _, item := range stats {
+			sess := srv.session(item.ID)
+			require.NotNil(t, sess)
+			require.Equal(t, sess.estimator.config.RootDir, item.RootDir)
+			require.Equal(t, 1, item.Evaluations)
+			require.Equal(t, 0, item.Failures)
+			require.Equal(t, sess == sessions[1], item.Finished)
+		}
+	})
+
+	t.Run("metrics", func(t *testing.T) {
+		response := doTestRequest(t, srv, http.MethodGet, "/metrics", "", nil)
+		require.Equal(t, http.StatusOK, response.StatusCode)
+
+		data, err := io.ReadAll(response.Body)
+		require.NoError(t, err)
+
+		metrics := string(data)
+		for _, sess := range sessions {
+			require.Contains(t, metrics, `rbfopt_evaluations_total{session="`+sess.id+`"} 1`)
+			require.Contains(t, metrics, `rbfopt_stage_duration_seconds_count{session="`+sess.id+`",stage="cost_function"} 1`)
+		}
+
+		require.Equal(t, 2*len(sessions)*int(stageCount), strings.Count(metrics, "rbfopt_stage_duration_seconds_"))
+	})
+}
+
+func TestServerBatchErrors(t *testing.T) {
+	srv, err := servers.acquire(logr.Discard(), "127.0.0.1:0")
+	require.NoError(t, err)
+
+	defer servers.release(srv)
+
+	sess := newTestSession(t, srv, 1)
+
+	request := &estimateCostBatchRequest{
+		Batch: []*estimateCostRequest{
+			{ParameterValues: []*ParameterValue{{Name: "x", Value: 3}}},
+			{ParameterValues: []*ParameterValue{{Name: "unknown", Value: 3}}},
+		},
+	}
+
+	// the status is sent with the first item, so the failures are reported in-band only
+	response := doTestRequest(t, srv, http.MethodGet, "/estimate_cost_batch", sess.id, request)
+	require.Equal(t, http.StatusOK, response.StatusCode)
+
+	decoder := json.NewDecoder(response.Body)
+	items := make(map[int]*estimateCostBatchItem)
+
+	for decoder.More() {
+		item := &estimateCostBatchItem{estimateCostResponse: &estimateCostResponse{}}
+		require.NoError(t, decoder.Decode(item))
+		items[item.Index] = item
+	}
+
+	// the failure cancels the rest of the batch, so the valid point may be reported as failed as well
+	require.Len(t, items, 2)
+	require.Contains(t, items[1].Error, "unknown")
+}
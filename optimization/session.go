@@ -0,0 +1,124 @@
+/*
+ * Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+ * Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+ * License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+ */
+
+package optimization
+
+import (
+	"context"
+	"crypto/rand"
+	"encoding/hex"
+	"net"
+	"sync"
+
+	"github.com/go-logr/logr"
+	"github.com/pkg/errors"
+)
+
+// sessionIDHeader is an HTTP header carrying the ID of the session the request belongs to
+// (Python part uses the same one)
+const sessionIDHeader = "X-Session-Id"
+
+// session is a single Optimize call served by the (possibly shared) server
+type session struct {
+	ctx          context.Context // context of Optimize call
+	id           string
+	estimator    *costEstimator
+	unixListener net.Listener
+	lastError    error
+	failures     int
+	logger       logr.Logger
+	mutex        sync.Mutex
+}
+
+// sessionStats describes the progress of a session
+type sessionStats struct {
+	ID          string `json:"id"`
+	RootDir     string `json:"root_dir"`
+	Evaluations int    `json:"evaluations"`
+	Failures    int    `json:"failures"`
+	Timeouts    int    `json:"timeouts"` // evaluations that exceeded EvaluationTimeout
+	Finished    bool   `json:"finished"` // Python optimizer has already registered the report
+}
+
+func (s *session) setLastError(err error) {
+	s.mutex.Lock()
+	s.lastError = err
+	s.failures++
+	s.mutex.Unlock()
+}
+
+func (s *session) getLastError() error {
+	s.mutex.Lock()
+	defer s.mutex.Unlock()
+
+	return s.lastError
+}
+
+func (s *session) stats() *sessionStats {
+	s.mutex.Lock()
+	failures := s.failures
+	s.mutex.Unlock()
+
+	return &sessionStats{
+		ID:          s.id,
+		RootDir:     s.estimator.config.RootDir,
+		Evaluations: s.estimator.evaluations(),
+		Failures:    failures,
+		Timeouts:    s.estimator.timedOutEvaluations(),
+		Finished:    s.estimator.report() != nil,
+	}
+}
+
+// requestContext derives the context of a request that is also cancelled as soon as the session is cancelled
+func (s *session) requestContext(ctx context.Context) (context.Context, context.CancelFunc) {
+	ctx, cancel := context.WithCancel(ctx)
+
+	go func() {
+		select {
+		case <-s.ctx.Done():
+			cancel()
+		case <-ctx.Done():
+		}
+	}()
+
+	return ctx, cancel
+}
+
+func (s *session) close() {
+	if s.unixListener != nil {
+		if err := s.unixListener.Close(); err != nil {
+			s.logger.Error(err, "unix socket listener close")
+		}
+	}
+}
+
+// newID generates a random identifier of a session, evaluator etc.
+func newID() (string, error) {
+	const size = 8
+
+	buf := make([]byte, size)
+	if _, err := rand.Read(buf); err != nil {
+		return "", errors.Wrap(err, "rand read")
+	}
+
+	return hex.EncodeToString(buf), nil
+}
+
+func newSession(ctx context.Context, logger logr.Logger, estimator *costEstimator) (*session, error) {
+	id, err := newID()
+	if err != nil {
+		return nil, errors.Wrap(err, "new session id")
+	}
+
+	s := &session{
+		ctx:       ctx,
+		id:        id,
+		estimator: estimator,
+		logger:    logger.WithValues("session_id", id),
+	}
+
+	return s, nil
+}
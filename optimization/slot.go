@@ -0,0 +1,92 @@
+/*
+ * Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+ * Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+ * License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+ */
+
+package optimization
+
+import (
+	"context"
+
+	"github.com/pkg/errors"
+)
+
+// Slot is an isolated instance of your service (with its own configuration)
+// that is able to evaluate CostFunction independently of the other instances.
+// Providing several slots makes optimizer evaluate several points simultaneously.
+type Slot struct {
+	// ConfigModifiers inject parameter values into the configuration of this particular instance.
+	// Keys are the names of parameters.
+	ConfigModifiers map[string]ConfigModifier
+	// CostFunction evaluates the configuration of this particular instance.
+	CostFunction CostFunction
+	// FastCostFunction is a cheap approximation of CostFunction evaluated on this particular instance
+	// (optional, see RBFOptConfig.FastCostFunction).
+	FastCostFunction CostFunction
+}
+
+func (s *Slot) validate(parameters []*ParameterDescription) error {
+	if s == nil {
+		return errors.New("empty slot")
+	}
+
+	if s.CostFunction == nil {
+		return errors.New("field CostFunction is empty")
+	}
+
+	for _, param := range parameters {
+		if s.ConfigModifiers[param.Name] == nil {
+			return errors.Errorf("ConfigModifier for parameter '%s' is empty", param.Name)
+		}
+	}
+
+	return nil
+}
+
+// slotPool hands out slots to the concurrent cost estimation requests.
+type slotPool struct {
+	slots chan *Slot
+}
+
+func (p *slotPool) acquire(ctx context.Context) (*Slot, error) {
+	select {
+	case slot := <-p.slots:
+		return slot, nil
+	case <-ctx.Done():
+		return nil, errors.Wrap(ctx.Err(), "wait for idle slot")
+	}
+}
+
+func (p *slotPool) release(slot *Slot) {
+	p.slots <- slot
+}
+
+func newSlotPool(config *RBFOptConfig, evaluators *evaluatorPool) *slotPool {
+	slots := config.Slots
+
+	switch {
+	case evaluators != nil:
+		slots = evaluators.slots(config)
+	case len(slots) == 0:
+		// the only slot is made of the config-wide CostFunction and ConfigModifiers
+		slot := &Slot{
+			ConfigModifiers:  make(map[string]ConfigModifier, len(config.Parameters)),
+			CostFunction:     config.CostFunction,
+			FastCostFunction: config.FastCostFunction,
+		}
+
+		for _, param := range config.Parameters {
+			slot.ConfigModifiers[param.Name] = param.ConfigModifier
+		}
+
+		slots = []*Slot{slot}
+	}
+
+	p := &slotPool{slots: make(chan *Slot, len(slots))}
+	for _, slot := range slots {
+		p.slots <- slot
+	}
+
+	return p
+}
@@ -0,0 +1,78 @@
+/*
+ * Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+ * Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+ * License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+ */
+
+package optimization
+
+import (
+	"encoding/json"
+
+	"github.com/pkg/errors"
+)
+
+// StopReason explains why optimization has finished
+type StopReason int8
+
+const (
+	// StopReasonLimit - RBFOpt has exhausted MaxEvaluations or MaxIterations, or has converged
+	StopReasonLimit StopReason = iota
+	// StopReasonTimeLimit - RBFOptConfig.TimeLimit is exceeded
+	StopReasonTimeLimit
+	// StopReasonTargetCost - RBFOptConfig.TargetCost is reached
+	StopReasonTargetCost
+	// StopReasonStagnation - the best cost hasn't improved within RBFOptConfig.StagnationEvaluations
+	StopReasonStagnation
+)
+
+var stopReasonNames = map[StopReason]string{
+	StopReasonLimit:      "limit",
+	StopReasonTimeLimit:  "time_limit",
+	StopReasonTargetCost: "target_cost",
+	StopReasonStagnation: "stagnation",
+}
+
+// ErrUnknownStopReason notifies about wrong StopReason value
+var ErrUnknownStopReason = errors.New("unknown StopReason")
+
+func (r StopReason) String() string {
+	if name, exists := stopReasonNames[r]; exists {
+		return name
+	}
+
+	return "unknown"
+}
+
+// MarshalJSON renders StopReason to JSON.
+func (r StopReason) MarshalJSON() ([]byte, error) {
+	name, exists := stopReasonNames[r]
+	if !exists {
+		return nil, errors.Wrapf(ErrUnknownStopReason, "%d", r)
+	}
+
+	data, err := json.Marshal(name)
+	if err != nil {
+		return nil, errors.Wrap(err, "marshal json")
+	}
+
+	return data, nil
+}
+
+// UnmarshalJSON parses StopReason from JSON.
+func (r *StopReason) UnmarshalJSON(data []byte) error {
+	var name string
+	if err := json.Unmarshal(data, &name); err != nil {
+		return errors.Wrap(err, "unmarshal json")
+	}
+
+	for value, valueName := range stopReasonNames {
+		if valueName == name {
+			*r = value
+
+			return nil
+		}
+	}
+
+	return errors.Wrapf(ErrUnknownStopReason, "%s", name)
+}
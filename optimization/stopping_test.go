@@ -0,0 +1,50 @@
+/*
+ * Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+ * Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+ * License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+ */
+
+package optimization
+
+import (
+	"encoding/json"
+	"testing"
+	"time"
+
+	"github.com/stretchr/testify/require"
+)
+
+func TestStopReason(t *testing.T) {
+	t.Run("report", func(t *testing.T) {
+		// the report is rendered by Python optimizer
+		report := &Report{}
+		require.NoError(t, json.Unmarshal([]byte(`{"stop_reason": "stagnation"}`), report))
+		require.Equal(t, StopReasonStagnation, report.StopReason)
+
+		data, err := json.Marshal(report.StopReason)
+		require.NoError(t, err)
+		require.Equal(t, `"stagnation"`, string(data))
+	})
+
+	t.Run("unknown", func(t *testing.T) {
+		report := &Report{}
+		require.ErrorIs(t, json.Unmarshal([]byte(`{"stop_reason": "boredom"}`), report), ErrUnknownStopReason)
+
+		_, err := json.Marshal(StopReason(100))
+		require.ErrorIs(t, err, ErrUnknownStopReason)
+	})
+
+	t.Run("config", func(t *testing.T) {
+		targetCost := Cost(-1)
+		config := &RBFOptConfig{TimeLimit: 90 * time.Second, TargetCost: &targetCost, StagnationEvaluations: 10}
+
+		data, err := json.Marshal(config)
+		require.NoError(t, err)
+
+		values := map[string]interface{}{}
+		require.NoError(t, json.Unmarshal(data, &values))
+		require.Equal(t, 90.0, values["time_limit"])
+		require.Equal(t, -1.0, values["target_cost"])
+		require.Equal(t, 10.0, values["stagnation_evaluations"])
+	})
+}
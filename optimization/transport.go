@@ -0,0 +1,249 @@
+/*
+ * Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+ * Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+ * License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+ */
+
+package optimization
+
+import (
+	"bufio"
+	"encoding/binary"
+	"io"
+	"math"
+	"net"
+	"os"
+	"path/filepath"
+	"time"
+
+	"github.com/go-logr/logr"
+	"github.com/pkg/errors"
+)
+
+// Transport determines the way Python optimizer requests cost function values from the Go side.
+type Transport int8
+
+const (
+	// HTTP - JSON over HTTP, the default transport
+	HTTP Transport = iota
+	// UnixSocket - compact binary protocol over Unix domain socket created in RootDir.
+	// It's worth choosing if CostFunction is cheap and the overhead of the wrapper matters.
+	UnixSocket
+)
+
+// ErrUnknownTransport is returned when user set unknown Transport
+var ErrUnknownTransport = errors.New("unknown transport")
+
+// MarshalJSON renders Transport to JSON.
+func (t Transport) MarshalJSON() ([]byte, error) {
+	switch t {
+	case HTTP:
+		return []byte("\"http\""), nil
+	case UnixSocket:
+		return []byte("\"unix_socket\""), nil
+	default:
+		return nil, errors.Wrapf(ErrUnknownTransport, "%v", t)
+	}
+}
+
+// unixSocketName is a name of a socket file in RootDir (Python part uses the same one)
+const unixSocketName = "estimator.sock"
+
+// Binary protocol (all numbers are little-endian):
+//
+// request:  uint32 N, then N x int64 parameter values in the order of RBFOptConfig.Parameters;
+// response: uint8 status, float64 cost, float64 queue time, float64 config modifier time, float64 cost function time
+// (all times are in seconds), and if status is binaryStatusError: uint32 L, then L bytes of error message.
+// Requests may be pipelined: up to unixSocketPipelineDepth of them are evaluated concurrently (as far as slots allow),
+// and the responses are sent in the order of requests.
+const (
+	binaryStatusOK uint8 = iota
+	binaryStatusInvalidParameterCombination
+	binaryStatusError
+	binaryStatusTimedOut // the cost is the penalty, see estimateCostResponse.TimedOut
+)
+
+// unixSocketPipelineDepth is a number of requests evaluated concurrently within a single connection
+// (Python part never sends more without reading responses)
+const unixSocketPipelineDepth = 256
+
+func unixSocketPath(rootDir string) string {
+	return filepath.Join(rootDir, unixSocketName)
+}
+
+func (s *session) serveUnixSocket(path string) error {
+	// socket may be left by the previous session
+	if err := os.Remove(path); err != nil && !os.IsNotExist(err) {
+		return errors.Wrap(err, "remove stale socket")
+	}
+
+	listener, err := net.Listen("unix", path)
+	if err != nil {
+		return errors.Wrap(err, "listen unix socket")
+	}
+
+	s.unixListener = listener
+
+	go func() {
+		for {
+			conn, err := listener.Accept()
+			if err != nil {
+				if !errors.Is(err, net.ErrClosed) {
+					s.logger.Error(err, "unix socket accept")
+				}
+
+				return
+			}
+
+			go s.handleUnixSocketConn(conn)
+		}
+	}()
+
+	return nil
+}
+
+// binaryResult is the outcome of a single request received over Unix socket
+type binaryResult struct {
+	response  *estimateCostResponse
+	err       error
+	startedAt time.Time
+}
+
+func (s *session) handleUnixSocketConn(conn net.Conn) {
+	defer func() {
+		if err := conn.Close(); err != nil {
+			s.logger.Error(err, "unix socket connection close")
+		}
+	}()
+
+	var (
+		reader = bufio.NewReader(conn)
+		ctx    = logr.NewContext(s.ctx, s.logger)
+		// the requests are evaluated concurrently, but the responses are written in the order of requests
+		results = make(chan chan *binaryResult, unixSocketPipelineDepth)
+		written = make(chan struct{})
+	)
+
+	go func() {
+		defer close(written)
+		s.writeBinaryResults(bufio.NewWriter(conn), results)
+	}()
+
+	for {
+		request, err := s.readBinaryRequest(reader)
+		if err != nil {
+			if !errors.Is(err, io.EOF) {
+				s.logger.Error(err, "read binary request")
+			}
+
+			break
+		}
+
+		result := make(chan *binaryResult, 1)
+		results <- result
+
+		go func(startedAt time.Time) {
+			response, err := s.estimator.estimateCost(ctx, request)
+			if err != nil {
+				s.setLastError(err)
+				s.logger.Error(err, "estimate cost")
+			}
+
+			result <- &binaryResult{response: response, err: err, startedAt: startedAt}
+		}(time.Now())
+	}
+
+	// the responses to the requests received so far are still sent
+	close(results)
+	<-written
+}
+
+func (s *session) writeBinaryResults(writer *bufio.Writer, results <-chan chan *binaryResult) {
+	var writeErr error
+
+	for result := range results {
+		r := <-result
+
+		// the rest of results are drained, so that evaluations don't block
+		if writeErr != nil {
+			continue
+		}
+
+		if writeErr = writeBinaryResponse(writer, r.response, r.err); writeErr != nil {
+			s.logger.Error(writeErr, "write binary response")
+
+			continue
+		}
+
+		s.estimator.metrics.observe(stageRequest, r.startedAt)
+	}
+}
+
+func (s *session) readBinaryRequest(reader io.Reader) (*estimateCostRequest, error) {
+	var n uint32
+	if err := binary.Read(reader, binary.LittleEndian, &n); err != nil {
+		return nil, errors.Wrap(err, "read header")
+	}
+
+	parameters := s.estimator.config.RBFOpt.Parameters
+	if int(n) != len(parameters) {
+		return nil, errors.Errorf("unexpected number of parameters: %d instead of %d", n, len(parameters))
+	}
+
+	values := make([]int64, n)
+	if err := binary.Read(reader, binary.LittleEndian, values); err != nil {
+		return nil, errors.Wrap(err, "read values")
+	}
+
+	request := &estimateCostRequest{ParameterValues: make([]*ParameterValue, n)}
+	for i, value := range values {
+		request.ParameterValues[i] = &ParameterValue{Name: parameters[i].Name, Value: int(value)}
+	}
+
+	return request, nil
+}
+
+func writeBinaryResponse(writer *bufio.Writer, response *estimateCostResponse, estimateErr error) error {
+	const headerSize = 33
+
+	var header [headerSize]byte
+
+	switch {
+	case estimateErr != nil:
+		header[0] = binaryStatusError
+	case response.TimedOut:
+		header[0] = binaryStatusTimedOut
+	case response.InvalidParameterCombination:
+		header[0] = binaryStatusInvalidParameterCombination
+	default:
+		header[0] = binaryStatusOK
+	}
+
+	if response != nil {
+		values := []float64{response.Cost, response.QueueTime, response.ConfigModifierTime, response.CostFunctionTime}
+		for i, value := range values {
+			binary.LittleEndian.PutUint64(header[1+8*i:], math.Float64bits(value))
+		}
+	}
+
+	if _, err := writer.Write(header[:]); err != nil {
+		return errors.Wrap(err, "write header")
+	}
+
+	if estimateErr != nil {
+		msg := estimateErr.Error()
+		if err := binary.Write(writer, binary.LittleEndian, uint32(len(msg))); err != nil {
+			return errors.Wrap(err, "write error length")
+		}
+
+		if _, err := writer.WriteString(msg); err != nil {
+			return errors.Wrap(err, "write error message")
+		}
+	}
+
+	if err := writer.Flush(); err != nil {
+		return errors.Wrap(err, "flush")
+	}
+
+	return nil
+}
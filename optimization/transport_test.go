@@ -0,0 +1,185 @@
+/*
+ * Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+ * Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+ * License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+ */
+
+package optimization
+
+import (
+	"bufio"
+	"context"
+	"encoding/binary"
+	"io"
+	"math"
+	"net"
+	"os"
+	"os/exec"
+	"strconv"
+	"strings"
+	"testing"
+
+	"github.com/go-logr/logr"
+	"github.com/stretchr/testify/require"
+)
+
+type binaryClient struct {
+	conn   net.Conn
+	reader *bufio.Reader
+}
+
+func (c *binaryClient) estimateCost(values ...int64) (uint8, Cost, error) {
+	if err := c.send(values...); err != nil {
+		return 0, 0, err
+	}
+
+	return c.receive()
+}
+
+func (c *binaryClient) send(values ...int64) error {
+	buf := make([]byte, 4+8*len(values))
+	binary.LittleEndian.PutUint32(buf, uint32(len(values)))
+
+	for i, v := range values {
+		binary.LittleEndian.PutUint64(buf[4+8*i:], uint64(v))
+	}
+
+	_, err := c.conn.Write(buf)
+
+	return err
+}
+
+func (c *binaryClient) receive() (uint8, Cost, error) {
+	var header [33]byte
+	if _, err := io.ReadFull(c.reader, header[:]); err != nil {
+		return 0, 0, err
+	}
+
+	status, cost := header[0], math.Float64frombits(binary.LittleEndian.Uint64(header[1:]))
+	if status == binaryStatusError {
+		var length uint32
+		if err := binary.Read(c.reader, binary.LittleEndian, &length); err != nil {
+			return 0, 0, err
+		}
+
+		if _, err := io.CopyN(io.Discard, c.reader, int64(length)); err != nil {
+			return 0, 0, err
+		}
+	}
+
+	return status, cost, nil
+}
+
+func newUnixSocketTestServer(t testing.TB) (*session, *binaryClient) {
+	var x, y int
+
+	config := &Config{
+		RootDir: t.TempDir(),
+		RBFOpt: &RBFOptConfig{
+			Parameters: []*ParameterDescription{
+				{Name: "x", Bound: &Bound{Left: 0, Right: 10}, ConfigModifier: func(v int) { x = v }},
+				{Name: "y", Bound: &Bound{Left: 0, Right: 10}, ConfigModifier: func(v int) { y = v }},
+			},
+			CostFunction: func(ctx context.Context) (Cost, error) {
+				if x < y {
+					return 0, ErrInvalidParameterCombination
+				}
+
+				return Cost(-x * y), nil
+			},
+			InvalidParameterCombinationCost: 10,
+		},
+	}
+
+	sess, err := newSession(context.Background(), logr.Discard(), newCostEstimator(config, nil))
+	require.NoError(t, err)
+	require.NoError(t, sess.serveUnixSocket(unixSocketPath(config.RootDir)))
+
+	conn, err := net.Dial("unix", unixSocketPath(config.RootDir))
+	require.NoError(t, err)
+
+	t.Cleanup(func() {
+		require.NoError(t, conn.Close())
+		require.NoError(t, sess.unixListener.Close())
+	})
+
+	return sess, &binaryClient{conn: conn, reader: bufio.NewReader(conn)}
+}
+
+func TestUnixSocketTransport(t *testing.T) {
+	sess, client := newUnixSocketTestServer(t)
+
+	status, cost, err := client.estimateCost(3, 2)
+	require.NoError(t, err)
+	require.Equal(t, binaryStatusOK, status)
+	require.Equal(t, Cost(-6), cost)
+
+	status, cost, err = client.estimateCost(2, 3)
+	require.NoError(t, err)
+	require.Equal(t, binaryStatusInvalidParameterCombination, status)
+	require.Equal(t, Cost(10), cost)
+
+	// pipelined requests are answered in order
+	for _, x := range []int64{4, 1, 5} {
+		require.NoError(t, client.send(x, 2))
+	}
+
+	for _, expected := range []Cost{-8, 10, -10} {
+		_, cost, err = client.receive()
+		require.NoError(t, err)
+		require.Equal(t, expected, cost)
+	}
+
+	// wrong number of parameters breaks the connection
+	_, _, err = client.estimateCost(1)
+	require.Error(t, err)
+
+	require.NoError(t, sess.getLastError())
+}
+
+// BenchmarkUnixSocketTransport measures the overhead of a single evaluation round trip.
+func BenchmarkUnixSocketTransport(b *testing.B) {
+	_, client := newUnixSocketTestServer(b)
+
+	b.ResetTimer()
+
+	for i := 0; i < b.N; i++ {
+		if _, _, err := client.estimateCost(3, 2); err != nil {
+			b.Fatal(err)
+		}
+	}
+}
+
+// BenchmarkUnixSocketPythonClient measures the overhead of evaluation as Python optimizer sees it,
+// reporting microseconds per evaluation for every case of benchmarks/unix_socket.py.
+func BenchmarkUnixSocketPythonClient(b *testing.B) {
+	sess, _ := newUnixSocketTestServer(b)
+
+	//nolint:gosec // the arguments are under control of the benchmark
+	cmd := exec.Command(
+		"python3", "benchmarks/unix_socket.py", unixSocketPath(sess.estimator.config.RootDir),
+		"--evaluations", strconv.Itoa(b.N),
+	)
+	cmd.Dir = ".."
+	cmd.Env = append(os.Environ(), "PYTHONPATH=.")
+
+	out, err := cmd.CombinedOutput()
+	if err != nil {
+		b.Fatalf("%v: %s", err, out)
+	}
+
+	// every line looks like "client batch: 12.3 us/evaluation"
+	for _, line := range strings.Split(strings.TrimSpace(string(out)), "\n") {
+		parts := strings.SplitN(line, ": ", 2)
+		if len(parts) != 2 {
+			continue
+		}
+
+		us, err := strconv.ParseFloat(strings.TrimSuffix(parts[1], " us/evaluation"), 64)
+		if err != nil {
+			b.Fatalf("unexpected output '%s': %v", line, err)
+		}
+
+		b.ReportMetric(us, strings.ReplaceAll(parts[0], " ", "_")+"-us/op")
+	}
+}
@@ -0,0 +1,229 @@
+/*
+ * Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+ * Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+ * License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+ */
+
+package optimization
+
+import (
+	"bufio"
+	"context"
+	"encoding/json"
+	"io"
+	"os"
+	"os/exec"
+	"path/filepath"
+	"sync"
+
+	"github.com/go-logr/logr"
+	"github.com/pkg/errors"
+)
+
+// Worker is a long-lived Python optimizer process. Starting the optimizer and loading its libraries takes
+// a considerable time, so if you run a lot of short optimization sessions, start a Worker once
+// and pass it to every Optimize call within the Config.
+// Worker runs sessions one by one, every session is executed in a separate process
+// forked from the worker, so sessions don't share any state. If the context of Optimize is cancelled,
+// the session is killed, and the worker is ready for the next one.
+type Worker struct {
+	cmd       *exec.Cmd
+	stdin     io.WriteCloser
+	responses *bufio.Scanner
+	mutex     sync.Mutex
+}
+
+// workerResponse is sent by Python worker when the session is started, and when it's finished
+type workerResponse struct {
+	RootDir  string `json:"root_dir"`
+	Pid      int    `json:"pid"`       // session process, it's also the leader of the session process group
+	ExitCode int    `json:"exit_code"` // set when the session is finished
+}
+
+// optimizerLogName is a name of a file in RootDir where the session run by worker writes its output
+const optimizerLogName = "optimizer.log"
+
+// ErrWorkerClosed is returned when the session is sent to the worker that doesn't work anymore
+var ErrWorkerClosed = errors.New("worker is closed")
+
+// NewWorker starts Python optimizer worker.
+func NewWorker(ctx context.Context) (*Worker, error) {
+	logger := logr.FromContextOrDiscard(ctx)
+
+	cmd := makeWorkerCmd()
+	cmd.Stderr = os.Stderr
+
+	stdin, err := cmd.StdinPipe()
+	if err != nil {
+		return nil, errors.Wrap(err, "stdin pipe")
+	}
+
+	stdout, err := cmd.StdoutPipe()
+	if err != nil {
+		return nil, errors.Wrap(err, "stdout pipe")
+	}
+
+	logger.Info("starting worker", "cmd", cmd)
+
+	if err = cmd.Start(); err != nil {
+		return nil, errors.Wrap(err, "cmd start")
+	}
+
+	w := &Worker{
+		cmd:       cmd,
+		stdin:     stdin,
+		responses: bufio.NewScanner(stdout),
+	}
+
+	return w, nil
+}
+
+// run executes optimization session which configuration is already stored in rootDir
+func (w *Worker) run(ctx context.Context, rootDir string) error {
+	w.mutex.Lock()
+	defer w.mutex.Unlock()
+
+	if w.stdin == nil {
+		return ErrWorkerClosed
+	}
+
+	// worker resolves paths relatively to its own working directory
+	rootDir, err := filepath.Abs(rootDir)
+	if err != nil {
+		return errors.Wrap(err, "absolute path")
+	}
+
+	if _, err = io.WriteString(w.stdin, rootDir+"\n"); err != nil {
+		return errors.Wrap(err, "send session")
+	}
+
+	started := make(chan int, 1)
+	responses := make(chan error, 1)
+
+	go func() { responses <- w.receive(rootDir, started) }()
+
+	select {
+	case err = <-responses:
+		if errors.Is(err, ErrWorkerClosed) {
+			w.release()
+
+			return err
+		}
+	case <-ctx.Done():
+		if cancelErr := w.cancel(started, responses); errors.Is(cancelErr, ErrWorkerClosed) {
+			w.release()
+		}
+
+		return errors.Wrap(ctx.Err(), "wait for session")
+	}
+
+	if copyErr := copyOptimizerLog(rootDir); copyErr != nil && err == nil {
+		err = copyErr
+	}
+
+	return err
+}
+
+// cancel kills the session in progress with all its children, and waits for the worker to report it
+func (w *Worker) cancel(started <-chan int, responses <-chan error) error {
+	select {
+	case pid := <-started:
+		if err := killProcessGroup(pid); err != nil {
+			// the session can't be stopped otherwise
+			_ = w.cmd.Process.Kill()
+		}
+	case err := <-responses:
+		// the session has finished (or the worker has exited) in the meantime
+		return err
+	}
+
+	return <-responses
+}
+
+// receive waits for the session to finish, passing its pid as soon as it's started
+func (w *Worker) receive(rootDir string, started chan<- int) error {
+	response, err := w.readResponse(rootDir)
+	if err != nil {
+		return errors.Wrap(err, "session start")
+	}
+
+	started <- response.Pid
+
+	if response, err = w.readResponse(rootDir); err != nil {
+		return errors.Wrap(err, "session finish")
+	}
+
+	if response.ExitCode != 0 {
+		return errors.Errorf("session failed with exit code %d", response.ExitCode)
+	}
+
+	return nil
+}
+
+func (w *Worker) readResponse(rootDir string) (*workerResponse, error) {
+	if !w.responses.Scan() {
+		if err := w.responses.Err(); err != nil {
+			return nil, errors.Wrap(err, "read response")
+		}
+
+		return nil, errors.Wrap(ErrWorkerClosed, "worker exited")
+	}
+
+	response := &workerResponse{}
+	if err := json.Unmarshal(w.responses.Bytes(), response); err != nil {
+		return nil, errors.Wrap(err, "json unmarshal")
+	}
+
+	if response.RootDir != rootDir {
+		return nil, errors.Errorf("protocol error: response for '%s' instead of '%s'", response.RootDir, rootDir)
+	}
+
+	return response, nil
+}
+
+func copyOptimizerLog(rootDir string) error {
+	// print session output just like the one of a standalone optimizer
+	f, err := os.Open(filepath.Join(rootDir, optimizerLogName))
+	if err != nil {
+		return errors.Wrap(err, "open optimizer log")
+	}
+
+	defer func() { _ = f.Close() }()
+
+	if _, err = io.Copy(os.Stdout, f); err != nil {
+		return errors.Wrap(err, "copy")
+	}
+
+	return nil
+}
+
+// release frees resources of the worker that has already exited
+func (w *Worker) release() {
+	_ = w.stdin.Close()
+	w.stdin = nil
+	_ = w.cmd.Wait()
+}
+
+// Close stops the worker. Worker finishes the session in progress (if any) before exit.
+func (w *Worker) Close() error {
+	w.mutex.Lock()
+	defer w.mutex.Unlock()
+
+	if w.stdin == nil {
+		return nil
+	}
+
+	// worker exits when its input is closed
+	err := w.stdin.Close()
+	w.stdin = nil
+
+	if err != nil {
+		return errors.Wrap(err, "close stdin")
+	}
+
+	if err = w.cmd.Wait(); err != nil {
+		return errors.Wrap(err, "wait")
+	}
+
+	return nil
+}
@@ -0,0 +1,110 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from rbfoptgo import names
+from rbfoptgo.config import InvalidParameterCombinationRenderPolicy
+
+
+def apply_policy(df: pd.DataFrame, policy: InvalidParameterCombinationRenderPolicy) -> pd.DataFrame:
+    """
+    Handles the evaluations corresponding to ErrInvalidParameterCombination according to the policy
+    :param df: evaluations
+    :param policy: render policy
+    :return: evaluations suitable for rendering
+    """
+    invalid = df[names.InvalidParameterCombination].to_numpy(dtype=bool)
+
+    match policy:
+        case InvalidParameterCombinationRenderPolicy.omit:
+            # Filter values corresponding to ErrInvalidParameterCombination params
+            return df[~invalid]
+        case InvalidParameterCombinationRenderPolicy.assign_closest_valid_value:
+            # avoid white spots on the heatmap
+            unique_costs = np.unique(df[names.Cost].to_numpy())
+            # -1 stands for ErrInvalidParameterCombinationCost, take -2 - the next closest
+            closest_valid_value = unique_costs[-2]
+
+            # make df with replaced values
+            return df.assign(**{names.Cost: np.where(invalid, closest_valid_value, df[names.Cost].to_numpy())})
+        case _:
+            raise ValueError(f"unknown policy: {policy}")
+
+
+class Aggregation:
+    """
+    Aggregation keeps evaluations prepared for rendering with a particular policy,
+    and the minimal cost function values for every value of a parameter and for every pair of values
+    of two parameters. Every reduction is computed at most once and then shared by all the figures.
+    """
+    __df: pd.DataFrame
+    __cost_bounds: Tuple[float, float]
+    __minimums: Dict[str, pd.DataFrame]
+    __pair_minimums: Dict[Tuple[str, str], pd.DataFrame]
+
+    def __init__(self, df: pd.DataFrame, policy: InvalidParameterCombinationRenderPolicy):
+        self.__df = apply_policy(df, policy)
+
+        cost = self.__df[names.Cost].to_numpy()
+        self.__cost_bounds = (cost.min(), cost.max())
+        self.__minimums = {}
+        self.__pair_minimums = {}
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """
+        :return: evaluations prepared for rendering
+        """
+        return self.__df
+
+    @property
+    def cost_bounds(self) -> Tuple[float, float]:
+        """
+        :return: minimal and maximal cost function values
+        """
+        return self.__cost_bounds
+
+    def minimums(self, col_name: str) -> pd.DataFrame:
+        """
+        Picks the best cost function value for every value of a parameter
+        :param col_name: parameter name
+        :return: frame with parameter values and cost function values sorted by parameter values
+        """
+        result = self.__minimums.get(col_name)
+        if result is None:
+            result = self.__reduce([col_name])
+            self.__minimums[col_name] = result
+        return result
+
+    def pair_minimums(self, col_name_1: str, col_name_2: str) -> pd.DataFrame:
+        """
+        Picks the best cost function value for every combination of values of two parameters
+        :param col_name_1: first parameter name
+        :param col_name_2: second parameter name
+        :return: frame with parameter values and cost function values sorted by parameter values
+        """
+        key = (col_name_1, col_name_2)
+        result = self.__pair_minimums.get(key)
+        if result is None:
+            result = self.__reduce([col_name_1, col_name_2])
+            self.__pair_minimums[key] = result
+        return result
+
+    def __reduce(self, col_names: List[str]) -> pd.DataFrame:
+        return self.__df.groupby(col_names, sort=True)[names.Cost].min().reset_index()
+
+    def prepare(self, parameter_names: List[str]):
+        """
+        Computes all the reductions in advance (e.g. before the aggregation is sent to other processes).
+        :param parameter_names: names of parameters
+        :return:
+        """
+        for i, col_name_1 in enumerate(parameter_names):
+            self.minimums(col_name_1)
+            for col_name_2 in parameter_names[i + 1:]:
+                self.pair_minimums(col_name_1, col_name_2)
@@ -0,0 +1,118 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import json
+import os
+from multiprocessing.managers import SyncManager
+from typing import Dict, List, MutableMapping, Optional, Tuple
+
+import jsons
+
+from rbfoptgo import names
+from rbfoptgo.common import Cost
+from rbfoptgo.config import Parameter
+
+Key = Tuple[int, ...]
+
+
+class EvaluationCache:
+    """
+    EvaluationCache memoizes cost function values for the parameter vectors that have been already evaluated.
+    Every new entry is appended to a file, so the next sessions with the same parameter bounds
+    and the same root directory can reuse the results of the previous ones.
+    If manager is provided, cache contents are shared between processes (but the caller is still
+    responsible for the synchronization).
+    """
+    __file_path: os.PathLike
+    __entries: MutableMapping[Key, Tuple[Cost, bool]]
+    __stats: MutableMapping[str, int]
+
+    def __init__(self, file_path: os.PathLike, bounds: List[Parameter], manager: Optional[SyncManager] = None):
+        self.__file_path = file_path
+        self.__entries = manager.dict() if manager else {}
+        self.__stats = manager.dict() if manager else {}
+        self.__stats.update(hits=0, misses=0)
+
+        header = jsons.dump(dict(bounds=bounds))
+        if not self.__load(header):
+            # either there is no cache file yet, or it was made for another set of parameters
+            with open(self.__file_path, "w") as f:
+                f.write(json.dumps(header) + "\n")
+
+    def __load(self, header: Dict) -> bool:
+        if not os.path.exists(self.__file_path):
+            return False
+
+        with open(self.__file_path, "r") as f:
+            lines = f.readlines()
+
+        if not lines or json.loads(lines[0]) != header:
+            print(f"evaluation cache {self.__file_path} does not match parameter bounds, dropping it")
+            return False
+
+        entries: Dict[Key, Tuple[Cost, bool]] = {}
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # the last line may be truncated if the previous session crashed
+                continue
+
+            key = tuple(entry["values"])
+            entries[key] = (entry[names.Cost], entry[names.InvalidParameterCombination])
+
+        # single update is much cheaper for the shared dictionary
+        self.__entries.update(entries)
+
+        print(f"evaluation cache {self.__file_path} loaded: {len(self.__entries)} entries")
+        return True
+
+    def get(self, key: Key) -> Optional[Tuple[Cost, bool]]:
+        """
+        Looks for the previously evaluated cost function value
+        :param key: vector of parameter values
+        :return: cost function value and invalid parameter combination flag, or None if the key is unknown
+        """
+        result = self.__entries.get(key)
+        if result is None:
+            self.__stats["misses"] += 1
+        else:
+            self.__stats["hits"] += 1
+
+        return result
+
+    def put(self, key: Key, cost: Cost, invalid_parameter_combination: bool):
+        """
+        Stores the cost function value both in memory and on disk
+        :param key: vector of parameter values
+        :param cost: cost function value
+        :param invalid_parameter_combination: sign of invalid parameter combination
+        :return:
+        """
+        self.__entries[key] = (cost, invalid_parameter_combination)
+
+        entry = {
+            "values": list(key),
+            names.Cost: cost,
+            names.InvalidParameterCombination: invalid_parameter_combination,
+        }
+        with open(self.__file_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    @property
+    def hits(self) -> int:
+        """
+        :return: number of successful lookups
+        """
+        return self.__stats["hits"]
+
+    @property
+    def misses(self) -> int:
+        """
+        :return: number of failed lookups
+        """
+        return self.__stats["misses"]
+
+    def __len__(self) -> int:
+        return len(self.__entries)
@@ -0,0 +1,98 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import os
+from typing import Callable, Optional
+
+import numpy as np
+import rbfopt
+
+from rbfoptgo.stopping import StopReason
+
+
+class CheckpointingAlgorithm(rbfopt.RbfoptAlgorithm):
+    """
+    RbfoptAlgorithm that is able to survive the crash of the optimizer process.
+    RBFOpt saves its state every `save_state_interval` iterations; before that happens,
+    this class makes the evaluation log persistent too, so that the session can be resumed
+    from the latest checkpoint without evaluating cost function for the points that were already explored.
+    It also finishes optimization as soon as stopping criteria are met.
+    """
+    extra_evaluations: int
+    logged_evaluations: int
+    stop_reason: Optional[StopReason]
+    __var_bounds: np.ndarray
+    __checkpoint_hook: Optional[Callable[[], int]]
+    __stop_hook: Optional[Callable[[], Optional[StopReason]]]
+
+    def __init__(self, settings: rbfopt.RbfoptSettings, black_box: rbfopt.RbfoptBlackBox,
+                 init_node_pos: Optional[np.ndarray] = None, init_node_val: Optional[np.ndarray] = None,
+                 do_init_strategy: bool = True):
+        super().__init__(settings, black_box, init_node_pos, init_node_val, do_init_strategy)
+        # RBFOpt doesn't count the evaluations of the points provided by user
+        self.extra_evaluations = 0 if init_node_val is None else len(init_node_val)
+        self.logged_evaluations = 0
+        self.stop_reason = None
+        self.__var_bounds = self.__bounds_of(black_box)
+        self.__checkpoint_hook = None
+        self.__stop_hook = None
+
+    @staticmethod
+    def __bounds_of(black_box: rbfopt.RbfoptBlackBox) -> np.ndarray:
+        return np.array([black_box.get_var_lower(), black_box.get_var_upper()])
+
+    def attach(
+            self,
+            black_box: rbfopt.RbfoptBlackBox,
+            checkpoint_hook: Callable[[], int],
+            stop_hook: Callable[[], Optional[StopReason]],
+    ):
+        """
+        Binds algorithm to the objective function and to the evaluation log.
+        Must be called after the algorithm is loaded from file.
+        :param black_box: black box to optimize
+        :param checkpoint_hook: persists the evaluation log, returns the number of logged evaluations
+        :param stop_hook: checks stopping criteria, returns the reason to stop or None
+        :return:
+        """
+        if not np.array_equal(self.__var_bounds, self.__bounds_of(black_box)):
+            raise ValueError("saved state belongs to the session with different parameter bounds")
+
+        self.bb = black_box
+        self.__checkpoint_hook = checkpoint_hook
+        self.__stop_hook = stop_hook
+
+    def update_log(self, tag, node_is_noisy=None, obj_value=None, gap=None):
+        """
+        Prints a line to the log. RBFOpt calls it from the main process after every evaluation
+        (both in serial and parallel mode), so it's a convenient place to check stopping criteria.
+        """
+        super().update_log(tag, node_is_noisy, obj_value, gap)
+
+        if self.stop_reason is None and self.__stop_hook is not None:
+            self.stop_reason = self.__stop_hook()
+            if self.stop_reason is not None:
+                super().update_log(f"Stopping: {self.stop_reason.name}")
+                # RBFOpt main loop is finished after the current iteration
+                self.l_settings.max_iterations = self.itercount
+
+    def save_to_file(self, filename: str):
+        """
+        Saves evaluation log and algorithm state. Black box is not saved, since it's not serializable.
+        :param filename: full path to the state file
+        :return:
+        """
+        black_box, checkpoint_hook, stop_hook = self.bb, self.__checkpoint_hook, self.__stop_hook
+        if checkpoint_hook is not None:
+            self.logged_evaluations = checkpoint_hook()
+
+        # never leave half-written state, since it would make resume impossible
+        tmp_filename = f"{filename}.tmp"
+        self.bb, self.__checkpoint_hook, self.__stop_hook = None, None, None
+        try:
+            super().save_to_file(tmp_filename)
+        finally:
+            self.bb, self.__checkpoint_hook, self.__stop_hook = black_box, checkpoint_hook, stop_hook
+
+        os.replace(tmp_filename, filename)
@@ -2,42 +2,94 @@
 #  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
 #  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
 
+import json
+import os
+import socket
+import struct
+import time
 from http import HTTPStatus
-from typing import List
+from typing import BinaryIO, Iterator, List, Optional, Tuple
 from urllib.parse import urljoin
 
 import jsons
 import requests
 
-from rbfoptgo.common import Cost, ParameterValue
+from rbfoptgo.common import Cost, ParameterValue, Timing
 from rbfoptgo.report import Report
 from rbfoptgo import names
 
 
+def remote_timing(queue: float, config_modifier: float, cost_function: float, elapsed: float) -> Timing:
+    """
+    Makes timing of evaluation performed by the Go side
+    :param queue: time spent by the Go side waiting for a free slot
+    :param config_modifier: time spent by the Go side applying parameter values
+    :param cost_function: time spent by the Go side in the cost function
+    :param elapsed: total time from the beginning of request till the response
+    :return: timing, where everything not measured by the Go side is considered as transport overhead
+    """
+    transport = max(elapsed - queue - config_modifier - cost_function, 0.)
+    return Timing(transport=transport, queue=queue, config_modifier=config_modifier, cost_function=cost_function)
+
+
+def request_timeout(evaluation_timeout: float) -> Optional[float]:
+    """
+    Computes how long to wait for the Go side response
+    :param evaluation_timeout: deadline of a single evaluation enforced by the Go side (0 stands for no deadline)
+    :return: timeout in seconds, or None to wait forever
+    """
+    if not evaluation_timeout:
+        return None
+
+    # Go side answers in time even if the cost function hangs, but a point may wait for a free slot
+    # as long as another evaluation takes; the rest is a margin for transport and config modification
+    return 2 * evaluation_timeout + 5.
+
+
 class Client:
     """
     HTTP client to the Go part of library
     """
     url_head: str
     session: requests.Session
+    timeout: Optional[float]
 
-    def __init__(self, endpoint: str):
+    def __init__(self, endpoint: str, session_id: str, timeout: Optional[float] = None):
         self.url_head = f'http://{endpoint}'
+        self.timeout = timeout
         self.session = requests.Session()
+        # Go server may serve several optimization sessions at once
+        self.session.headers[names.SessionIDHeader] = session_id
 
-    def estimate_cost(self, parameter_values: List[ParameterValue]) -> (Cost, bool):
+    def estimate_cost(self, parameter_values: List[ParameterValue]) -> (Cost, bool, bool, Timing):
         """
         Requests a particular cost function value for a given parameters
         :param parameter_values: a vector of parameters
         :return: 1. The value of a cost function
                2. Sign that optimizer gave a vector of parameters that was considered as non-optimal
+               3. Sign that evaluation exceeded the timeout (the cost is the penalty then)
+               4. Time spent at every stage of evaluation (except the optimizer one)
+        """
+        return self.__estimate('estimate_cost', parameter_values)
+
+    def estimate_fast_cost(self, parameter_values: List[ParameterValue]) -> (Cost, bool, bool, Timing):
         """
-        print(f"request '{parameter_values}'")
+        Requests a particular value of the fast (but less accurate) version of cost function
+        :param parameter_values: a vector of parameters
+        :return: the same as estimate_cost
+        """
+        return self.__estimate('estimate_fast_cost', parameter_values)
+
+    def __estimate(self, path: str, parameter_values: List[ParameterValue]) -> (Cost, bool, bool, Timing):
+        print(f"request {path} '{parameter_values}'")
+
+        started_at = time.perf_counter()
 
         payload = dict(parameter_values=parameter_values)
         response = self.session.get(
-            urljoin(self.url_head, 'estimate_cost'),
+            urljoin(self.url_head, path),
             json=jsons.dump(payload),
+            timeout=self.timeout,
         )
 
         print(f"response code={response.status_code} body={response.json()}")
@@ -45,7 +97,54 @@ class Client:
         if response.status_code != HTTPStatus.OK:
             raise ValueError(f'invalid status code {response.status_code}')
 
-        return response.json()[names.Cost], response.json()[names.InvalidParameterCombination]
+        body = response.json()
+        timing = remote_timing(body[names.QueueTime], body[names.ConfigModifierTime], body[names.CostFunctionTime],
+                               time.perf_counter() - started_at)
+
+        return body[names.Cost], body[names.InvalidParameterCombination], body[names.TimedOut], timing
+
+    def estimate_cost_batch(self, batch: List[List[ParameterValue]]) -> Iterator[Tuple[int, Cost, bool, bool, Timing]]:
+        """
+        Requests cost function values for several vectors of parameters at once.
+        Go side evaluates them in arbitrary order and streams results back as soon as they're ready.
+        :param batch: list of parameter vectors
+        :return: iterator over the tuples: 1. Index of a vector in a batch
+               2. The value of a cost function
+               3. Sign that optimizer gave a vector of parameters that was considered as non-optimal
+               4. Sign that evaluation exceeded the timeout
+               5. Time spent at every stage of evaluation (except the optimizer one)
+        """
+        print(f"request batch of {len(batch)} points")
+
+        # all the points are evaluated concurrently, so every one of them takes the time since the request start
+        started_at = time.perf_counter()
+
+        payload = dict(batch=[dict(parameter_values=parameter_values) for parameter_values in batch])
+        with self.session.get(
+                urljoin(self.url_head, 'estimate_cost_batch'),
+                json=jsons.dump(payload),
+                stream=True,
+                timeout=self.timeout,  # for streamed response it limits the waiting time for every item
+        ) as response:
+            # the status is OK even in case of error if it happens after the first results were sent
+            if response.status_code != HTTPStatus.OK:
+                raise ValueError(f'invalid status code {response.status_code}')
+
+            for line in response.iter_lines():
+                if not line:
+                    continue
+
+                item = json.loads(line)
+                print(f"response item={item}")
+
+                if item.get("error"):
+                    raise ValueError(f"point {item['index']}: {item['error']}")
+
+                timing = remote_timing(item[names.QueueTime], item[names.ConfigModifierTime],
+                                       item[names.CostFunctionTime], time.perf_counter() - started_at)
+
+                yield (item["index"], item[names.Cost], item[names.InvalidParameterCombination], item[names.TimedOut],
+                       timing)
 
     def register_report(self, report: Report):
         """
@@ -65,3 +164,113 @@ class Client:
 
         if response.status_code != HTTPStatus.OK:
             raise ValueError(f'invalid status code {response.status_code}')
+
+
+class UnixSocketClient(Client):
+    """
+    Client requesting cost function values over Unix domain socket using compact binary protocol
+    (see optimization/transport.go for the description). Reports and fast evaluations are still sent over HTTP.
+    """
+    socket_path: os.PathLike
+    __endpoint: str
+    __session_id: str
+    __socket: Optional[socket.socket]
+    __reader: Optional[BinaryIO]
+
+    __response_header = struct.Struct("<Bdddd")
+    __error_length = struct.Struct("<I")
+
+    STATUS_INVALID_PARAMETER_COMBINATION = 1
+    STATUS_ERROR = 2
+    STATUS_TIMED_OUT = 3
+
+    # the same as unixSocketPipelineDepth on the Go side
+    PIPELINE_DEPTH = 256
+
+    def __init__(self, endpoint: str, session_id: str, socket_path: os.PathLike, timeout: Optional[float] = None):
+        super().__init__(endpoint, session_id, timeout)
+        self.socket_path = socket_path
+        self.__endpoint = endpoint
+        self.__session_id = session_id
+        self.__socket = None
+        self.__reader = None
+
+    def __reduce__(self):
+        # in parallel mode client is copied to the worker processes, and each of them needs its own connection
+        return self.__class__, (self.__endpoint, self.__session_id, self.socket_path, self.timeout)
+
+    def __connect(self):
+        if self.__socket is None:
+            self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.__socket.settimeout(self.timeout)
+            self.__socket.connect(str(self.socket_path))
+            self.__reader = self.__socket.makefile("rb")
+
+    def __disconnect(self):
+        if self.__socket is not None:
+            self.__reader.close()
+            self.__socket.close()
+            self.__socket, self.__reader = None, None
+
+    def estimate_cost(self, parameter_values: List[ParameterValue]) -> (Cost, bool, bool, Timing):
+        """
+        Requests a particular cost function value for a given parameters
+        :param parameter_values: a vector of parameters (in the order of parameters in config)
+        :return: 1. The value of a cost function
+               2. Sign that optimizer gave a vector of parameters that was considered as non-optimal
+               3. Sign that evaluation exceeded the timeout (the cost is the penalty then)
+               4. Time spent at every stage of evaluation (except the optimizer one)
+        """
+        self.__connect()
+
+        started_at = time.perf_counter()
+        self.__socket.sendall(self.__pack(parameter_values))
+        return self.__receive(started_at)
+
+    def estimate_cost_batch(self, batch: List[List[ParameterValue]]) -> Iterator[Tuple[int, Cost, bool, bool, Timing]]:
+        """
+        Requests cost function values for several vectors of parameters at once. Requests are pipelined,
+        so Go side evaluates them concurrently (as far as slots allow), and answers in the order of requests.
+        :param batch: list of parameter vectors
+        :return: iterator over the tuples: index of a vector in a batch, cost, sign of invalid parameter combination,
+                 sign of timeout, time spent at every stage of evaluation
+        """
+        self.__connect()
+
+        # all the points are evaluated concurrently, so every one of them takes the time since the request start
+        started_at = time.perf_counter()
+
+        completed = False
+        try:
+            # Go side doesn't read more requests until it answers the previous ones
+            for begin in range(0, len(batch), self.PIPELINE_DEPTH):
+                window = batch[begin:begin + self.PIPELINE_DEPTH]
+                self.__socket.sendall(b"".join(self.__pack(parameter_values) for parameter_values in window))
+                for i in range(begin, begin + len(window)):
+                    yield (i, *self.__receive(started_at))
+            completed = True
+        finally:
+            # unread responses would be taken for the answers to the next requests
+            if not completed:
+                self.__disconnect()
+
+    @staticmethod
+    def __pack(parameter_values: List[ParameterValue]) -> bytes:
+        n = len(parameter_values)
+        return struct.pack(f"<I{n}q", n, *(pv.value for pv in parameter_values))
+
+    def __receive(self, started_at: float) -> (Cost, bool, bool, Timing):
+        data = self.__reader.read(self.__response_header.size)
+        if len(data) != self.__response_header.size:
+            raise ValueError("connection closed by server")
+
+        status, cost, queue, config_modifier, cost_function = self.__response_header.unpack(data)
+        if status == self.STATUS_ERROR:
+            (length,) = self.__error_length.unpack(self.__reader.read(self.__error_length.size))
+            raise ValueError(f"estimate cost: {self.__reader.read(length).decode()}")
+
+        timing = remote_timing(queue, config_modifier, cost_function, time.perf_counter() - started_at)
+
+        # timed out point is penalized like an invalid one
+        timed_out = status == self.STATUS_TIMED_OUT
+        return cost, timed_out or status == self.STATUS_INVALID_PARAMETER_COMBINATION, timed_out, timing
@@ -3,6 +3,7 @@
 #  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
 
 from dataclasses import dataclass
+from typing import Sequence, Tuple
 
 Cost = float
 
@@ -14,3 +15,34 @@ class ParameterValue:
     """
     name: str
     value: int
+
+
+@dataclass
+class Timing:
+    """
+    Represents the time (in seconds) spent at every stage of evaluation
+    """
+    optimizer: float = 0.  # RBFOpt model and search steps since the previous evaluation
+    transport: float = 0.  # request to the Go side: network, serialization
+    queue: float = 0.  # waiting for a free slot on the Go side
+    config_modifier: float = 0.  # applying parameter values to the configuration
+    cost_function: float = 0.  # cost function call
+
+    def astuple(self) -> Tuple[float, ...]:
+        """
+        :return: durations in the order of fields (unlike dataclasses.astuple, it doesn't copy them deeply)
+        """
+        return self.optimizer, self.transport, self.queue, self.config_modifier, self.cost_function
+
+
+@dataclass
+class Evaluation:
+    """
+    Represents the result of a single cost function evaluation as it's recorded to the log and to the store
+    """
+    values: Sequence[int]  # parameter values
+    iteration: int  # iteration number
+    cost: Cost  # cost function value
+    invalid_parameter_combination: bool  # sign of invalid parameter combination
+    timed_out: bool  # sign of evaluation timeout (the point is penalized as invalid one)
+    timing: Timing  # time spent at every stage of evaluation
@@ -2,13 +2,14 @@
 #  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
 #  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
 import json
+import math
 import os
 import pathlib
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from time import mktime
 from enum import Enum
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Optional
 
 import numpy as np
 
@@ -33,6 +34,15 @@ class Bound:
         return Bound(_left, _right)
 
 
+class Scale(Enum):
+    """
+    Describes how optimizer explores the range of parameter values.
+    """
+    linear = 1
+    log = 2
+    power_of_two = 3
+
+
 @dataclass
 class Parameter:
     """
@@ -40,6 +50,7 @@ class Parameter:
     """
     bound: Bound
     name: str
+    scale: Scale = Scale.linear
 
     @staticmethod
     def from_dict(obj: Any) -> 'Parameter':
@@ -50,7 +61,88 @@ class Parameter:
         """
         _bound = Bound.from_dict(obj.get("bound"))
         _name = str(obj.get("name"))
-        return Parameter(_bound, _name)
+        _scale = Scale[str(obj.get("scale", Scale.linear.name))]
+        return Parameter(_bound, _name, _scale)
+
+    @property
+    def var_type(self) -> str:
+        """
+        :return: type of the optimizer variable in terms of RBFOpt
+        """
+        # logarithms of integers are not integers
+        return 'R' if self.scale == Scale.log else 'I'
+
+    def encode(self, value: int) -> float:
+        """
+        Maps parameter value to the optimizer space
+        :param value: parameter value
+        :return: optimizer variable value
+        """
+        match self.scale:
+            case Scale.log:
+                return math.log(value)
+            case Scale.power_of_two:
+                return float(value.bit_length() - 1)
+            case _:
+                return float(value)
+
+    def decode(self, raw_value: float) -> int:
+        """
+        Maps optimizer variable value to the parameter value
+        :param raw_value: optimizer variable value
+        :return: parameter value within bounds
+        """
+        match self.scale:
+            case Scale.log:
+                value = int(np.rint(np.exp(raw_value)))
+            case Scale.power_of_two:
+                value = 2 ** int(np.rint(raw_value))
+            case _:
+                value = int(np.rint(raw_value))
+
+        return min(max(value, self.bound.left), self.bound.right)
+
+
+@dataclass
+class Constraint:
+    """
+    Linear inequality over cost function parameters: sum(coefficients[name] * value) <= upper_bound
+    """
+    coefficients: Dict[str, float]
+    upper_bound: float
+
+    @staticmethod
+    def from_dict(obj: Any) -> 'Constraint':
+        """
+        Constructs object from an arbitrary dictionary
+        :param obj: Dictionary with parameter values
+        :return: an object of desired type
+        """
+        _coefficients = {str(k): float(v) for k, v in obj.get("coefficients").items()}
+        _upper_bound = float(obj.get("upper_bound"))
+        return Constraint(_coefficients, _upper_bound)
+
+
+@dataclass
+class ScreeningConfig:
+    """
+    Configuration of the screening phase (Morris method) performed before the main optimization
+    """
+    trajectories: int = 4  # number of one-at-a-time paths through the grid
+    levels: int = 4  # number of grid values of every parameter
+    threshold: float = 0.1  # parameters less sensitive than this share of the most sensitive one are frozen
+
+    @staticmethod
+    def from_dict(obj: Any) -> 'ScreeningConfig':
+        """
+        Constructs object from an arbitrary dictionary
+        :param obj: Dictionary with parameter values
+        :return: an object of desired type
+        """
+        _trajectories = int(obj.get("trajectories", 4))
+        _levels = int(obj.get("levels", 4))
+        _threshold = float(obj.get("threshold", 0.1))
+        return ScreeningConfig(_trajectories, _levels, _threshold)
 
 
 class InvalidParameterCombinationRenderPolicy(Enum):
@@ -62,6 +154,23 @@ class InvalidParameterCombinationRenderPolicy(Enum):
     assign_closest_valid_value = 2
 
 
+class RenderMode(Enum):
+    """
+    Describes when plots are rendered.
+    """
+    inline = 1
+    skip = 2
+    background = 3
+
+
+class Transport(Enum):
+    """
+    Describes the way optimizer requests cost function values from the Go side.
+    """
+    http = 1
+    unix_socket = 2
+
+
 @dataclass
 class PlotConfig:
     """
@@ -69,6 +178,9 @@ class PlotConfig:
     """
     scatter_plot_policy: InvalidParameterCombinationRenderPolicy
     heatmap_render_policy: InvalidParameterCombinationRenderPolicy
+    workers: int = 1
+    interpolation_cache: bool = False
+    render_mode: RenderMode = RenderMode.inline
 
     @staticmethod
     def from_dict(obj: Any) -> 'PlotConfig':
@@ -79,11 +191,14 @@ class PlotConfig:
         """
         _scatter_plot_policy = InvalidParameterCombinationRenderPolicy[str(obj.get("scatter_plot_policy"))]
         _heatmap_render_policy = InvalidParameterCombinationRenderPolicy[str(obj.get("heatmap_render_policy"))]
-        return PlotConfig(_scatter_plot_policy, _heatmap_render_policy)
+        _workers = int(obj.get("workers", 1))
+        _interpolation_cache = bool(obj.get("interpolation_cache", False))
+        _render_mode = RenderMode[str(obj.get("render_mode", RenderMode.inline.name))]
+        return PlotConfig(_scatter_plot_policy, _heatmap_render_policy, _workers, _interpolation_cache, _render_mode)
 
 
 @dataclass
-class RBFOptConfig:
+class RBFOptConfig:  # pylint: disable=too-many-instance-attributes
     """
     Configuration of RBFOpt library.
     """
@@ -92,6 +207,18 @@ class RBFOptConfig:
     max_iterations: int
     init_strategy: str
     invalid_parameter_combination_cost: int
+    num_cpus: int
+    seed: int  # 0 stands for the seed derived from the current time; reproducible only if num_cpus == 1
+    time_limit: float = 0.  # seconds, 0 stands for no limit
+    target_cost: Optional[float] = None
+    stagnation_evaluations: int = 0  # 0 stands for no limit
+    stagnation_tolerance: float = 0.
+    evaluation_timeout: float = 0.  # seconds, deadline of a single evaluation enforced by Go side, 0 stands for none
+    fast_cost_function: bool = False  # Go side provides cheap but less accurate version of cost function
+    fast_cost_function_error: float = 0.  # relative error of the fast cost function
+    max_fast_evaluations: int = 0  # 0 stands for RBFOpt default
+    constraints: List[Constraint] = field(default_factory=list)
+    screening: Optional[ScreeningConfig] = None  # no screening phase if None
 
     @staticmethod
     def from_dict(obj: Any) -> 'RBFOptConfig':
@@ -105,8 +232,23 @@ class RBFOptConfig:
         _max_iterations = int(obj.get("max_iterations"))
         _init_strategy = str(obj.get("init_strategy"))
         _invalid_parameter_combination_cost = int(obj.get("invalid_parameter_combination_cost"))
+        _num_cpus = int(obj.get("num_cpus", 1))
+        _seed = int(obj.get("seed", 0))
+        _time_limit = float(obj.get("time_limit", 0))
+        _target_cost = obj.get("target_cost")
+        _target_cost = float(_target_cost) if _target_cost is not None else None
+        _stagnation_evaluations = int(obj.get("stagnation_evaluations", 0))
+        _stagnation_tolerance = float(obj.get("stagnation_tolerance", 0))
+        _evaluation_timeout = float(obj.get("evaluation_timeout", 0))
+        _fast_cost_function = bool(obj.get("fast_cost_function", False))
+        _fast_cost_function_error = float(obj.get("fast_cost_function_error", 0))
+        _max_fast_evaluations = int(obj.get("max_fast_evaluations", 0))
+        _constraints = [Constraint.from_dict(y) for y in obj.get("constraints") or []]
+        _screening = ScreeningConfig.from_dict(obj.get("screening")) if obj.get("screening") is not None else None
         return RBFOptConfig(_parameters, _max_evaluations, _max_iterations, _init_strategy,
-                            _invalid_parameter_combination_cost)
+                            _invalid_parameter_combination_cost, _num_cpus, _seed, _time_limit, _target_cost,
+                            _stagnation_evaluations, _stagnation_tolerance, _evaluation_timeout, _fast_cost_function,
+                            _fast_cost_function_error, _max_fast_evaluations, _constraints, _screening)
 
     @property
     def var_names(self) -> List[str]:
@@ -129,12 +271,12 @@ class RBFOptConfig:
         dimensions = len(self.parameters)
         var_lower = np.zeros(shape=(dimensions,))
         var_upper = np.zeros(shape=(dimensions,))
-        var_types = np.chararray(shape=(dimensions,))
+        var_types = np.array([param.var_type for param in self.parameters])
 
+        # optimizer explores the space of encoded values
         for i, param in enumerate(self.parameters):
-            var_lower[i] = param.bound.left
-            var_upper[i] = param.bound.right
-            var_types[i] = 'I'
+            var_lower[i] = param.encode(param.bound.left)
+            var_upper[i] = param.encode(param.bound.right)
 
         return dict(
             dimension=dimensions,
@@ -149,16 +291,20 @@ class RBFOptConfig:
         Returns dictionary with RBFOpt settings.
         :return: Dict with settings.
         """
-        return dict(
+        settings = dict(
             max_evaluations=self.max_evaluations,
             max_iterations=self.max_iterations,
-            rand_seed=int(mktime(datetime.now().timetuple())),
+            rand_seed=self.seed or int(mktime(datetime.now().timetuple())),
             init_strategy=self.init_strategy,
+            num_cpus=self.num_cpus,
         )
+        if self.max_fast_evaluations:
+            settings.update(max_noisy_evaluations=self.max_fast_evaluations)
+        return settings
 
 
 @dataclass
-class Config:
+class Config:  # pylint: disable=too-many-instance-attributes
     """
     A configuration for the Python part of rbfopt-go
     """
@@ -166,6 +312,15 @@ class Config:
     endpoint: str
     rbfopt: RBFOptConfig
     plot: PlotConfig
+    evaluation_cache: bool
+    transport: Transport
+    checkpoint_interval: int
+    resume: bool
+    log_sync_interval: int
+    session_id: str
+    profile: bool
+    warm_start_root_dirs: List[pathlib.Path] = field(default_factory=list)
+    warm_start_reuse_costs: bool = False  # the points of the previous sessions are not evaluated again
 
     @staticmethod
     def from_dict(obj: Any) -> 'Config':
@@ -178,7 +333,18 @@ class Config:
         _endpoint = str(obj.get("endpoint"))
         _rbfopt = RBFOptConfig.from_dict(obj.get("rbfopt"))
         _plot = PlotConfig.from_dict(obj.get("plot"))
-        return Config(_root_dir, _endpoint, _rbfopt, _plot)
+        _evaluation_cache = bool(obj.get("evaluation_cache", False))
+        _transport = Transport[str(obj.get("transport", Transport.http.name))]
+        _checkpoint_interval = int(obj.get("checkpoint_interval", 1))
+        _resume = bool(obj.get("resume", False))
+        _log_sync_interval = int(obj.get("log_sync_interval", 0))
+        _session_id = str(obj.get("session_id", ""))
+        _profile = bool(obj.get("profile", False))
+        _warm_start_root_dirs = [pathlib.Path(str(y)) for y in obj.get("warm_start_root_dirs") or []]
+        _warm_start_reuse_costs = bool(obj.get("warm_start_reuse_costs", False))
+        return Config(_root_dir, _endpoint, _rbfopt, _plot, _evaluation_cache, _transport, _checkpoint_interval,
+                      _resume, _log_sync_interval, _session_id, _profile, _warm_start_root_dirs,
+                      _warm_start_reuse_costs)
 
     @staticmethod
     def from_file(path: os.PathLike) -> 'Config':
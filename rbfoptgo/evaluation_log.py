@@ -0,0 +1,138 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import csv
+import io
+import os
+from multiprocessing.managers import SyncManager
+from typing import List, MutableMapping, Optional, TextIO
+
+import numpy as np
+import pandas as pd
+
+from rbfoptgo import names
+from rbfoptgo.common import Evaluation
+
+
+def read_evaluation_log(file_path: os.PathLike) -> pd.DataFrame:
+    """
+    Reads evaluation log written by EvaluationLog
+    :param file_path: full path to the log
+    :return: evaluations in the order of their completion
+    """
+    # the last record is incomplete if the optimizer crashed while writing it,
+    # and it may be cut in the middle of a field, so it's dropped in the same way as EvaluationLog does
+    with open(file_path, "rb") as f:
+        data = f.read()
+    df = pd.read_csv(io.BytesIO(data[:data.rfind(b"\n") + 1])).dropna()
+    # the logs written before timeouts were recorded
+    if names.TimedOut not in df.columns:
+        df.insert(df.columns.get_loc(names.InvalidParameterCombination) + 1, names.TimedOut, False)
+    dtypes = {column: np.int64 for column in df.columns}
+    dtypes.update({name: np.float64 for name in names.Timings if name in df.columns})
+    dtypes.update({names.Cost: np.float64, names.InvalidParameterCombination: bool, names.TimedOut: bool})
+    return df.astype(dtypes)
+
+
+class EvaluationLog:
+    """
+    EvaluationLog writes every evaluation to the CSV file right after it's finished,
+    so one can watch the progress with external tools. The log doesn't keep records in memory.
+    File is fsync'ed every `sync_interval` records, or only on explicit `sync` calls if it's 0.
+    If manager is provided, the number of records is shared between processes (but the caller is still
+    responsible for the synchronization). The file stays open for appending, every process opens it on its own.
+    """
+    __file_path: os.PathLike
+    __columns: List[str]
+    __sync_interval: int
+    __stats: MutableMapping[str, int]
+    __file: Optional[TextIO]
+
+    def __init__(
+            self,
+            file_path: os.PathLike,
+            parameter_names: List[str],
+            sync_interval: int,
+            resume: bool = False,
+            manager: Optional[SyncManager] = None,
+    ):
+        self.__file_path = file_path
+        self.__columns = [*parameter_names, names.Iteration, names.Cost, names.InvalidParameterCombination,
+                          names.TimedOut, *names.Timings]
+        self.__sync_interval = sync_interval
+        self.__stats = manager.dict() if manager else {}
+        self.__stats.update(records=0)
+        self.__file = None
+
+        if resume and os.path.exists(self.__file_path):
+            self.__repair()
+        else:
+            with open(self.__file_path, "w", newline="") as f:
+                csv.writer(f).writerow(self.__columns)
+
+    def __repair(self):
+        # drop incomplete record, otherwise the next one would be appended to it
+        with open(self.__file_path, "rb+") as f:
+            data = f.read()
+            f.truncate(data.rfind(b"\n") + 1)
+
+        with open(self.__file_path, "r") as f:
+            self.__stats["records"] = sum(1 for _ in f) - 1
+
+    def append(self, evaluation: Evaluation):
+        """
+        Writes evaluation to the end of the log
+        :param evaluation: evaluation result
+        :return:
+        """
+        if self.__file is None:
+            self.__file = open(self.__file_path, "a", newline="")  # pylint: disable=consider-using-with
+
+        row = [*evaluation.values, evaluation.iteration, evaluation.cost, evaluation.invalid_parameter_combination,
+               evaluation.timed_out, *evaluation.timing.astuple()]
+        csv.writer(self.__file).writerow(row)
+        # the record must be visible to readers and to the other processes right away
+        self.__file.flush()
+
+        self.__stats["records"] += 1
+        if self.__sync_interval and self.__stats["records"] % self.__sync_interval == 0:
+            os.fsync(self.__file.fileno())
+
+    def close(self):
+        """
+        Closes the file opened by append (the log is still usable, the file is opened again if needed)
+        :return:
+        """
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def __del__(self):
+        self.close()
+
+    def __getstate__(self):
+        # open file is not shared with the other processes
+        state = self.__dict__.copy()
+        state["_EvaluationLog__file"] = None
+        return state
+
+    def sync(self) -> int:
+        """
+        Makes all the records persistent regardless of sync interval.
+        :return: number of records in the log
+        """
+        with open(self.__file_path, "a") as f:
+            os.fsync(f.fileno())
+
+        return self.__stats["records"]
+
+    def read(self) -> pd.DataFrame:
+        """
+        Reads the whole log
+        :return: evaluations in the order of their completion
+        """
+        return read_evaluation_log(self.__file_path)
+
+    def __len__(self) -> int:
+        return self.__stats["records"]
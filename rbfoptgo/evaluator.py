@@ -3,43 +3,150 @@
 #  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
 
 import pathlib
-from typing import List
+import threading
+import time
+from multiprocessing.managers import SyncManager
+from typing import List, MutableMapping, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
-from rbfoptgo.common import Cost, ParameterValue
+from rbfoptgo.cache import EvaluationCache
+from rbfoptgo.common import Cost, Evaluation, ParameterValue, Timing
 from rbfoptgo.client import Client
 from rbfoptgo.config import Config
+from rbfoptgo.evaluation_log import EvaluationLog
+from rbfoptgo.feasibility import Feasibility
 from rbfoptgo.report import Report
+from rbfoptgo.screening import Sensitivity
+from rbfoptgo.stopping import StoppingCriteria, StopReason
+from rbfoptgo.store import EvaluationStore
 from rbfoptgo import names
 
 
-class Evaluator:
+class Evaluator:  # pylint: disable=too-many-instance-attributes
     """
     Evaluator is responsible for cost function estimation. It performs HTTP calls to the Golang part of a library.
+    Evaluator is thread-safe. When RBFOpt runs in parallel mode, it calls Evaluator from the pool of worker processes,
+    so one should provide a manager to share Evaluator state between them.
     """
     __config: Config
     __client: Client
     __parameter_names: List[str]
-    __evaluations: []
+    __log: EvaluationLog
+    __evaluations: Optional[EvaluationStore]
     __root_dir: pathlib.Path
     __report: Report
-    __iterations: int
+    __counters: MutableMapping[str, int]
+    __cache: Optional[EvaluationCache]
+    __replay: MutableMapping[Tuple[int, ...], List[Tuple[Cost, bool]]]
+    __feasibility: Feasibility
+    __stopping: StoppingCriteria
+    __lock: threading.Lock
+    __evaluated_at: float
 
-    def __init__(self, config: Config, client: Client, parameter_names: List[str], root_dir: pathlib.Path):
+    def __init__(self, config: Config, client: Client, parameter_names: List[str], root_dir: pathlib.Path,
+                 manager: Optional[SyncManager] = None):
         self.__config = config
         self.__client = client
         self.__parameter_names = parameter_names
-        self.__evaluations = []
         self.__root_dir = root_dir
-        self.__iterations = 0
+
+        if manager:
+            self.__lock = manager.Lock()
+            self.__counters = manager.dict()
+            self.__replay = manager.dict()
+        else:
+            self.__lock = threading.Lock()
+            self.__counters = {}
+            self.__replay = {}
+        self.__counters[names.Iteration] = 0
+        self.__counters[names.Rejections] = 0
+
+        self.__feasibility = Feasibility(config.rbfopt, manager)
+        self.__stopping = StoppingCriteria(config.rbfopt, manager)
+
+        # time spent by the optimizer is measured between evaluations (within the process)
+        self.__evaluated_at = time.perf_counter()
+
+        self.__log = EvaluationLog(
+            root_dir.joinpath("evaluations.csv"), parameter_names, config.log_sync_interval, config.resume, manager,
+        )
+
+        # in sequential mode evaluations are also kept in memory (8 bytes per column, see EvaluationStore),
+        # so they are rendered without parsing the log; in parallel mode evaluations are recorded by worker processes,
+        # and the log is the only place where they meet
+        self.__evaluations = EvaluationStore(parameter_names) if manager is None else None
+
+        self.__cache = None
+        if config.evaluation_cache:
+            self.__cache = EvaluationCache(
+                root_dir.joinpath("evaluation_cache.jsonl"), config.rbfopt.parameters, manager,
+            )
+
+    def checkpoint(self) -> int:
+        """
+        Makes the evaluations performed so far persistent, so that they survive the crash of the optimizer.
+        :return: number of saved evaluations
+        """
+        with self.__lock:
+            return self.__log.sync()
+
+    def restore(self, logged_evaluations: int):
+        """
+        Takes into account the evaluations logged by the interrupted session.
+        The ones that were made after the RBFOpt state checkpoint will be proposed by RBFOpt again,
+        so they are replayed instead of being evaluated twice.
+        :param logged_evaluations: number of evaluations known to the restored RBFOpt state
+        :return:
+        """
+        evaluations = self.__log.read()
+        if evaluations.empty:
+            return
+
+        pending = evaluations.iloc[logged_evaluations:]
+        keys = pending[self.__parameter_names].to_numpy()
+        results = zip(pending[names.Cost], pending[names.InvalidParameterCombination])
+
+        with self.__lock:
+            self.__counters[names.Iteration] = int(evaluations[names.Iteration].max())
+            if self.__evaluations is not None:
+                self.__evaluations.extend(evaluations)
+
+            for key, (cost, invalid_parameter_combination) in zip(map(tuple, keys.tolist()), results):
+                self.__replay[key] = self.__replay.get(key, []) + [(cost, bool(invalid_parameter_combination))]
+
+            for cost, invalid_parameter_combination in zip(evaluations[names.Cost],
+                                                           evaluations[names.InvalidParameterCombination]):
+                self.__stopping.observe(cost, bool(invalid_parameter_combination))
+
+            # timed out points are penalized, but they are not known to be invalid
+            invalid = evaluations[evaluations[names.InvalidParameterCombination] & ~evaluations[names.TimedOut]]
+            for key in map(tuple, invalid[self.__parameter_names].to_numpy().tolist()):
+                self.__feasibility.remember(key)
+
+    def stop_reason(self) -> Optional[StopReason]:
+        """
+        Checks stopping criteria
+        :return: the reason to finish optimization before RBFOpt exhausts its limits, or None
+        """
+        with self.__lock:
+            return self.__stopping.reason()
+
+    def remaining_time(self) -> float:
+        """
+        :return: seconds left before the time limit is exceeded (infinity if there is no limit)
+        """
+        with self.__lock:
+            return self.__stopping.remaining_time()
 
     def __np_array_to_parameter_values(self, raw_values: np.ndarray) -> List[ParameterValue]:
+        # optimizer works with encoded values (see Parameter.scale)
+        parameters = self.__config.rbfopt.parameters
         parameter_values = []
         for i, raw_value in enumerate(raw_values):
             parameter_values.append(
-                ParameterValue(name=self.__parameter_names[i], value=int(raw_value)),
+                ParameterValue(name=self.__parameter_names[i], value=parameters[i].decode(raw_value)),
             )
         return parameter_values
 
@@ -48,21 +155,135 @@ class Evaluator:
         :param raw_values: vector of cost function arguments
         :return: cost function particular value
         """
-        self.__iterations += 1
+        started_at = time.perf_counter()
 
         parameter_values = self.__np_array_to_parameter_values(raw_values)
-        cost, invalid_parameter_combination = self.__client.estimate_cost(parameter_values)
+        iteration, cached = self.__prepare(parameter_values)
 
-        # store evaluation result for the future use
-        entry = dict(zip(self.__parameter_names, raw_values))
-        entry[names.Iteration] = self.__iterations
-        entry[names.Cost] = cost
-        entry[names.InvalidParameterCombination] = invalid_parameter_combination
+        # the lock is not held during the request, so several evaluations can be performed simultaneously
+        if cached is not None:
+            (cost, invalid_parameter_combination), timed_out = cached, False
+            timing = Timing()
+        else:
+            cost, invalid_parameter_combination, timed_out, timing = self.__client.estimate_cost(parameter_values)
+        timing.optimizer = started_at - self.__evaluated_at
 
-        self.__evaluations.append(entry)
+        if iteration is not None:
+            self.__store(parameter_values, iteration, cost, invalid_parameter_combination, timed_out, cached is None,
+                         timing)
 
+        self.__evaluated_at = time.perf_counter()
         return cost
 
+    def estimate_fast_cost(self, raw_values: np.ndarray) -> np.ndarray:
+        """
+        Evaluates the fast version of cost function. Such evaluations are used by RBFOpt to screen candidate points,
+        they are neither cached nor logged, and don't affect stopping criteria.
+        :param raw_values: vector of cost function arguments
+        :return: approximate cost function value, and its lower and upper error bounds
+        """
+        parameter_values = self.__np_array_to_parameter_values(raw_values)
+        cost, invalid_parameter_combination, _, _ = self.__client.estimate_fast_cost(parameter_values)
+
+        error = 0. if invalid_parameter_combination else abs(cost) * self.__config.rbfopt.fast_cost_function_error
+
+        # don't attribute the time of fast evaluation to the optimizer
+        self.__evaluated_at = time.perf_counter()
+        return np.array([cost, -error, error])
+
+    def estimate_cost_batch(self, raw_values_batch: np.ndarray) -> np.ndarray:
+        """
+        Evaluates several points within a single request to Go side,
+        which is free to schedule these evaluations in any order.
+        :param raw_values_batch: matrix with vectors of cost function arguments in rows
+        :return: vector of cost function values
+        """
+        started_at = time.perf_counter()
+        costs = np.zeros(shape=(len(raw_values_batch),))
+
+        # the time spent by the optimizer before the batch is attributed to the first evaluation
+        optimizer_time = started_at - self.__evaluated_at
+
+        def timing_of(timing: Timing) -> Timing:
+            nonlocal optimizer_time
+            timing.optimizer, optimizer_time = optimizer_time, 0.
+            return timing
+
+        batch = []
+        for i, raw_values in enumerate(raw_values_batch):
+            parameter_values = self.__np_array_to_parameter_values(raw_values)
+            iteration, cached = self.__prepare(parameter_values)
+
+            if cached is not None:
+                costs[i] = cached[0]
+                if iteration is not None:
+                    self.__store(parameter_values, iteration, *cached, False, False, timing_of(Timing()))
+            else:
+                batch.append((i, parameter_values, iteration))
+
+        if batch:
+            results = self.__client.estimate_cost_batch([parameter_values for _, parameter_values, _ in batch])
+            for j, cost, invalid_parameter_combination, timed_out, timing in results:
+                i, parameter_values, iteration = batch[j]
+                costs[i] = cost
+                self.__store(parameter_values, iteration, cost, invalid_parameter_combination, timed_out, True,
+                             timing_of(timing))
+
+        self.__evaluated_at = time.perf_counter()
+        return costs
+
+    def __prepare(self, parameter_values: List[ParameterValue]) -> (Optional[int], Optional[Tuple[Cost, bool]]):
+        # all parameters are integer, so the same point may be proposed by optimizer more than once
+        key = tuple(pv.value for pv in parameter_values)
+
+        with self.__lock:
+            # evaluation is already recorded by the interrupted session, so there is no new iteration
+            replayed = self.__replay.get(key)
+            if replayed:
+                if len(replayed) > 1:
+                    self.__replay[key] = replayed[1:]
+                else:
+                    del self.__replay[key]
+                return None, replayed[0]
+
+            self.__counters[names.Iteration] += 1
+            iteration = self.__counters[names.Iteration]
+            cached = self.__cache.get(key) if self.__cache is not None else None
+
+            # the point is known to be an invalid parameter combination, so there is no need to ask Go side
+            if cached is None and not self.__feasibility.feasible(key):
+                self.__counters[names.Rejections] += 1
+                cached = (self.__config.rbfopt.invalid_parameter_combination_cost, True)
+
+        return iteration, cached
+
+    def __store(
+            self,
+            parameter_values: List[ParameterValue],
+            iteration: int,
+            cost: Cost,
+            invalid_parameter_combination: bool,
+            timed_out: bool,
+            evaluated: bool,
+            timing: Timing,
+    ):
+        # store evaluation result for the future use
+        values = [pv.value for pv in parameter_values]
+
+        # the penalty of timed out evaluation is not a property of the point, it may be lucky next time
+        remember = evaluated and not timed_out
+
+        with self.__lock:
+            if remember and self.__cache is not None:
+                self.__cache.put(tuple(values), cost, invalid_parameter_combination)
+            if remember and invalid_parameter_combination:
+                self.__feasibility.remember(tuple(values))
+            self.__stopping.observe(cost, invalid_parameter_combination)
+            evaluation = Evaluation(values, iteration, cost, invalid_parameter_combination, timed_out, timing)
+            self.__log.append(evaluation)
+            if self.__evaluations is not None:
+                self.__evaluations.append(evaluation)
+
     def register_report(
             self,
             cost: Cost,
@@ -70,6 +291,9 @@ class Evaluator:
             iterations: int,
             evaluations: int,
             fast_evaluations: int,
+            seed: int,
+            stop_reason: StopReason,
+            sensitivities: Optional[List[Sensitivity]] = None,
     ):
         """
         Registers final report.
@@ -78,6 +302,9 @@ class Evaluator:
         :param iterations: number of iterations performed
         :param evaluations: number of evaluations performed
         :param fast_evaluations: number of fast_evaluations
+        :param seed: random seed used by RBFOpt
+        :param stop_reason: the reason why optimization has finished
+        :param sensitivities: the result of screening phase (if any)
         :return: None
         """
         report = Report(
@@ -87,20 +314,32 @@ class Evaluator:
             iterations=iterations,
             evaluations=evaluations,
             fast_evaluations=fast_evaluations,
+            seed=seed,
+            stop_reason=stop_reason,
+            timings=Timing(*self.__evaluation_frame()[list(names.Timings)].sum().tolist()),
+            sensitivities=sensitivities or [],
         )
+        if self.__cache is not None:
+            report.cache_hits = self.__cache.hits
+            report.cache_misses = self.__cache.misses
+        report.rejections = self.__counters[names.Rejections]
 
         self.__client.register_report(report)
         self.__report = report
 
+    def __evaluation_frame(self) -> pd.DataFrame:
+        return self.__log.read() if self.__evaluations is None else self.__evaluations.to_frame()
+
     def dump(self) -> (pd.DataFrame, Report):
         """
         Returns the list of performed cost function evaluations.
         :return: DataFrame + json-serializable Report compatible with Golang library
         """
-        # dump history of evaluations for future usage
-        evaluations = pd.DataFrame(self.__evaluations)
-        file_path = self.__root_dir.joinpath("evaluations.csv")
-        evaluations.to_csv(file_path, header=True, index=False)
+        evaluations = self.__evaluation_frame()
+
+        # in parallel mode evaluations may finish in arbitrary order
+        if not evaluations[names.Iteration].is_monotonic_increasing:
+            evaluations = evaluations.sort_values(names.Iteration, ignore_index=True)
 
         # dump report for future usage
         file_path = self.__root_dir.joinpath("report.json")
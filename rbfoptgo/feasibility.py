@@ -0,0 +1,59 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+from multiprocessing.managers import SyncManager
+from typing import MutableMapping, Optional, Tuple
+
+import numpy as np
+
+from rbfoptgo.config import RBFOptConfig
+
+
+class Feasibility:
+    """
+    Feasibility tells in advance whether the point is an invalid parameter combination: either it violates
+    the constraints declared in config, or it has been already reported as invalid by the Go side.
+    It's not thread-safe: the caller is responsible for synchronization.
+    If manager is provided, the known infeasible points are shared between processes.
+    """
+    __matrix: np.ndarray
+    __upper_bounds: np.ndarray
+    __infeasible: MutableMapping[Tuple[int, ...], bool]
+
+    # constraint coefficients are floating point numbers
+    __tolerance = 1e-9
+
+    def __init__(self, config: RBFOptConfig, manager: Optional[SyncManager] = None):
+        var_names = config.var_names
+        self.__matrix = np.array(
+            [[constraint.coefficients.get(name, 0.) for name in var_names] for constraint in config.constraints],
+            dtype=np.float64,
+        ).reshape(len(config.constraints), len(var_names))
+        self.__upper_bounds = np.array([constraint.upper_bound for constraint in config.constraints],
+                                       dtype=np.float64)
+
+        self.__infeasible = manager.dict() if manager else {}
+
+    def feasible(self, key: Tuple[int, ...]) -> bool:
+        """
+        Checks if the point may be a valid parameter combination
+        :param key: parameter values in the order of parameters in config
+        :return: False if the point is known to be infeasible
+        """
+        if key in self.__infeasible:
+            return False
+
+        if self.__upper_bounds.size == 0:
+            return True
+
+        values = np.array(key, dtype=np.float64)
+        return bool(np.all(self.__matrix @ values <= self.__upper_bounds + self.__tolerance))
+
+    def remember(self, key: Tuple[int, ...]):
+        """
+        Remembers the point reported as invalid parameter combination
+        :param key: parameter values in the order of parameters in config
+        :return:
+        """
+        self.__infeasible[key] = True
@@ -4,47 +4,278 @@
 #  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
 #  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
 
+import multiprocessing
 import pathlib
+import subprocess
 import sys
+from multiprocessing.managers import SyncManager
+from typing import List, Optional, Tuple
 
+import numpy as np
+import pandas as pd
 import rbfopt
 
-from rbfoptgo.client import Client
-from rbfoptgo.config import Config
+from rbfoptgo.checkpoint import CheckpointingAlgorithm
+from rbfoptgo.client import Client, UnixSocketClient, request_timeout
+from rbfoptgo.config import Config, RenderMode, Transport
+from rbfoptgo.evaluation_log import read_evaluation_log
 from rbfoptgo.evaluator import Evaluator
-from rbfoptgo.plot import Renderer
+from rbfoptgo.profiling import profile
+from rbfoptgo.report import Report
+from rbfoptgo.sampling import initial_sample
+from rbfoptgo.screening import Screening, Sensitivity, freeze, load_sensitivities, project, save_sensitivities
+from rbfoptgo.stopping import StopReason
+from rbfoptgo.warm_start import prior_points, warm_start_sample
+from rbfoptgo import names
 
 
-def main():
+def optimize(config: Config, root_dir: pathlib.Path, manager: Optional[SyncManager]) -> (pd.DataFrame, Report):
     """
-    An entrypoint to RBFOpt optimizer
+    Runs optimization session
+    :param config: configuration
+    :param root_dir: directory for artifacts
+    :param manager: shares evaluator state between worker processes in parallel mode
+    :return: evaluations history and final report
+    """
+    timeout = request_timeout(config.rbfopt.evaluation_timeout)
+    if config.transport == Transport.unix_socket:
+        client = UnixSocketClient(config.endpoint, config.session_id, root_dir.joinpath("estimator.sock"), timeout)
+    else:
+        client = Client(config.endpoint, config.session_id, timeout)
+    evaluator = Evaluator(config=config, client=client, parameter_names=config.rbfopt.var_names, root_dir=root_dir,
+                          manager=manager)
+
+    state_file = root_dir.joinpath("rbfopt_state.dat")
+    resume = config.resume and state_file.exists()
+    if config.resume and not resume:
+        # the previous session was interrupted before the first checkpoint, but its evaluations may be reused
+        evaluator.restore(logged_evaluations=0)
+
+    # insensitive parameters are frozen, so RBFOpt explores the rest of them only
+    user_black_box = config.rbfopt.user_black_box
+    sensitivities, design = None, None
+    if config.rbfopt.screening is not None:
+        sensitivities, design = screen_parameters(config, evaluator, root_dir)
+        user_black_box = freeze(user_black_box, sensitivities, config.rbfopt.parameters)
+
+    # RBFOpt screens candidate points with the fast cost function (if any) before evaluating the accurate one
+    obj_funct_noisy = evaluator.estimate_fast_cost if config.rbfopt.fast_cost_function else None
+    bb = rbfopt.RbfoptUserBlackBox(obj_funct=evaluator.estimate_cost, obj_funct_noisy=obj_funct_noisy,
+                                   **user_black_box)
+
+    if resume:
+        alg = resume_session(config, evaluator, bb, state_file)
+    else:
+        alg = start_session(config, evaluator, bb, state_file, design)
+
+    # time limit is checked after every evaluation; RBFOpt also checks it between them
+    alg.l_settings.max_clock_time = min(alg.l_settings.max_clock_time, evaluator.remaining_time())
+
+    # perform optimization
+    cost, optimum, iterations, evaluations, fast_evaluations = alg.optimize()
+    stop_reason = alg.stop_reason or evaluator.stop_reason() or StopReason.limit
+
+    # post report to server
+    evaluator.register_report(cost, optimum, iterations, evaluations + alg.extra_evaluations, fast_evaluations,
+                              alg.l_settings.rand_seed, stop_reason, sensitivities)
+    return evaluator.dump()
+
+
+def screen_parameters(
+        config: Config,
+        evaluator: Evaluator,
+        root_dir: pathlib.Path,
+) -> (List[Sensitivity], Tuple[np.ndarray, np.ndarray]):
+    """
+    Ranks parameters by their influence on cost function, or loads the ranking made by the interrupted session
+    :param config: configuration
+    :param evaluator: cost function evaluator
+    :param root_dir: directory for artifacts
+    :return: sensitivities of parameters, and the evaluated design: points (in the optimizer space) and costs
+    """
+    parameters = config.rbfopt.parameters
+    screening = Screening(config.rbfopt, seed=config.rbfopt.seed or None)
+
+    file_path = root_dir.joinpath("screening.json")
+    if config.resume and file_path.exists():
+        # the design is evaluated first, so it's the beginning of the log of the interrupted session
+        evaluations = read_evaluation_log(root_dir.joinpath("evaluations.csv")).iloc[:screening.size]
+        values = evaluations[config.rbfopt.var_names].to_numpy().tolist()
+        points = np.array([[p.encode(v) for p, v in zip(parameters, row)] for row in values])
+        return load_sensitivities(file_path), (points.reshape(-1, len(parameters)), evaluations[names.Cost].to_numpy())
+
+    points = screening.design()
+    costs = evaluator.estimate_cost_batch(points)
+    sensitivities = screening.rank(points, costs)
+    save_sensitivities(file_path, sensitivities)
+
+    frozen = [s.name for s in sensitivities if s.frozen]
+    print(f"screening: {len(points)} evaluations, frozen parameters: {frozen}")
+
+    return sensitivities, (points, costs)
+
+
+def start_session(
+        config: Config,
+        evaluator: Evaluator,
+        bb: rbfopt.RbfoptBlackBox,
+        state_file: pathlib.Path,
+        design: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> CheckpointingAlgorithm:
+    """
+    Prepares new optimization session
+    :param config: configuration
+    :param evaluator: cost function evaluator
+    :param bb: black box to optimize
+    :param state_file: file for RBFOpt state checkpoints
+    :param design: points and costs evaluated by screening (see screen_parameters)
+    :return: algorithm ready to optimize
+    """
+    screening_evaluations = 0 if design is None else len(design[1])
+
+    rbfopt_settings = rbfopt.RbfoptSettings(**config.rbfopt.settings)
+    rbfopt_settings.save_state_interval = config.checkpoint_interval
+    rbfopt_settings.save_state_file = str(state_file)
+    rbfopt_settings.max_evaluations = max(rbfopt_settings.max_evaluations - screening_evaluations, 0)
+
+    # evaluate the whole initial sample within a single request instead of one-by-one calls made by RBFOpt
+    init_node_pos, init_node_val, sample_size = None, None, 0
+    sample, warm_start_costs = initial_sample(rbfopt_settings, bb), np.empty(0)
+    reused_costs = np.empty(0)
+    if sample is not None and config.warm_start_root_dirs:
+        # the best points of the previous sessions are evaluated instead of the random ones
+        candidates = prior_points(config.warm_start_root_dirs, config.rbfopt.parameters)
+        sample, warm_start_costs = warm_start_sample(rbfopt_settings, bb, sample, candidates)
+        print(f"warm start: {len(warm_start_costs)} of {len(sample[1])} initial points "
+              "are taken from previous sessions")
+        if config.warm_start_reuse_costs:
+            reused_costs = warm_start_costs
+
+    # RBFOpt evaluates its own initial design with the fast cost function first (see RbfoptAlgorithm.restart),
+    # so only the points of the previous sessions are evaluated in advance
+    do_init_strategy = sample is None or config.rbfopt.fast_cost_function
+    all_fixed = sample is None
+    if sample is not None and config.rbfopt.fast_cost_function:
+        taken = len(warm_start_costs)
+        sample = (sample[0][:taken], sample[1][:taken]) if taken else None
+
+    if sample is not None:
+        init_node_pos, points = sample
+        # the points with reused costs lead the sample, and they are not evaluated again
+        init_node_val = np.full(len(points), np.nan)
+        init_node_val[:len(reused_costs)] = reused_costs
+        unknown = np.isnan(init_node_val)
+        init_node_val[unknown] = evaluator.estimate_cost_batch(points[unknown])
+        sample_size = int(unknown.sum())
+
+        # RBFOpt doesn't count the evaluations of the provided points
+        rbfopt_settings.max_evaluations = max(rbfopt_settings.max_evaluations - sample_size, 0)
+
+    if design is not None and not all_fixed:
+        # the model is built on the screening evaluations as well
+        known_nodes = np.empty(0) if init_node_pos is None else init_node_pos
+        nodes, costs = project(rbfopt_settings, bb, design, config.rbfopt.invalid_parameter_combination_cost,
+                               known_nodes)
+        if init_node_pos is None:
+            init_node_pos, init_node_val = nodes, costs
+        else:
+            init_node_pos, init_node_val = np.vstack((init_node_pos, nodes)), np.concatenate((init_node_val, costs))
+        print(f"screening: {len(nodes)} points are added to the initial sample")
+
+    alg = CheckpointingAlgorithm(rbfopt_settings, bb, init_node_pos=init_node_pos, init_node_val=init_node_val,
+                                 do_init_strategy=do_init_strategy)
+    alg.attach(bb, evaluator.checkpoint, evaluator.stop_reason)
+    alg.extra_evaluations = sample_size + screening_evaluations
+
+    # make initial sample persistent immediately: it's the most expensive part of a session
+    alg.save_to_file(rbfopt_settings.save_state_file)
+
+    return alg
+
+
+def resume_session(
+        config: Config,
+        evaluator: Evaluator,
+        bb: rbfopt.RbfoptBlackBox,
+        state_file: pathlib.Path,
+) -> CheckpointingAlgorithm:
+    """
+    Restores optimization session from the latest checkpoint
+    :param config: configuration
+    :param evaluator: cost function evaluator
+    :param bb: black box to optimize
+    :param state_file: file with RBFOpt state checkpoint
+    :return: algorithm ready to continue optimization
+    """
+    alg = CheckpointingAlgorithm.load_from_file(str(state_file))
+    alg.attach(bb, evaluator.checkpoint, evaluator.stop_reason)
+    alg.l_settings.save_state_interval = config.checkpoint_interval
+    alg.l_settings.save_state_file = str(state_file)
+    evaluator.restore(alg.logged_evaluations)
+    print(f"resuming session: {alg.evalcount + alg.extra_evaluations} evaluations already performed")
+
+    return alg
+
+
+def run(root_dir: pathlib.Path):
+    """
+    Runs optimization session and renders plots
+    :param root_dir: directory with configuration, and for artifacts
     :return:
     """
     # prepare configuration
-    root_dir = pathlib.Path(sys.argv[1])
     config_path = root_dir.joinpath("config.json")
     config = Config.from_file(config_path)
     print(f"config: {config}")
 
-    client = Client(config.endpoint)
-    evaluator = Evaluator(config=config, client=client, parameter_names=config.rbfopt.var_names, root_dir=root_dir)
+    with profile(config.profile, root_dir, "optimization"):
+        if config.rbfopt.num_cpus > 1:
+            # RBFOpt performs evaluations in the pool of worker processes
+            with multiprocessing.Manager() as manager:
+                evaluations, report = optimize(config, root_dir, manager)
+        else:
+            evaluations, report = optimize(config, root_dir, None)
 
-    bb = rbfopt.RbfoptUserBlackBox(obj_funct=evaluator.estimate_cost, **config.rbfopt.user_black_box)
+    render(config, root_dir, evaluations, report)
 
-    # perform optimization
-    rbfopt_settings = rbfopt.RbfoptSettings(**config.rbfopt.settings)
 
-    alg = rbfopt.RbfoptAlgorithm(rbfopt_settings, bb)
+def main():
+    """
+    An entrypoint to RBFOpt optimizer
+    :return:
+    """
+    run(pathlib.Path(sys.argv[1]))
 
-    # post report to server
-    evaluator.register_report(*alg.optimize())
-    evaluations, report = evaluator.dump()
-
-    # render plots
-    renderer = Renderer(config, evaluations, report)
-    renderer.scatterplots()
-    renderer.heatmaps()
-    renderer.radar()
+
+def render(config: Config, root_dir: pathlib.Path, evaluations: pd.DataFrame, report: Report):
+    """
+    Renders plots according to the configured mode
+    :param config: configuration
+    :param root_dir: directory for artifacts
+    :param evaluations: evaluations history
+    :param report: final report
+    :return:
+    """
+    match config.plot.render_mode:
+        case RenderMode.inline:
+            # plotting libraries take a lot of time to import, so they're not loaded unless they're needed
+            with profile(config.profile, root_dir, "render") as profile_stats:
+                from rbfoptgo.plot import Renderer  # pylint: disable=import-outside-toplevel
+                Renderer(config, evaluations, report).render(workers=config.plot.workers, profile_stats=profile_stats)
+        case RenderMode.background:
+            # the detached process must not hold the pipes of the caller, otherwise Go side would wait for it
+            with open(root_dir.joinpath("render.log"), "w") as log:
+                subprocess.Popen(  # pylint: disable=consider-using-with
+                    [sys.executable, "-m", "rbfoptgo.render", str(root_dir)],
+                    stdin=subprocess.DEVNULL,
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True,
+                )
+        case RenderMode.skip:
+            pass
+        case _:
+            raise ValueError(f"unknown render mode: {config.plot.render_mode}")
 
 
 if __name__ == "__main__":
@@ -6,4 +6,14 @@ from typing import Final
 
 Cost: Final = "cost"
 InvalidParameterCombination: Final = "invalid_parameter_combination"
+TimedOut: Final = "timed_out"
 Iteration: Final = "iteration"
+Rejections: Final = "rejections"
+OptimizerTime: Final = "optimizer_time"
+TransportTime: Final = "transport_time"
+QueueTime: Final = "queue_time"
+ConfigModifierTime: Final = "config_modifier_time"
+CostFunctionTime: Final = "cost_function_time"
+# in the order of Timing fields
+Timings: Final = (OptimizerTime, TransportTime, QueueTime, ConfigModifierTime, CostFunctionTime)
+SessionIDHeader: Final = "X-Session-Id"
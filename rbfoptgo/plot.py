@@ -2,75 +2,116 @@
 #  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
 #  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
 
+import concurrent.futures
 import functools
 import typing
+from dataclasses import dataclass
 
 import matplotlib.axes
 import matplotlib.image
 import matplotlib.pyplot as plt
-import matplotlib.ticker
 import numpy as np
 import pandas as pd
 import scipy.interpolate
-import scipy.stats
 from adjustText import adjust_text
 from colorhash import ColorHash
 
 from rbfoptgo import names
+from rbfoptgo.aggregation import Aggregation
 from rbfoptgo.config import Config, InvalidParameterCombinationRenderPolicy
+from rbfoptgo.profiling import profile_call
 from rbfoptgo.report import Report
 
 
+# NOTE: one can pass a particular set of interpolation methods,
+#  but honestly I can't see any significant difference between them.
+# methods = ['none', 'nearest', 'bilinear', 'bicubic', 'spline16',
+#            'spline36', 'hanning', 'hamming', 'hermite', 'kaiser', 'quadric',
+#            'catrom', 'gaussian', 'bessel', 'mitchell', 'sinc', 'lanczos']
+HEATMAP_INTERPOLATION_METHODS = ['hamming']
+
+
+@dataclass(frozen=True)
+class Figure:
+    """
+    Describes a single figure made by Renderer
+    """
+    kind: str
+    args: typing.Tuple = ()
+
+
+@dataclass
+class HeatmapGrid:
+    """
+    Minimal cost function values over the pair of parameters, interpolated to the regular grid
+    """
+    values: np.ndarray
+    extent: typing.List[float]
+
+
+# the renderer of the worker process, it's sent once per worker instead of once per figure
+_renderer: typing.Optional['Renderer'] = None
+
+
+def _init_worker(renderer: 'Renderer'):
+    global _renderer  # pylint: disable=global-statement
+    _renderer = renderer
+
+
+def _render_figure(figure: Figure, profiled: bool) -> typing.Optional[typing.Dict]:
+    if not profiled:
+        _renderer.figure(figure)
+        return None
+
+    # the worker process is not profiled by the parent one, so the statistics are sent back
+    _, stats = profile_call(_renderer.figure, figure)
+    return stats
+
+
 class Renderer:
-    """Renderer is responsible for plot generation"""
+    """
+    Renderer is responsible for plot generation.
+    Every figure is rendered independently, so they can be spread across the pool of processes.
+    """
     __df: pd.DataFrame
     __report: Report
     __config: Config
     __transparent: bool
+    __aggregations: typing.Dict[InvalidParameterCombinationRenderPolicy, Aggregation]
+    __grids: typing.Dict[typing.Tuple[str, str, InvalidParameterCombinationRenderPolicy], HeatmapGrid]
 
     def __init__(self, config: Config, df: pd.DataFrame, report: Report, transparent: bool = False):
-        self.__df = df.loc[:, df.columns != names.Iteration]
+        self.__df = df
         self.__report = report
         self.__config = config
         self.__transparent = transparent
+        self.__aggregations = {}
+        self.__grids = {}
 
-    def __prepare_df(self, policy: InvalidParameterCombinationRenderPolicy) -> pd.DataFrame:
-        match policy:
-            case InvalidParameterCombinationRenderPolicy.omit:
-                # Filter values corresponding to ErrInvalidParameterCombination params
-                return self.__df[self.__df.invalid_parameter_combination == False] # pylint: disable=singleton-comparison
-            case InvalidParameterCombinationRenderPolicy.assign_closest_valid_value:
-                # avoid white spots on the heatmap
-                unique_costs = self.__df.cost.unique()
-                unique_costs.sort()
-                # -1 stands for ErrInvalidParameterCombinationCost, take -2 - the next closest
-                closest_valid_value = unique_costs[-2]
-
-                # make df with replaced values
-                df = self.__df.copy()
-                mask = df.invalid_parameter_combination == True # pylint: disable=singleton-comparison
-                df.cost.where(~mask, closest_valid_value, inplace=True)
-                return df
-            case _:
-                raise ValueError(f"unknown policy: {policy}")
+    def __aggregation(self, policy: InvalidParameterCombinationRenderPolicy) -> Aggregation:
+        aggregation = self.__aggregations.get(policy)
+        if aggregation is None:
+            aggregation = Aggregation(self.__df, policy)
+            self.__aggregations[policy] = aggregation
+        return aggregation
 
     @property
     @functools.lru_cache()
     def __parameter_column_names(self) -> typing.List[str]:
-        utility_columns = (names.Cost, names.InvalidParameterCombination)
+        utility_columns = (names.Iteration, names.Cost, names.InvalidParameterCombination, names.TimedOut,
+                           *names.Timings)
         return list(filter(lambda x: x not in utility_columns, self.__df.columns))
 
-    def __cost_bounds(self, df: pd.DataFrame) -> typing.List[str]:
-        cost = df[names.Cost]
-        return [cost.min(), cost.max()]
-
     def scatterplots(self):
         """
         Renders scatterplots.
         :return:
         """
-        self.__render_scatterplot_group(only_optimal_values=False)
-        self.__render_scatterplot_group(only_optimal_values=True)
+        self.__render_figures(self.__scatterplot_figures())
+
+    @staticmethod
+    def __scatterplot_figures() -> typing.List[Figure]:
+        return [Figure("scatterplot", (False,)), Figure("scatterplot", (True,))]
 
     def __render_scatterplot_group(self, only_optimal_values: bool):
         column_names = self.__parameter_column_names
@@ -102,14 +143,16 @@ class Renderer:
         suffix = "only_optimal_values" if only_optimal_values else "all_values"
         figure_path = self.__config.root_dir.joinpath(f"scatterplot_{suffix}.png")
         fig.savefig(figure_path, transparent=self.__transparent)
+        plt.close(fig)
 
     def __render_scatterplot(self, ax: matplotlib.axes.Axes, col_name: str, only_optimal_values: bool):
-        df = self.__prepare_df(policy=self.__config.plot.scatter_plot_policy)
-        data = pd.DataFrame({col_name: df[col_name], names.Cost: df[names.Cost]})
+        aggregation = self.__aggregation(policy=self.__config.plot.scatter_plot_policy)
 
         if only_optimal_values:
             # for every argument value, pick the best cost function value
-            data = data.groupby(col_name)[names.Cost].agg(lambda x: x.min()).reset_index()
+            data = aggregation.minimums(col_name)
+        else:
+            data = aggregation.df
 
         color = ColorHash(col_name).hex
         ax.plot(data[col_name], data[names.Cost], linewidth=0, marker='o', color=color)
@@ -124,7 +167,7 @@ class Renderer:
         ax.annotate("{:.2f}".format(opt_val), (opt_arg, opt_val))
 
         # set equal limits
-        (cost_min, cost_max) = self.__cost_bounds(df)
+        (cost_min, cost_max) = aggregation.cost_bounds
         # ax.set_ybound(lower=cost_min, upper=cost_max)
         ax.set_ylim(bottom=cost_min, top=cost_max)
 
@@ -133,31 +176,22 @@ class Renderer:
         Renders multiple heatmaps.
         :return:
         """
-        df = self.__prepare_df(policy=self.__config.plot.heatmap_render_policy)
+        self.__render_figures(self.__heatmap_figures())
 
-        # NOTE: one can pass a particular set of interpolation methods,
-        #  but honestly I can't see any significant difference between them.
-        # methods = ['none', 'nearest', 'bilinear', 'bicubic', 'spline16',
-        #            'spline36', 'hanning', 'hamming', 'hermite', 'kaiser', 'quadric',
-        #            'catrom', 'gaussian', 'bessel', 'mitchell', 'sinc', 'lanczos']
-        methods = ['hamming']
+    def __heatmap_figures(self) -> typing.List[Figure]:
+        column_names = self.__parameter_column_names
 
-        for method in methods:
-            print(f"rendering heatmap matrix using method {method}")
-            self.__pairwise_heatmaps(df=df, interpolation=method)
-            self.__pairwise_heatmap_matrix(df=df, interpolation=method)
+        figures = []
+        for method in HEATMAP_INTERPOLATION_METHODS:
+            for i in range(len(column_names) - 1):
+                for j in range(i + 1, len(column_names)):
+                    figures.append(Figure("heatmap", (column_names[i], column_names[j], method)))
+            figures.append(Figure("heatmap_matrix", (method,)))
 
-    def __pairwise_heatmaps(self, df: pd.DataFrame, interpolation: str):
-        column_names = self.__parameter_column_names
-        for i in range(len(column_names) - 1):
-            for j in range(i + 1, len(column_names)):
-                self.__pairwise_heatmap(df=df,
-                                        col_name_1=column_names[i],
-                                        col_name_2=column_names[j],
-                                        interpolation=interpolation)
+        return figures
 
     def __pairwise_heatmap(self,
-                           df: pd.DataFrame,
+                           aggregation: Aggregation,
                            col_name_1: str,
                            col_name_2: str,
                            interpolation: str,
@@ -168,7 +202,7 @@ class Renderer:
         fig, ax = plt.subplots(figsize=figsize, constrained_layout=True)
 
         im = self.__pairwise_heatmap_interpolate(
-            df=df,
+            aggregation=aggregation,
             ax=ax,
             col_name_1=col_name_1,
             col_name_2=col_name_2,
@@ -181,8 +215,9 @@ class Renderer:
 
         figure_path = self.__config.root_dir.joinpath(f"heatmap_{col_name_1}_{col_name_2}_{interpolation}.png")
         fig.savefig(figure_path, transparent=self.__transparent)
+        plt.close(fig)
 
-    def __pairwise_heatmap_matrix(self, df: pd.DataFrame, interpolation: str):
+    def __pairwise_heatmap_matrix(self, aggregation: Aggregation, interpolation: str):
         column_names = self.__parameter_column_names
 
         # approximate size that make image look well
@@ -201,7 +236,7 @@ class Renderer:
                 col_name_1, col_name_2 = column_names[i], column_names[j]
                 ax = axes[j - 1, i]
                 im = self.__pairwise_heatmap_interpolate(
-                    df=df,
+                    aggregation=aggregation,
                     ax=ax,
                     col_name_1=col_name_1,
                     col_name_2=col_name_2,
@@ -215,9 +250,10 @@ class Renderer:
 
         figure_path = self.__config.root_dir.joinpath(f"heatmap_matrix_{interpolation}.png")
         fig.savefig(figure_path, transparent=self.__transparent, dpi=300)
+        plt.close(fig)
 
     def __pairwise_heatmap_interpolate(self,
-                                       df: pd.DataFrame,
+                                       aggregation: Aggregation,
                                        ax: matplotlib.axes.Axes,
                                        col_name_1: str,
                                        col_name_2: str,
@@ -225,44 +261,19 @@ class Renderer:
                                        x_label: bool,
                                        y_label: bool,
                                        ) -> matplotlib.image.AxesImage:
-        data = df[[col_name_1, col_name_2, names.Cost]]
-
-        # select the minimums
-        data = data.groupby([col_name_1, col_name_2])[names.Cost].agg(lambda x: x.min()).reset_index()
-
-        # check if data is sufficient
-        if data.shape[0] < 4:
-            raise ValueError('Too little data to render grid, try to increase number of iterations')
-
-        # compute grid bounds
-        xs0 = data[col_name_1]
-        ys0 = data[col_name_2]
-        x_min, x_max = xs0.min(), xs0.max()
-        y_min, y_max = ys0.min(), ys0.max()
-        extent = [x_min, x_max, y_min, y_max]
-        N = 100j
-        xs, ys = np.mgrid[x_min:x_max:N, y_min:y_max:N]
-
-        zs0 = data[names.Cost]
-
-        # interpolate data
-        resampled = scipy.interpolate.griddata(
-            points=(xs0, ys0),
-            values=zs0,
-            xi=(xs, ys),
-            method='cubic',
-        )
+        grid = self.__heatmap_grid(aggregation, col_name_1, col_name_2)
+        x_min, x_max, y_min, y_max = grid.extent
 
         # render interpolated grid
-        (cost_min, cost_max) = self.__cost_bounds(df)
+        (cost_min, cost_max) = aggregation.cost_bounds
         im = ax.imshow(
-            resampled.T,
+            grid.values.T,
             cmap='jet',
             origin='lower',
             interpolation=interpolation,
             vmin=cost_min,
             vmax=cost_max,
-            extent=extent,
+            extent=grid.extent,
         )
 
         # draw point with optimum
@@ -298,6 +309,59 @@ class Renderer:
 
         return im
 
+    def __heatmap_grid(self, aggregation: Aggregation, col_name_1: str, col_name_2: str) -> HeatmapGrid:
+        # the same grid is used by the pairwise heatmap and by the heatmap matrix for every interpolation method
+        key = (col_name_1, col_name_2, self.__config.plot.heatmap_render_policy)
+        grid = self.__grids.get(key)
+        if grid is not None:
+            return grid
+
+        # select the minimums
+        data = aggregation.pair_minimums(col_name_1, col_name_2)
+
+        # check if data is sufficient
+        if data.shape[0] < 4:
+            raise ValueError('Too little data to render grid, try to increase number of iterations')
+
+        file_path = None
+        if self.__config.plot.interpolation_cache:
+            digest = int(pd.util.hash_pandas_object(data, index=False).sum())
+            file_path = self.__config.root_dir.joinpath(
+                "interpolation_cache", f"{col_name_1}_{col_name_2}_{key[2].name}_{digest:016x}.npz",
+            )
+            if file_path.exists():
+                with np.load(file_path) as cached:
+                    grid = HeatmapGrid(values=cached["values"], extent=cached["extent"].tolist())
+                self.__grids[key] = grid
+                return grid
+
+        # compute grid bounds
+        xs0 = data[col_name_1]
+        ys0 = data[col_name_2]
+        x_min, x_max = xs0.min(), xs0.max()
+        y_min, y_max = ys0.min(), ys0.max()
+        N = 100j
+        xs, ys = np.mgrid[x_min:x_max:N, y_min:y_max:N]
+
+        zs0 = data[names.Cost]
+
+        # interpolate data
+        resampled = scipy.interpolate.griddata(
+            points=(xs0, ys0),
+            values=zs0,
+            xi=(xs, ys),
+            method='cubic',
+        )
+
+        grid = HeatmapGrid(values=resampled, extent=[x_min, x_max, y_min, y_max])
+        self.__grids[key] = grid
+
+        if file_path is not None:
+            file_path.parent.mkdir(exist_ok=True)
+            np.savez(file_path, values=grid.values, extent=grid.extent)
+
+        return grid
+
     def __derive_optimum_coordinates(self,
                                      col_name_1: str, col_name_2: str,
                                      ) -> (float, float, float):
@@ -327,6 +391,9 @@ class Renderer:
         Renders radar plot.
         :return:
         """
+        self.__render_figures([Figure("radar")])
+
+    def __radar(self):
         # convert optimum values to df
         df = pd.DataFrame(self.__report.optimum).T
         df.columns = df.iloc[0]
@@ -340,7 +407,8 @@ class Renderer:
         angles = [n / float(N) * 2 * np.pi for n in range(N)]
         angles += angles[:1]
 
-        ax = plt.subplot(111, polar=True)
+        fig = plt.figure()
+        ax = fig.add_subplot(111, polar=True)
         ax.set_xticks(angles[:-1], df.columns, size=14)
 
         ax.set_rlabel_position(0)
@@ -348,4 +416,62 @@ class Renderer:
         ax.plot(angles, values, linewidth=1, linestyle='solid')
         ax.fill(angles, values, 'b', alpha=0.1)
 
-        plt.savefig(self.__config.root_dir.joinpath('polar.png'), transparent=self.__transparent)
+        fig.savefig(self.__config.root_dir.joinpath('polar.png'), transparent=self.__transparent)
+        plt.close(fig)
+
+    def render(self, workers: int = 1, profile_stats: typing.Optional[typing.List[typing.Dict]] = None):
+        """
+        Renders all the plots: scatterplots, heatmaps and radar.
+        :param workers: number of processes rendering figures simultaneously
+        :param profile_stats: if set, the workers are profiled, and their raw statistics are appended to it
+        :return:
+        """
+        figures = self.__scatterplot_figures() + self.__heatmap_figures() + [Figure("radar")]
+        self.__render_figures(figures, workers, profile_stats)
+
+    def __render_figures(
+            self,
+            figures: typing.List[Figure],
+            workers: int = 1,
+            profile_stats: typing.Optional[typing.List[typing.Dict]] = None,
+    ):
+        if workers <= 1:
+            for figure in figures:
+                self.figure(figure)
+            return
+
+        # aggregate data and interpolate grids in advance, otherwise every worker would do it on its own
+        self.__aggregation(self.__config.plot.scatter_plot_policy).prepare(self.__parameter_column_names)
+        aggregation = self.__aggregation(self.__config.plot.heatmap_render_policy)
+        for figure in figures:
+            if figure.kind == "heatmap":
+                self.__heatmap_grid(aggregation, *figure.args[:2])
+
+        # every figure is saved to its own file, so the order of completion doesn't matter
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                    initargs=(self,)) as executor:
+            futures = [executor.submit(_render_figure, figure, profile_stats is not None) for figure in figures]
+            for future in concurrent.futures.as_completed(futures):
+                stats = future.result()
+                if profile_stats is not None:
+                    profile_stats.append(stats)
+
+    def figure(self, figure: Figure):
+        """
+        Renders single figure.
+        :param figure: figure description
+        :return:
+        """
+        match figure.kind:
+            case "scatterplot":
+                self.__render_scatterplot_group(*figure.args)
+            case "heatmap":
+                aggregation = self.__aggregation(policy=self.__config.plot.heatmap_render_policy)
+                self.__pairwise_heatmap(aggregation, *figure.args)
+            case "heatmap_matrix":
+                aggregation = self.__aggregation(policy=self.__config.plot.heatmap_render_policy)
+                self.__pairwise_heatmap_matrix(aggregation, *figure.args)
+            case "radar":
+                self.__radar()
+            case _:
+                raise ValueError(f"unknown figure: {figure.kind}")
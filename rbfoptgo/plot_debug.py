@@ -5,10 +5,10 @@
 
 import pathlib
 
-import pandas as pd
 from matplotlib import rc
 
 from rbfoptgo.config import Config
+from rbfoptgo.evaluation_log import read_evaluation_log
 from rbfoptgo.plot import Renderer
 from rbfoptgo.report import Report
 
@@ -21,7 +21,7 @@ def run(debug_dir: pathlib.Path):
     :return:
     """
     config = Config.from_file(debug_dir.joinpath("config.json"))
-    evaluations = pd.read_csv(debug_dir.joinpath("evaluations.csv"))
+    evaluations = read_evaluation_log(debug_dir.joinpath("evaluations.csv"))
     report = Report.load_from_file(debug_dir.joinpath("report.json"))
     renderer = Renderer(config=config, df=evaluations, report=report, transparent=False)
     renderer.heatmaps()
@@ -0,0 +1,58 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import contextlib
+import cProfile
+import pathlib
+import pstats
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+def profile_call(func: Callable, *args) -> Tuple[Any, Dict]:
+    """
+    Calls the function under cProfile
+    :param func: function to call
+    :param args: its arguments
+    :return: the result of the function, and its raw statistics
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args)
+    profiler.create_stats()
+    return result, profiler.stats
+
+
+@contextlib.contextmanager
+def profile(enabled: bool, root_dir: pathlib.Path, name: str) -> Iterator[Optional[List[Dict]]]:
+    """
+    Runs the code within the context under cProfile. Statistics are saved to `{name}.prof` in root directory
+    (it can be loaded with pstats, or visualized with snakeviz, flameprof, gprof2dot and so on),
+    and the summary of the heaviest calls is written to `{name}.txt`.
+    Only the current process is profiled, unless the raw statistics of the other ones (see profile_call)
+    are appended to the yielded list (the time spent by concurrent processes is summed up then).
+    :param enabled: if false, code is run as is
+    :param root_dir: directory for the results
+    :param name: name of the profiled phase
+    :return:
+    """
+    if not enabled:
+        yield None
+        return
+
+    others = []
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield others
+    finally:
+        profiler.disable()
+        stats = pstats.Stats(profiler)
+        for raw_stats in others:
+            other = pstats.Stats()
+            other.stats = raw_stats
+            other.get_top_level_stats()
+            stats.add(other)
+        stats.dump_stats(root_dir.joinpath(f"{name}.prof"))
+        with open(root_dir.joinpath(f"{name}.txt"), "w") as f:
+            stats.stream = f
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(50)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import pathlib
+import sys
+
+from rbfoptgo.config import Config
+from rbfoptgo.evaluation_log import read_evaluation_log
+from rbfoptgo.plot import Renderer
+from rbfoptgo.profiling import profile
+from rbfoptgo.report import Report
+
+
+def run(root_dir: pathlib.Path):
+    """
+    Renders plots using the artifacts left by the optimization session in root directory.
+    :param root_dir: root directory of the session
+    :return:
+    """
+    config = Config.from_file(root_dir.joinpath("config.json"))
+    evaluations = read_evaluation_log(root_dir.joinpath("evaluations.csv"))
+    report = Report.load_from_file(root_dir.joinpath("report.json"))
+    with profile(config.profile, root_dir, "render") as profile_stats:
+        Renderer(config, evaluations, report).render(workers=config.plot.workers, profile_stats=profile_stats)
+
+
+def main():
+    """
+    An entrypoint to the detached plot renderer
+    :return:
+    """
+    run(pathlib.Path(sys.argv[1]))
+
+
+if __name__ == '__main__':
+    main()
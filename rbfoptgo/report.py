@@ -4,17 +4,19 @@
 
 import json
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List
 
 import jsons
 
-from rbfoptgo.common import Cost, ParameterValue
+from rbfoptgo.common import Cost, ParameterValue, Timing
 from rbfoptgo.config import Parameter
+from rbfoptgo.screening import Sensitivity
+from rbfoptgo.stopping import StopReason
 
 
 @dataclass
-class Report:
+class Report:  # pylint: disable=too-many-instance-attributes
     """
     Report contains the results of an optimization session.
     """
@@ -24,6 +26,13 @@ class Report:
     iterations: int
     evaluations: int
     fast_evaluations: int
+    seed: int = 0  # random seed used by RBFOpt
+    stop_reason: StopReason = StopReason.limit
+    cache_hits: int = 0
+    cache_misses: int = 0
+    rejections: int = 0  # evaluations skipped as infeasible
+    sensitivities: List[Sensitivity] = field(default_factory=list)  # screening results, from the most sensitive
+    timings: Timing = field(default_factory=Timing)  # total time spent at every stage of evaluations
 
     def optimum_argument(self, name: str) -> int:
         """
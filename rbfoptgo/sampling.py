@@ -0,0 +1,42 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+from typing import Optional, Tuple
+
+import numpy as np
+import rbfopt
+import rbfopt.rbfopt_utils as ru
+
+
+def initial_sample(
+        settings: rbfopt.RbfoptSettings,
+        black_box: rbfopt.RbfoptBlackBox,
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Draws the initial sample points in the same way as RBFOpt does it at the beginning of optimization,
+    so that the caller can evaluate all of them at once.
+    :param settings: RBFOpt settings
+    :param black_box: black box to optimize
+    :return: 1. sample points in the space of non-fixed variables (suitable for RbfoptAlgorithm init_node_pos)
+             2. the same points in the space of all variables (suitable for cost function evaluation)
+             or None if all variables are fixed
+    """
+    var_lower, var_upper = black_box.get_var_lower(), black_box.get_var_upper()
+
+    # RBFOpt excludes variables with equal bounds from the optimization
+    free = ~np.isclose(var_lower, var_upper, 0, settings.eps_zero)
+    if not free.any():
+        return None
+
+    lower, upper = var_lower[free], var_upper[free]
+    integer_vars = np.flatnonzero(np.asarray(black_box.get_var_type())[free] != 'R')
+
+    l_settings = settings.set_auto_parameters(len(lower), lower, upper, integer_vars)
+    ru.init_environment(l_settings)
+    nodes = ru.initialize_nodes(l_settings, lower, upper, integer_vars, None)
+
+    points = np.tile(var_lower, (len(nodes), 1))
+    points[:, free] = nodes
+
+    return nodes, points
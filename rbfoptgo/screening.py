@@ -0,0 +1,197 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import jsons
+import numpy as np
+import rbfopt
+
+from rbfoptgo.config import Parameter, RBFOptConfig
+
+
+@dataclass
+class Sensitivity:
+    """
+    Describes the influence of a parameter on cost function, estimated by the screening phase
+    """
+    name: str
+    mu_star: float  # mean absolute elementary effect (cost change per the whole range of the parameter)
+    sigma: float  # standard deviation of elementary effects: non-linearity and interactions with other parameters
+    effects: int  # number of elementary effects measured (the ones involving invalid combinations are skipped)
+    frozen: bool = False  # the parameter is fixed during the main optimization
+    value: int = 0  # the value of frozen parameter
+
+
+class Screening:
+    """
+    Screening ranks parameters by their influence on cost function with Morris method: every trajectory starts
+    from a random point of the grid, and changes parameters one at a time. The parameters that barely affect cost
+    are frozen at their values in the best evaluated point, so RBFOpt explores the rest of them only.
+    """
+    __config: RBFOptConfig
+    __grid: np.ndarray
+    __step: int
+    __rng: np.random.Generator
+
+    def __init__(self, config: RBFOptConfig, seed: Optional[int] = None):
+        self.__config = config
+        # the grid is uniform in the optimizer space (see Parameter.scale)
+        self.__grid = np.array([self.__grid_of(p, config.screening.levels) for p in config.parameters])
+        # the classic Morris step: half of the grid
+        self.__step = config.screening.levels // 2
+        self.__rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def __grid_of(parameter: Parameter, levels: int) -> np.ndarray:
+        grid = np.linspace(parameter.encode(parameter.bound.left), parameter.encode(parameter.bound.right), levels)
+        return np.rint(grid) if parameter.var_type == 'I' else grid
+
+    @property
+    def size(self) -> int:
+        """
+        :return: number of evaluations required by screening
+        """
+        return self.__config.screening.trajectories * (len(self.__config.parameters) + 1)
+
+    def design(self) -> np.ndarray:
+        """
+        Draws trajectories through the grid
+        :return: matrix with points in rows, the trajectories follow each other
+        """
+        dimension, levels = len(self.__config.parameters), self.__config.screening.levels
+        points = np.zeros(shape=(self.size, dimension))
+        rows = np.arange(dimension)
+
+        for t in range(self.__config.screening.trajectories):
+            indices = self.__rng.integers(0, levels, size=dimension)
+            offset = t * (dimension + 1)
+            points[offset] = self.__grid[rows, indices]
+
+            for s, j in enumerate(self.__rng.permutation(dimension)):
+                indices[j] += self.__step if indices[j] + self.__step < levels else -self.__step
+                points[offset + s + 1] = self.__grid[rows, indices]
+
+        return points
+
+    def rank(self, points: np.ndarray, costs: np.ndarray) -> List[Sensitivity]:
+        """
+        Estimates sensitivities from the evaluated design, and chooses parameters to freeze
+        :param points: the design made by Screening.design
+        :param costs: cost function values of the design points
+        :return: sensitivities of all parameters, from the most influential one
+        """
+        parameters = self.__config.parameters
+        valid = costs != self.__config.invalid_parameter_combination_cost
+        effects = [[] for _ in parameters]
+
+        for t in range(self.__config.screening.trajectories):
+            offset = t * (len(parameters) + 1)
+            for i in range(offset, offset + len(parameters)):
+                delta = points[i + 1] - points[i]
+                j = int(np.flatnonzero(delta)[0]) if delta.any() else None
+
+                # the grid may be coarser than the step for narrow bounds
+                if j is None or not valid[i] or not valid[i + 1]:
+                    continue
+
+                width = self.__grid[j, -1] - self.__grid[j, 0]
+                effects[j].append((costs[i + 1] - costs[i]) / (delta[j] / width))
+
+        sensitivities = [
+            Sensitivity(
+                name=p.name,
+                mu_star=float(np.mean(np.abs(e))) if e else 0.,
+                sigma=float(np.std(e)) if e else 0.,
+                effects=len(e),
+            ) for p, e in zip(parameters, effects)
+        ]
+
+        # there is nothing to compare with if all the points are invalid
+        if valid.any():
+            best = points[np.flatnonzero(valid)[np.argmin(costs[valid])]]
+            threshold = self.__config.screening.threshold * max(s.mu_star for s in sensitivities)
+            for i, sensitivity in enumerate(sensitivities):
+                # the parameter with unknown influence is never frozen
+                if sensitivity.effects and sensitivity.mu_star < threshold:
+                    sensitivity.frozen, sensitivity.value = True, parameters[i].decode(best[i])
+
+        return sorted(sensitivities, key=lambda s: s.mu_star, reverse=True)
+
+
+def freeze(user_black_box: Dict, sensitivities: List[Sensitivity], parameters: List[Parameter]) -> Dict:
+    """
+    Fixes frozen parameters: RBFOpt excludes variables with equal bounds from the optimization
+    :param user_black_box: the area of the function scope, see RBFOptConfig.user_black_box
+    :param sensitivities: the result of screening
+    :param parameters: parameters in the order of black box variables
+    :return: the area of the function scope with frozen parameters
+    """
+    result = dict(user_black_box)
+    result["var_lower"], result["var_upper"] = user_black_box["var_lower"].copy(), user_black_box["var_upper"].copy()
+    indices = {parameter.name: i for i, parameter in enumerate(parameters)}
+    for sensitivity in sensitivities:
+        if sensitivity.frozen:
+            i = indices[sensitivity.name]
+            result["var_lower"][i] = result["var_upper"][i] = parameters[i].encode(sensitivity.value)
+
+    return result
+
+
+def project(
+        settings: rbfopt.RbfoptSettings,
+        black_box: rbfopt.RbfoptBlackBox,
+        design: Tuple[np.ndarray, np.ndarray],
+        invalid_parameter_combination_cost: float,
+        known_nodes: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Turns the evaluated design into the nodes of RBFOpt model: valid points are projected onto the parameters
+    that are not frozen (the frozen ones barely affect cost, so it's a fair approximation). The points that
+    coincide after projection are taken once, with the best cost, and the known nodes are skipped.
+    :param settings: RBFOpt settings
+    :param black_box: black box with frozen parameters
+    :param design: the design made by Screening.design, and its cost function values
+    :param invalid_parameter_combination_cost: the cost of invalid points
+    :param known_nodes: nodes RBFOpt already has (e.g. initial sample) in the space of non-fixed variables
+    :return: nodes in the space of non-fixed variables (suitable for RbfoptAlgorithm init_node_pos), and their costs
+    """
+    points, costs = design
+    free = ~np.isclose(black_box.get_var_lower(), black_box.get_var_upper(), 0, settings.eps_zero)
+    valid = costs != invalid_parameter_combination_cost
+
+    best: Dict[Tuple[float, ...], float] = {}
+    for node, cost in zip(points[valid][:, free].tolist(), costs[valid].tolist()):
+        key = tuple(node)
+        if key not in best or cost < best[key]:
+            best[key] = cost
+
+    for node in known_nodes.tolist():
+        best.pop(tuple(node), None)
+
+    return np.array(list(best.keys())).reshape(-1, free.sum()), np.array(list(best.values()))
+
+
+def save_sensitivities(file_path: os.PathLike, sensitivities: List[Sensitivity]):
+    """
+    Saves screening results, so that the resumed session optimizes the same parameters
+    :param file_path: full path to the file
+    :param sensitivities: the result of screening
+    :return:
+    """
+    with open(file_path, "w") as f:
+        json.dump(jsons.dump(sensitivities), f)
+
+
+def load_sensitivities(file_path: os.PathLike) -> List[Sensitivity]:
+    """
+    Loads screening results saved by save_sensitivities
+    :param file_path: full path to the file
+    :return: sensitivities of all parameters
+    """
+    with open(file_path, "r") as f:
+        return jsons.load(json.load(f), List[Sensitivity])
@@ -0,0 +1,90 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import math
+import time
+from enum import Enum
+from multiprocessing.managers import SyncManager
+from typing import MutableMapping, Optional
+
+from rbfoptgo.common import Cost
+from rbfoptgo.config import RBFOptConfig
+
+
+class StopReason(Enum):
+    """
+    Describes why optimization has finished.
+    """
+    limit = 1  # RBFOpt has exhausted evaluations or iterations limit, or has converged
+    time_limit = 2
+    target_cost = 3
+    stagnation = 4
+
+
+class StoppingCriteria:
+    """
+    StoppingCriteria tracks the progress of optimization and decides if it should be finished
+    before RBFOpt exhausts its limits. It's not thread-safe: the caller is responsible for synchronization.
+    If manager is provided, the state is shared between processes.
+    """
+    __time_limit: float
+    __target_cost: Optional[Cost]
+    __stagnation_evaluations: int
+    __stagnation_tolerance: float
+    __state: MutableMapping[str, object]
+
+    def __init__(self, config: RBFOptConfig, manager: Optional[SyncManager] = None):
+        self.__time_limit = config.time_limit
+        self.__target_cost = config.target_cost
+        self.__stagnation_evaluations = config.stagnation_evaluations
+        self.__stagnation_tolerance = config.stagnation_tolerance
+
+        self.__state = manager.dict() if manager else {}
+        self.__state.update(started_at=time.monotonic(), best_cost=math.inf, evaluations=0, improved_at=0, reason=None)
+
+    def observe(self, cost: Cost, invalid_parameter_combination: bool):
+        """
+        Takes into account the finished evaluation
+        :param cost: cost function value
+        :param invalid_parameter_combination: sign of invalid parameter combination
+        :return:
+        """
+        evaluations = self.__state["evaluations"] + 1
+        self.__state["evaluations"] = evaluations
+
+        if not invalid_parameter_combination:
+            best_cost = self.__state["best_cost"]
+            if math.isinf(best_cost) or cost < best_cost - self.__stagnation_tolerance * abs(best_cost):
+                self.__state["improved_at"] = evaluations
+            if cost < best_cost:
+                self.__state["best_cost"] = cost
+
+            if self.__target_cost is not None and cost <= self.__target_cost:
+                self.__stop(StopReason.target_cost)
+
+        if self.__stagnation_evaluations and evaluations - self.__state["improved_at"] >= self.__stagnation_evaluations:
+            self.__stop(StopReason.stagnation)
+
+    def __stop(self, reason: StopReason):
+        # the first reason wins
+        if self.__state["reason"] is None:
+            self.__state["reason"] = reason.name
+
+    def reason(self) -> Optional[StopReason]:
+        """
+        :return: the reason to stop optimization, or None if it should be continued
+        """
+        if self.__time_limit and time.monotonic() - self.__state["started_at"] >= self.__time_limit:
+            self.__stop(StopReason.time_limit)
+
+        reason = self.__state["reason"]
+        return StopReason[reason] if reason is not None else None
+
+    def remaining_time(self) -> float:
+        """
+        :return: the time left before the time limit is exceeded (infinity if there is no limit)
+        """
+        if not self.__time_limit:
+            return math.inf
+        return max(self.__time_limit - (time.monotonic() - self.__state["started_at"]), 0.)
@@ -0,0 +1,150 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from rbfoptgo import names
+from rbfoptgo.common import Evaluation
+
+
+class EvaluationStore:
+    """
+    EvaluationStore keeps evaluations in preallocated numpy arrays (one row per evaluation)
+    that grow geometrically when they're full. The columns of the same type share a single 2-D array,
+    so DataFrame can be built on top of them without copying. Properties return views of the filled part of arrays,
+    so they are valid only until the next append.
+    """
+    __parameter_names: List[str]
+    __size: int
+    __integers: np.ndarray  # parameter values and iteration number
+    __floats: np.ndarray  # cost and timings
+    __flags: np.ndarray  # signs of invalid parameter combination and timeout
+
+    def __init__(self, parameter_names: List[str], capacity: int = 1024):
+        self.__parameter_names = parameter_names
+        self.__size = 0
+        self.__integers = np.empty(shape=(capacity, len(parameter_names) + 1), dtype=np.int64)
+        self.__floats = np.empty(shape=(capacity, len(names.Timings) + 1), dtype=np.float64)
+        self.__flags = np.empty(shape=(capacity, 2), dtype=bool)
+
+    def __reserve(self, size: int):
+        capacity = len(self.__integers)
+        if size <= capacity:
+            return
+
+        while capacity < size:
+            capacity *= 2
+
+        def grow(array: np.ndarray) -> np.ndarray:
+            result = np.empty(shape=(capacity, *array.shape[1:]), dtype=array.dtype)
+            result[:self.__size] = array[:self.__size]
+            return result
+
+        self.__integers = grow(self.__integers)
+        self.__floats = grow(self.__floats)
+        self.__flags = grow(self.__flags)
+
+    def append(self, evaluation: Evaluation):
+        """
+        Adds evaluation to the store
+        :param evaluation: evaluation result
+        :return:
+        """
+        self.__reserve(self.__size + 1)
+
+        i = self.__size
+        self.__integers[i, :-1] = evaluation.values
+        self.__integers[i, -1] = evaluation.iteration
+        self.__floats[i, 0] = evaluation.cost
+        self.__floats[i, 1:] = evaluation.timing.astuple()
+        self.__flags[i] = evaluation.invalid_parameter_combination, evaluation.timed_out
+        self.__size += 1
+
+    def extend(self, df: pd.DataFrame):
+        """
+        Adds evaluations from the frame with the same columns as the one returned by `to_frame`
+        :param df: evaluations
+        :return:
+        """
+        begin, end = self.__size, self.__size + len(df)
+        self.__reserve(end)
+
+        self.__integers[begin:end] = df[self.__integer_columns].to_numpy()
+        self.__floats[begin:end] = df[self.__float_columns].to_numpy()
+        self.__flags[begin:end] = df[self.__flag_columns].to_numpy()
+        self.__size = end
+
+    @property
+    def __integer_columns(self) -> List[str]:
+        return [*self.__parameter_names, names.Iteration]
+
+    @property
+    def __float_columns(self) -> List[str]:
+        return [names.Cost, *names.Timings]
+
+    @property
+    def __flag_columns(self) -> List[str]:
+        return [names.InvalidParameterCombination, names.TimedOut]
+
+    @property
+    def parameters(self) -> np.ndarray:
+        """
+        :return: matrix of parameter values, evaluations are in rows
+        """
+        return self.__integers[:self.__size, :-1]
+
+    @property
+    def iterations(self) -> np.ndarray:
+        """
+        :return: iteration numbers
+        """
+        return self.__integers[:self.__size, -1]
+
+    @property
+    def costs(self) -> np.ndarray:
+        """
+        :return: cost function values
+        """
+        return self.__floats[:self.__size, 0]
+
+    @property
+    def invalid_parameter_combinations(self) -> np.ndarray:
+        """
+        :return: signs of invalid parameter combination
+        """
+        return self.__flags[:self.__size, 0]
+
+    @property
+    def timeouts(self) -> np.ndarray:
+        """
+        :return: signs of evaluation timeout
+        """
+        return self.__flags[:self.__size, 1]
+
+    @property
+    def timings(self) -> np.ndarray:
+        """
+        :return: matrix of the stage durations (in the order of Timing fields), evaluations are in rows
+        """
+        return self.__floats[:self.__size, 1:]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Makes DataFrame on top of the store arrays without copying them: every array becomes a single block
+        of the frame, and the blocks of different types are never consolidated.
+        :return: evaluations in the order they were added, with the same columns as evaluation log
+                 (grouped by type: parameters and iteration, cost and timings, flags)
+        """
+        blocks = [
+            pd.DataFrame(self.__integers[:self.__size], columns=self.__integer_columns, copy=False),
+            pd.DataFrame(self.__floats[:self.__size], columns=self.__float_columns, copy=False),
+            pd.DataFrame(self.__flags[:self.__size], columns=self.__flag_columns, copy=False),
+        ]
+        return pd.concat(blocks, axis=1, copy=False)
+
+    def __len__(self) -> int:
+        return self.__size
@@ -0,0 +1,44 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import numpy as np
+import pandas as pd
+
+from rbfoptgo import names
+from rbfoptgo.aggregation import Aggregation
+from rbfoptgo.config import InvalidParameterCombinationRenderPolicy
+
+
+def test_aggregation():
+    """
+    Aggregation must match straightforward group-by reductions for every policy
+    """
+    # synthetic history of evaluations, the same as benchmarks/aggregation.py makes
+    rows, rng = 1000, np.random.default_rng(0)
+    df = pd.DataFrame({f"p{i}": rng.integers(0, 100, size=rows) for i in range(3)})
+    df[names.Iteration] = np.arange(1, rows + 1)
+    df[names.Cost] = rng.normal(size=rows)
+    df[names.InvalidParameterCombination] = rng.random(size=rows) < 0.1
+
+    omit = Aggregation(df, InvalidParameterCombinationRenderPolicy.omit)
+    valid = df[~df[names.InvalidParameterCombination]]
+    assert len(omit.df) == len(valid)
+    assert omit.cost_bounds == (valid[names.Cost].min(), valid[names.Cost].max())
+
+    expected = valid.groupby("p0")[names.Cost].agg(lambda x: x.min())
+    actual = omit.minimums("p0")
+    assert actual["p0"].tolist() == expected.index.tolist()
+    assert actual[names.Cost].tolist() == expected.tolist()
+
+    expected = valid.groupby(["p1", "p2"])[names.Cost].agg(lambda x: x.min())
+    actual = omit.pair_minimums("p1", "p2")
+    assert len(actual) == len(expected)
+    assert actual[names.Cost].tolist() == expected.tolist()
+    assert omit.pair_minimums("p1", "p2") is actual
+
+    assign = Aggregation(df, InvalidParameterCombinationRenderPolicy.assign_closest_valid_value)
+    assert len(assign.df) == len(df)
+    replaced = assign.df[names.Cost][df[names.InvalidParameterCombination]]
+    assert (replaced == sorted(df[names.Cost].unique())[-2]).all()
+    assert (df[names.Cost] != assign.df[names.Cost]).any()
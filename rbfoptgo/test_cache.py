@@ -0,0 +1,32 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+from rbfoptgo.cache import EvaluationCache
+from rbfoptgo.config import Bound, Parameter
+
+
+def test_evaluation_cache(tmp_path):
+    """
+    Cache entries must survive between sessions with the same bounds
+    """
+    file_path = tmp_path.joinpath("evaluation_cache.jsonl")
+    bounds = [Parameter(Bound(0, 10), "x"), Parameter(Bound(0, 10), "y")]
+
+    cache = EvaluationCache(file_path, bounds)
+    assert cache.get((1, 2)) is None
+    cache.put((1, 2), -3.0, False)
+    cache.put((2, 1), 10.0, True)
+    assert cache.get((1, 2)) == (-3.0, False)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # next session reuses the entries
+    cache = EvaluationCache(file_path, bounds)
+    assert len(cache) == 2
+    assert cache.get((2, 1)) == (10.0, True)
+
+    # another bounds make the cache obsolete
+    bounds = [Parameter(Bound(0, 20), "x"), Parameter(Bound(0, 10), "y")]
+    cache = EvaluationCache(file_path, bounds)
+    assert len(cache) == 0
+    assert cache.get((1, 2)) is None
@@ -0,0 +1,38 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import dataclasses
+
+import pandas as pd
+
+from rbfoptgo import names
+from rbfoptgo.testing import FakeClient, make_config, run_session
+
+
+def test_resume(tmp_path):
+    """
+    Resumed session must continue from the checkpoint without repeated evaluations
+    """
+    # the first session is interrupted after a few iterations
+    config = make_config(tmp_path)
+    config.evaluation_cache = False
+    alg = run_session(config, iters=3).alg
+    interrupted = alg.evalcount + alg.extra_evaluations
+    assert tmp_path.joinpath("rbfopt_state.dat").exists()
+
+    # the second one continues from the latest checkpoint
+    config = dataclasses.replace(config, resume=True)
+    client = FakeClient()
+    session = run_session(config, client=client)
+    alg = session.alg
+    assert alg.evalcount + alg.extra_evaluations == interrupted
+
+    # global search steps only, local ones require MINLP solver
+    alg.optimize(pause_after_iters=2)
+    total = alg.evalcount + alg.extra_evaluations
+    assert client.requests == total - interrupted
+
+    assert session.evaluator.checkpoint() == total
+    evaluations = pd.read_csv(tmp_path.joinpath("evaluations.csv"))
+    assert sorted(evaluations[names.Iteration].tolist()) == list(range(1, total + 1))
@@ -0,0 +1,46 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+from rbfoptgo import names
+from rbfoptgo.common import Evaluation, Timing
+from rbfoptgo.evaluation_log import EvaluationLog
+
+
+def test_evaluation_log(tmp_path):
+    """
+    Log must be readable at any moment and survive the crash in the middle of a record
+    """
+    file_path = tmp_path.joinpath("evaluations.csv")
+
+    log = EvaluationLog(file_path, ["x", "y"], sync_interval=2)
+    for i in range(1, 4):
+        log.append(Evaluation([i, 2 * i], i, -i, i % 2 == 0, i == 3, Timing(optimizer=0.25, cost_function=i)))
+    assert log.sync() == 3
+
+    df = log.read()
+    assert df[names.Iteration].tolist() == [1, 2, 3]
+    assert df[names.InvalidParameterCombination].tolist() == [False, True, False]
+    assert df[names.TimedOut].tolist() == [False, False, True]
+    assert df["y"].tolist() == [2, 4, 6]
+    assert df[names.CostFunctionTime].tolist() == [1., 2., 3.]
+
+    # emulate the crash while writing the record
+    with open(file_path, "a") as f:
+        f.write("4,8")
+    assert len(log.read()) == 3
+
+    # the record may be cut in the middle of a field, so that it looks complete
+    with open(file_path, "a") as f:
+        f.write(",4,-4,True,False,0.25,0,0,0,1")
+    assert log.read()[names.CostFunctionTime].tolist() == [1., 2., 3.]
+
+    log = EvaluationLog(file_path, ["x", "y"], sync_interval=0, resume=True)
+    assert len(log) == 3
+    log.append(Evaluation([4, 8], 4, -4, True, False, Timing()))
+    assert log.read()[names.Iteration].tolist() == [1, 2, 3, 4]
+
+    # new session starts from scratch
+    log = EvaluationLog(file_path, ["x", "y"], sync_interval=0)
+    assert len(log) == 0
+    assert log.read().empty
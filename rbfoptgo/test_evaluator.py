@@ -0,0 +1,85 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import numpy as np
+
+from rbfoptgo import names
+from rbfoptgo.evaluator import Evaluator
+from rbfoptgo.stopping import StopReason
+from rbfoptgo.testing import FakeClient, make_config
+
+
+def test_evaluator(tmp_path):
+    """
+    Evaluator must record single and batch evaluations and avoid repeated requests
+    """
+    config = make_config(tmp_path)
+    client = FakeClient()
+    evaluator = Evaluator(config, client, config.rbfopt.var_names, tmp_path)
+
+    costs = evaluator.estimate_cost_batch(np.array([[1., 2., 3.], [10., 10., 10.], [5., 5., 5.]]))
+    assert costs.tolist() == [10, -110, -30]
+    assert client.requests == 1
+
+    assert evaluator.estimate_cost(np.array([10., 10., 10.])) == -110
+    assert evaluator.estimate_cost(np.array([4., 3., 2.])) == -14
+    assert client.requests == 2
+
+    evaluator.register_report(-110, np.array([10., 10., 10.]), 2, 5, 0, 1, StopReason.limit)
+    evaluations, report = evaluator.dump()
+
+    assert (report.cache_hits, report.cache_misses) == (1, 4)
+    assert evaluations[names.Iteration].tolist() == [1, 2, 3, 4, 5]
+    assert evaluations[names.InvalidParameterCombination].tolist() == [True, False, False, False, False]
+    # the cached evaluation takes no time at the Go side
+    assert evaluations[names.CostFunctionTime].tolist() == [1., 1., 1., 0., 1.]
+    assert (report.timings.transport, report.timings.cost_function) == (2., 4.)
+    assert report.timings.optimizer > 0
+    assert tmp_path.joinpath("evaluations.csv").exists()
+
+
+def test_evaluator_restore(tmp_path):
+    """
+    Evaluations made after the last RBFOpt checkpoint must be replayed rather than evaluated again
+    """
+    config = make_config(tmp_path)
+    config.evaluation_cache = False
+
+    evaluator = Evaluator(config, FakeClient(), config.rbfopt.var_names, tmp_path)
+    evaluator.estimate_cost(np.array([1., 2., 3.]))
+    logged_evaluations = evaluator.checkpoint()
+    evaluator.estimate_cost(np.array([4., 3., 2.]))
+    assert evaluator.checkpoint() == 2
+
+    config.resume = True
+    client = FakeClient()
+    evaluator = Evaluator(config, client, config.rbfopt.var_names, tmp_path)
+    evaluator.restore(logged_evaluations)
+
+    assert evaluator.estimate_cost(np.array([4., 3., 2.])) == -14
+    assert evaluator.estimate_cost(np.array([4., 3., 2.])) == -14
+    assert client.requests == 1
+
+    evaluator.register_report(-14, np.array([4., 3., 2.]), 3, 3, 0, 1, StopReason.limit)
+    evaluations, _ = evaluator.dump()
+    assert evaluations[names.Iteration].tolist() == [1, 2, 3]
+
+
+def test_evaluator_fast_cost(tmp_path):
+    """
+    Fast evaluations must provide error bounds, and must not be recorded
+    """
+    config = make_config(tmp_path)
+    config.rbfopt.fast_cost_function_error = 0.1
+    client = FakeClient()
+    evaluator = Evaluator(config, client, config.rbfopt.var_names, tmp_path)
+
+    assert evaluator.estimate_fast_cost(np.array([10., 10., 10.])).tolist() == [-109, -10.9, 10.9]
+    assert evaluator.estimate_fast_cost(np.array([1., 2., 3.])).tolist() == [10, 0, 0]
+    assert evaluator.estimate_cost(np.array([10., 10., 10.])) == -110
+    assert (client.requests, client.fast_requests) == (1, 2)
+
+    evaluator.register_report(-110, np.array([10., 10., 10.]), 1, 1, 2, 1, StopReason.limit)
+    evaluations, _ = evaluator.dump()
+    assert evaluations[names.Iteration].tolist() == [1]
@@ -0,0 +1,110 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import dataclasses
+
+import numpy as np
+
+from rbfoptgo import names
+from rbfoptgo.common import Timing
+from rbfoptgo.config import Constraint
+from rbfoptgo.evaluator import Evaluator
+from rbfoptgo.feasibility import Feasibility
+from rbfoptgo.stopping import StopReason
+from rbfoptgo.testing import FakeClient, make_config
+
+
+def test_feasibility(tmp_path):
+    """
+    Points violating constraints, and the ones remembered as invalid, must be infeasible
+    """
+    config = make_config(tmp_path).rbfopt
+
+    feasibility = Feasibility(config)
+    assert feasibility.feasible((1, 2, 3))
+
+    # x + y <= 10, z - x <= 0.5
+    constraints = [Constraint({"x": 1, "y": 1}, 10), Constraint({"z": 1, "x": -1}, 0.5)]
+    feasibility = Feasibility(dataclasses.replace(config, constraints=constraints))
+    assert feasibility.feasible((5, 5, 5))
+    assert not feasibility.feasible((5, 6, 5))
+    assert not feasibility.feasible((5, 5, 6))
+
+    feasibility.remember((1, 1, 1))
+    assert not feasibility.feasible((1, 1, 1))
+
+
+def test_evaluator_rejections(tmp_path):
+    """
+    Evaluator must answer infeasible points without requests to Go side
+    """
+    config = make_config(tmp_path)
+    config.evaluation_cache = False
+    config.rbfopt.constraints = [Constraint({"x": 1, "y": 1}, 10)]
+    client = FakeClient()
+    evaluator = Evaluator(config, client, config.rbfopt.var_names, tmp_path)
+
+    # violates the constraint
+    assert evaluator.estimate_cost(np.array([5., 6., 0.])) == 10
+    assert client.requests == 0
+
+    # reported as invalid by Go side, and then remembered
+    assert evaluator.estimate_cost(np.array([1., 2., 3.])) == 10
+    assert evaluator.estimate_cost(np.array([1., 2., 3.])) == 10
+    assert client.requests == 1
+
+    evaluator.register_report(-10, np.array([1., 2., 3.]), 3, 3, 0, 1, StopReason.limit)
+    evaluations, report = evaluator.dump()
+    assert report.rejections == 2
+    assert evaluations[names.InvalidParameterCombination].tolist() == [True, True, True]
+
+
+class TimeoutClient(FakeClient):
+    """
+    Evaluation of the given points times out on the first attempt
+    """
+
+    def __init__(self, timeouts):
+        super().__init__()
+        self.timeouts = set(timeouts)
+
+    def estimate_cost(self, parameter_values):
+        key = tuple(pv.value for pv in parameter_values)
+        if key not in self.timeouts:
+            return super().estimate_cost(parameter_values)
+
+        self.timeouts.remove(key)
+        self.requests += 1
+        return 10, True, True, Timing()
+
+
+def test_evaluator_timeouts(tmp_path):
+    """
+    Timed out point is penalized, but it's not remembered as invalid, neither within the session, nor after resume
+    """
+    config = make_config(tmp_path)
+    client = TimeoutClient([(5, 3, 1)])
+    evaluator = Evaluator(config, client, config.rbfopt.var_names, tmp_path)
+
+    assert evaluator.estimate_cost(np.array([5., 3., 1.])) == 10
+    assert evaluator.estimate_cost(np.array([5., 3., 1.])) == -16
+    assert client.requests == 2
+
+    # the session is interrupted right after timeout
+    client.timeouts.add((6, 3, 1))
+    assert evaluator.estimate_cost(np.array([6., 3., 1.])) == 10
+    assert evaluator.estimate_cost(np.array([1., 2., 3.])) == 10
+    evaluator.checkpoint()
+
+    config.evaluation_cache = False
+    config.resume = True
+    client = FakeClient()
+    evaluator = Evaluator(config, client, config.rbfopt.var_names, tmp_path)
+    evaluator.restore(4)
+
+    assert evaluator.estimate_cost(np.array([6., 3., 1.])) == -19
+    assert client.requests == 1
+    # the genuine invalid combination is still known
+    assert evaluator.estimate_cost(np.array([1., 2., 3.])) == 10
+    assert client.requests == 1
@@ -0,0 +1,74 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import pathlib
+
+from rbfoptgo import names
+from rbfoptgo.evaluation_log import read_evaluation_log
+from rbfoptgo.testing import FakeClient, make_config, run_session
+
+
+def evaluation_sequence(root_dir: pathlib.Path, seed: int) -> bytes:
+    """
+    Runs a few iterations of optimization
+    :return: evaluation sequence without timings
+    """
+    root_dir.mkdir()
+    config = make_config(root_dir)
+    config.rbfopt.seed = seed
+
+    session = run_session(config, iters=3)
+    assert session.alg.l_settings.rand_seed == seed
+    session.evaluator.checkpoint()
+
+    evaluations = read_evaluation_log(root_dir.joinpath("evaluations.csv"))
+    columns = [*config.rbfopt.var_names, names.Iteration, names.Cost, names.InvalidParameterCombination]
+    return evaluations[columns].to_csv(index=False).encode()
+
+
+def test_seed(tmp_path):
+    """
+    Sessions with the same seed must evaluate the same points in the same order
+    """
+    first = evaluation_sequence(tmp_path.joinpath("first"), seed=7)
+    assert first == evaluation_sequence(tmp_path.joinpath("second"), seed=7)
+    assert first != evaluation_sequence(tmp_path.joinpath("third"), seed=8)
+
+
+class OrderClient(FakeClient):
+    """
+    Records the order of fast and accurate evaluations
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def estimate_cost(self, parameter_values):
+        self.calls.append("accurate")
+        return super().estimate_cost(parameter_values)
+
+    def estimate_fast_cost(self, parameter_values):
+        self.calls.append("fast")
+        return super().estimate_fast_cost(parameter_values)
+
+    def estimate_cost_batch(self, batch):
+        self.calls.extend("accurate" for _ in batch)
+        yield from super().estimate_cost_batch(batch)
+
+
+def test_fast_initial_sample(tmp_path):
+    """
+    Initial sample is evaluated with the fast cost function before the accurate one
+    """
+    config = make_config(tmp_path)
+    config.rbfopt.fast_cost_function = True
+    config.rbfopt.fast_cost_function_error = 0.1
+    client = OrderClient()
+
+    # the model of noisy evaluations requires NLP solver, so the session is paused after the initialization
+    session = run_session(config, iters=0, client=client)
+    assert session.alg.noisy_evalcount > 0
+    assert client.calls == ["fast"] * session.alg.noisy_evalcount
+    assert session.alg.extra_evaluations == 0
@@ -4,8 +4,14 @@
 
 import glob
 import pathlib
+import pstats
 
+from rbfoptgo.config import Config
+from rbfoptgo.evaluation_log import read_evaluation_log
+from rbfoptgo.plot import Renderer
 from rbfoptgo.plot_debug import run
+from rbfoptgo.profiling import profile
+from rbfoptgo.report import Report
 
 
 def test_plot():
@@ -15,3 +21,53 @@ def test_plot():
     # Directory with evaluations left after Go tests
     debug_dir = glob.glob("/tmp/rbfopt*")[0]
     run(pathlib.Path(debug_dir))
+
+
+def test_plot_parallel(tmp_path):
+    """
+    Parallel rendering must produce the same set of figures as the sequential one
+    """
+    debug_dir = pathlib.Path(glob.glob("/tmp/rbfopt*")[0])
+    config = Config.from_file(debug_dir.joinpath("config.json"))
+    evaluations = read_evaluation_log(debug_dir.joinpath("evaluations.csv"))
+    report = Report.load_from_file(debug_dir.joinpath("report.json"))
+
+    figures = {}
+    for workers in (1, 2):
+        root_dir = tmp_path.joinpath(str(workers))
+        root_dir.mkdir()
+        config.root_dir = root_dir
+        Renderer(config=config, df=evaluations, report=report).render(workers=workers)
+        figures[workers] = sorted(path.name for path in root_dir.iterdir())
+
+    assert figures[1] == figures[2]
+    assert "polar.png" in figures[2]
+
+    # figures are saved by workers only, so their statistics must be merged
+    root_dir = tmp_path.joinpath("profiled")
+    root_dir.mkdir()
+    config.root_dir = root_dir
+    with profile(True, root_dir, "render") as profile_stats:
+        Renderer(config=config, df=evaluations, report=report).render(workers=2, profile_stats=profile_stats)
+    stats = pstats.Stats(str(root_dir.joinpath("render.prof")))
+    assert any(func[2] == "savefig" for func in stats.stats)
+
+
+def test_plot_interpolation_cache(tmp_path):
+    """
+    Heatmap grids must be interpolated once per pair of parameters and reused by the later renderers
+    """
+    debug_dir = pathlib.Path(glob.glob("/tmp/rbfopt*")[0])
+    config = Config.from_file(debug_dir.joinpath("config.json"))
+    config.root_dir = tmp_path
+    config.plot.interpolation_cache = True
+    evaluations = read_evaluation_log(debug_dir.joinpath("evaluations.csv"))
+    report = Report.load_from_file(debug_dir.joinpath("report.json"))
+
+    Renderer(config=config, df=evaluations, report=report).heatmaps()
+    cached = sorted(tmp_path.joinpath("interpolation_cache").iterdir())
+    n = len(config.rbfopt.parameters)
+    assert len(cached) == n * (n - 1) // 2
+
+    Renderer(config=config, df=evaluations, report=report).heatmaps()
+    assert sorted(tmp_path.joinpath("interpolation_cache").iterdir()) == cached
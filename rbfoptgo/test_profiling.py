@@ -0,0 +1,45 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import concurrent.futures
+import pstats
+
+from rbfoptgo.profiling import profile, profile_call
+
+
+def busy_function():
+    """
+    Gives profiler something to catch
+    """
+    return sum(i * i for i in range(10000))
+
+
+def test_profile(tmp_path):
+    """
+    Profiler must leave statistics in the root directory only if it's enabled
+    """
+    with profile(False, tmp_path, "disabled"):
+        busy_function()
+    assert not list(tmp_path.iterdir())
+
+    with profile(True, tmp_path, "enabled"):
+        busy_function()
+
+    stats = pstats.Stats(str(tmp_path.joinpath("enabled.prof")))
+    assert any(func[2] == "busy_function" for func in stats.stats)
+    assert "busy_function" in tmp_path.joinpath("enabled.txt").read_text()
+
+
+def test_profile_workers(tmp_path):
+    """
+    Statistics of the worker processes must be merged into the statistics of the phase
+    """
+    with profile(True, tmp_path, "workers") as profile_stats:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+            result, stats = executor.submit(profile_call, busy_function).result()
+            profile_stats.append(stats)
+
+    assert result == busy_function()
+    stats = pstats.Stats(str(tmp_path.joinpath("workers.prof")))
+    assert any(func[2] == "busy_function" for func in stats.stats)
@@ -0,0 +1,52 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+from rbfoptgo.config import Bound, Parameter, Scale
+from rbfoptgo.evaluation_log import read_evaluation_log
+from rbfoptgo.testing import make_config, run_session
+
+
+def test_parameter_scale():
+    """
+    Optimizer space is mapped back to parameter values within bounds
+    """
+    linear = Parameter.from_dict(dict(bound=dict(left=-5, right=5), name="x"))
+    assert linear.scale == Scale.linear
+    assert linear.encode(3) == 3
+    assert linear.decode(2.6) == 3
+
+    log = Parameter(Bound(1, 262144), "buffer_size", Scale.log)
+    assert log.var_type == 'R'
+    assert log.decode(log.encode(1)) == 1
+    assert log.decode(log.encode(262144)) == 262144
+    assert log.decode(log.encode(1000)) == 1000
+    # the middle of the range is the geometric mean of the bounds
+    assert log.decode((log.encode(1) + log.encode(262144)) / 2) == 512
+
+    power_of_two = Parameter.from_dict(dict(bound=dict(left=16, right=1024), name="queue_depth", scale="power_of_two"))
+    assert power_of_two.var_type == 'I'
+    assert (power_of_two.encode(16), power_of_two.encode(1024)) == (4, 10)
+    assert [power_of_two.decode(raw_value) for raw_value in (4, 6.8, 10, 11)] == [16, 128, 1024, 1024]
+
+
+def test_scaled_session(tmp_path):
+    """
+    Optimizer explores the values of the configured scale only
+    """
+    config = make_config(tmp_path)
+    config.rbfopt.parameters = [
+        Parameter(Bound(1, 1024), "x", Scale.power_of_two),
+        Parameter(Bound(1, 1000), "y", Scale.log),
+        Parameter(Bound(0, 10), "z"),
+    ]
+
+    user_black_box = config.rbfopt.user_black_box
+    assert user_black_box["var_upper"].tolist()[:2] == [10, Parameter(Bound(1, 1000), "y", Scale.log).encode(1000)]
+    assert user_black_box["var_type"].tolist() == ['I', 'R', 'I']
+
+    run_session(config, iters=2).evaluator.checkpoint()
+
+    evaluations = read_evaluation_log(tmp_path.joinpath("evaluations.csv"))
+    assert evaluations["x"].isin([2 ** k for k in range(11)]).all()
+    assert evaluations["y"].between(1, 1000).all()
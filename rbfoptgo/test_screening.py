@@ -0,0 +1,123 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import numpy as np
+import pytest
+
+from rbfoptgo.config import ScreeningConfig
+from rbfoptgo.evaluation_log import read_evaluation_log
+from rbfoptgo.evaluator import Evaluator
+from rbfoptgo.main import screen_parameters
+from rbfoptgo.screening import Screening, freeze, load_sensitivities
+from rbfoptgo.testing import FakeClient, make_config, run_session
+
+
+def test_rank(tmp_path):
+    """
+    Parameters are ranked by influence, and the insensitive ones are frozen at the best point
+    """
+    config = make_config(tmp_path)
+    config.rbfopt.screening = ScreeningConfig()
+    screening = Screening(config.rbfopt, seed=1)
+
+    points = screening.design()
+    assert points.shape == (screening.size, 3)
+    # every step of a trajectory changes a single parameter
+    for t in range(4):
+        steps = np.diff(points[t * 4:(t + 1) * 4], axis=0)
+        assert ((steps != 0).sum(axis=1) == 1).all()
+
+    # z doesn't affect cost, y is much less important than x
+    costs = -100 * points[:, 0] - points[:, 1]
+    sensitivities = screening.rank(points, costs)
+    assert [s.name for s in sensitivities] == ["x", "y", "z"]
+    assert sensitivities[0].mu_star == pytest.approx(1000)
+    assert [s.frozen for s in sensitivities] == [False, True, True]
+
+    best = points[np.argmin(costs)]
+    assert [s.value for s in sensitivities[1:]] == [best[1], best[2]]
+
+    user_black_box = freeze(config.rbfopt.user_black_box, sensitivities, config.rbfopt.parameters)
+    assert user_black_box["var_lower"].tolist() == [0, best[1], best[2]]
+    assert user_black_box["var_upper"].tolist() == [10, best[1], best[2]]
+
+    # nothing is known about parameters if every combination is invalid
+    costs = np.full(len(points), config.rbfopt.invalid_parameter_combination_cost)
+    assert not any(s.frozen or s.effects for s in screening.rank(points, costs))
+
+
+def test_screening_session(tmp_path):
+    """
+    Frozen parameters are not changed by optimizer after the screening, and the screening evaluations are reused
+    """
+    config = make_config(tmp_path)
+    config.rbfopt.screening = ScreeningConfig(threshold=0.5)
+    evaluator = Evaluator(config, FakeClient(), config.rbfopt.var_names, tmp_path)
+
+    sensitivities, design = screen_parameters(config, evaluator, tmp_path)
+    screening_evaluations = len(design[1])
+    assert screening_evaluations == 16
+    assert load_sensitivities(tmp_path.joinpath("screening.json")) == sensitivities
+    frozen = {s.name: s.value for s in sensitivities if s.frozen}
+    assert frozen
+
+    user_black_box = freeze(config.rbfopt.user_black_box, sensitivities, config.rbfopt.parameters)
+    alg = run_session(config, evaluator=evaluator, user_black_box=user_black_box, design=design).alg
+    # screening is included into the evaluations budget
+    assert alg.l_settings.max_evaluations + alg.extra_evaluations == config.rbfopt.max_evaluations
+    # and the valid points of the design become the nodes of the model
+    sample_size = alg.extra_evaluations - screening_evaluations
+    assert len(alg.init_node_val) > sample_size
+    assert set(alg.init_node_val[sample_size:]).issubset(design[1][design[1] != 10])
+
+    # global search steps only, local ones require MINLP solver
+    alg.optimize(pause_after_iters=2)
+    evaluator.checkpoint()
+
+    evaluations = read_evaluation_log(tmp_path.joinpath("evaluations.csv")).iloc[screening_evaluations:]
+    assert len(evaluations) == alg.evalcount + alg.extra_evaluations - screening_evaluations
+    for name, value in frozen.items():
+        assert (evaluations[name] == value).all()
+
+
+def test_screening_fast_session(tmp_path):
+    """
+    The screening evaluations become the nodes of the model when RBFOpt makes the initial sample itself
+    """
+    config = make_config(tmp_path)
+    config.rbfopt.screening = ScreeningConfig(threshold=0.5)
+    config.rbfopt.fast_cost_function = True
+    evaluator = Evaluator(config, FakeClient(), config.rbfopt.var_names, tmp_path)
+
+    sensitivities, design = screen_parameters(config, evaluator, tmp_path)
+    user_black_box = freeze(config.rbfopt.user_black_box, sensitivities, config.rbfopt.parameters)
+    alg = run_session(config, evaluator=evaluator, user_black_box=user_black_box, design=design).alg
+    assert alg.extra_evaluations == len(design[1])
+    assert len(alg.init_node_val) > 0
+    assert set(alg.init_node_val).issubset(design[1][design[1] != 10])
+
+
+def test_screening_resume(tmp_path):
+    """
+    Resumed session takes the screening results of the interrupted one without evaluations
+    """
+    config = make_config(tmp_path)
+    config.rbfopt.screening = ScreeningConfig(threshold=0.5)
+    evaluator = Evaluator(config, FakeClient(), config.rbfopt.var_names, tmp_path)
+    sensitivities, design = screen_parameters(config, evaluator, tmp_path)
+    evaluator.checkpoint()
+
+    # the session is interrupted before the first RBFOpt checkpoint
+    config.resume = True
+    client = FakeClient()
+    evaluator = Evaluator(config, client, config.rbfopt.var_names, tmp_path)
+    evaluator.restore(0)
+
+    resumed_sensitivities, resumed_design = screen_parameters(config, evaluator, tmp_path)
+    assert client.requests == 0
+    assert resumed_sensitivities == sensitivities
+    # the log is in the order of completion
+    order = np.lexsort(resumed_design[0].T)
+    assert resumed_design[0][order].tolist() == design[0][np.lexsort(design[0].T)].tolist()
+    assert resumed_design[1][order].tolist() == design[1][np.lexsort(design[0].T)].tolist()
@@ -0,0 +1,57 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import dataclasses
+import time
+
+from rbfoptgo.stopping import StoppingCriteria, StopReason
+from rbfoptgo.testing import make_config, run_session
+
+
+def test_stopping_criteria(tmp_path):
+    """
+    Every criterion must be met only when it's configured
+    """
+    config = make_config(tmp_path).rbfopt
+
+    criteria = StoppingCriteria(config)
+    for cost in (-1, -2, -3):
+        criteria.observe(cost, False)
+    assert criteria.reason() is None
+
+    criteria = StoppingCriteria(dataclasses.replace(config, target_cost=-2))
+    criteria.observe(10, True)
+    criteria.observe(-1, False)
+    assert criteria.reason() is None
+    criteria.observe(-2, False)
+    assert criteria.reason() == StopReason.target_cost
+
+    # improvements by less than 10% don't count
+    criteria = StoppingCriteria(dataclasses.replace(config, stagnation_evaluations=3, stagnation_tolerance=0.1))
+    for cost in (-100, -105, -109):
+        criteria.observe(cost, False)
+    assert criteria.reason() is None
+    criteria.observe(10, True)
+    assert criteria.reason() == StopReason.stagnation
+
+    criteria = StoppingCriteria(dataclasses.replace(config, time_limit=0.01))
+    assert criteria.reason() is None
+    time.sleep(0.02)
+    assert criteria.reason() == StopReason.time_limit
+    assert criteria.remaining_time() == 0
+
+
+def test_stop_optimization(tmp_path):
+    """
+    Algorithm must stop as soon as the criterion is met
+    """
+    config = make_config(tmp_path)
+    # every valid evaluation reaches the target, so the initial sample is enough
+    config.rbfopt.target_cost = 0.
+
+    alg = run_session(config).alg
+    alg.optimize()
+
+    assert alg.stop_reason == StopReason.target_cost
+    assert alg.evalcount == 0
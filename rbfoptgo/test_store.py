@@ -0,0 +1,39 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import numpy as np
+
+from rbfoptgo import names
+from rbfoptgo.common import Evaluation, Timing
+from rbfoptgo.store import EvaluationStore
+
+
+def test_evaluation_store():
+    """
+    Store must grow on demand and expose its arrays without copying
+    """
+    store = EvaluationStore(["x", "y"], capacity=2)
+    for i in range(1, 6):
+        store.append(Evaluation([i, -i], i, i * 0.5, i % 2 == 0, i == 5, Timing(cost_function=i)))
+
+    assert len(store) == 5
+    assert store.parameters.tolist() == [[1, -1], [2, -2], [3, -3], [4, -4], [5, -5]]
+    assert store.invalid_parameter_combinations.tolist() == [False, True, False, True, False]
+    assert store.timeouts.tolist() == [False, False, False, False, True]
+
+    df = store.to_frame()
+    assert df.columns.tolist() == ["x", "y", names.Iteration, names.Cost, *names.Timings,
+                                   names.InvalidParameterCombination, names.TimedOut]
+    assert np.shares_memory(df["y"].to_numpy(), store.parameters)
+    assert np.shares_memory(df[names.Iteration].to_numpy(), store.iterations)
+    assert np.shares_memory(df[names.Cost].to_numpy(), store.costs)
+    assert np.shares_memory(df[names.CostFunctionTime].to_numpy(), store.timings)
+    assert np.shares_memory(df[names.TimedOut].to_numpy(), store.timeouts)
+
+    other = EvaluationStore(["x", "y"], capacity=1)
+    other.extend(df)
+    other.append(Evaluation([6, -6], 6, 3., True, False, Timing()))
+    assert other.iterations.tolist() == [1, 2, 3, 4, 5, 6]
+    assert other.costs.tolist() == [0.5, 1., 1.5, 2., 2.5, 3.]
+    assert other.timings[:, names.Timings.index(names.CostFunctionTime)].tolist() == [1., 2., 3., 4., 5., 0.]
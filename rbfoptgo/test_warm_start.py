@@ -0,0 +1,113 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import dataclasses
+
+import numpy as np
+import rbfopt
+
+from rbfoptgo import names
+from rbfoptgo.config import Bound, Parameter
+from rbfoptgo.evaluation_log import read_evaluation_log
+from rbfoptgo.sampling import initial_sample
+from rbfoptgo.stopping import StopReason
+from rbfoptgo.testing import make_config, run_session
+from rbfoptgo.warm_start import prior_points, warm_start_sample
+
+
+def test_warm_start(tmp_path):
+    """
+    The best points of the previous session are evaluated first
+    """
+    # the previous session
+    prior_dir = tmp_path.joinpath("prior")
+    prior_dir.mkdir()
+    config = make_config(prior_dir)
+    config.evaluation_cache = False
+    session = run_session(config, iters=3)
+    evaluator = session.evaluator
+    cost, optimum, iterations, evaluations, fast_evaluations = session.result
+    evaluator.register_report(cost, optimum, iterations, evaluations, fast_evaluations, 1, StopReason.limit)
+    evaluator.dump()
+
+    prior = read_evaluation_log(prior_dir.joinpath("evaluations.csv"))
+    prior = prior[~prior[names.InvalidParameterCombination]].sort_values(names.Cost)
+
+    candidates, costs = prior_points([prior_dir, tmp_path.joinpath("missing")], config.rbfopt.parameters)
+    assert candidates[0].tolist() == [pv.value for pv in evaluator.dump()[1].optimum]
+    assert len(candidates) == len(costs) == len(prior) + 1
+    assert costs[0] == cost
+    assert costs[1:].tolist() == prior[names.Cost].tolist()
+
+    # the points out of the current bounds are dropped
+    narrow = [dataclasses.replace(p, bound=Bound(0, 5)) for p in config.rbfopt.parameters]
+    assert (prior_points([prior_dir], narrow)[0] <= 5).all()
+
+    # the session with other parameters is ignored
+    other = [Parameter(Bound(0, 10), name) for name in ("x", "y", "w")]
+    assert len(prior_points([prior_dir], other)[0]) == 0
+
+    # the new session
+    new_dir = tmp_path.joinpath("new")
+    new_dir.mkdir()
+    config = make_config(new_dir)
+    config.warm_start_root_dirs = [prior_dir]
+    run_session(config)
+
+    evaluations = read_evaluation_log(new_dir.joinpath("evaluations.csv")).sort_values(names.Iteration)
+    assert evaluations[config.rbfopt.var_names].to_numpy()[0].tolist() == candidates[0].tolist()
+    assert evaluations[names.Cost].min() == prior[names.Cost].min()
+
+    # the costs of the previous session are trusted, so its points are not evaluated again
+    reuse_dir = tmp_path.joinpath("reuse")
+    reuse_dir.mkdir()
+    config = make_config(reuse_dir)
+    config.warm_start_root_dirs, config.warm_start_reuse_costs = [prior_dir], True
+    session = run_session(config)
+    alg = session.alg
+
+    reused = len(alg.init_node_val) - alg.extra_evaluations
+    assert reused > 0
+    assert session.evaluator.checkpoint() == alg.extra_evaluations
+    assert alg.init_node_val[0] == cost
+    assert alg.l_settings.max_evaluations + alg.extra_evaluations == config.rbfopt.max_evaluations
+
+
+def test_warm_start_sample(tmp_path):
+    """
+    Initial sample stays linearly independent
+    """
+    config = make_config(tmp_path)
+    settings = rbfopt.RbfoptSettings(**config.rbfopt.settings)
+    bb = rbfopt.RbfoptUserBlackBox(obj_funct=lambda x: 0, **config.rbfopt.user_black_box)
+    sample = initial_sample(settings, bb)
+
+    # linearly dependent points are useless for the model
+    candidates = np.array([[1, 1, 1], [1, 1, 1], [2, 2, 2], [3, 3, 3], [1, 2, 3], [3, 2, 1]])
+    candidates = candidates, np.arange(len(candidates), dtype=float)
+    (nodes, points), costs = warm_start_sample(settings, bb, sample, candidates, max_share=1)
+    assert costs.tolist() == [0, 4]
+    assert points[:2].tolist() == [[1, 1, 1], [1, 2, 3]]
+    assert points[2].tolist() == sample[1][0].tolist()
+    assert np.array_equal(nodes, points)
+
+    # the best points don't replace the whole sample, so it still covers the space
+    (nodes, points), costs = warm_start_sample(settings, bb, sample, candidates)
+    assert costs.tolist() == [0]
+    assert points[1:].tolist() == sample[1][:2].tolist()
+
+    # the fixed parameters are replaced
+    bb = rbfopt.RbfoptUserBlackBox(
+        obj_funct=lambda x: 0,
+        dimension=3, var_lower=np.array([0., 0., 5.]), var_upper=np.array([10., 10., 5.]), var_type=np.array(['I'] * 3),
+    )
+    sample = initial_sample(settings, bb)
+    candidates = np.array([[1, 1, 1], [1, 2, 5], [3, 2, 1]]), np.array([0., 1., 2.])
+    (nodes, points), costs = warm_start_sample(settings, bb, sample, candidates, max_share=1)
+    assert len(costs) == len(points)
+    assert (points[:, 2] == 5).all()
+    assert nodes.shape == (len(points), 2)
+    # the points moved to the fixed value have never been evaluated, so their costs are unknown
+    assert np.isnan(costs[[0, 2]]).all()
+    assert costs[1] == 1
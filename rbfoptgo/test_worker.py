@@ -0,0 +1,43 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import io
+import json
+import os
+
+import rbfoptgo.main
+from rbfoptgo.worker import serve
+
+
+def test_worker(tmp_path, monkeypatch):
+    """
+    Worker must run sessions in isolation from each other and report their exit codes
+    """
+    def run(root_dir):
+        print(f"session {root_dir.name}")
+        # the session must be killable together with its children
+        assert os.getpgid(0) == os.getpid()
+        if root_dir.name == "failed":
+            raise ValueError("session failed")
+        # must not leak to the next session
+        rbfoptgo.main.leaked = True
+
+    monkeypatch.setattr(rbfoptgo.main, "run", run)
+
+    root_dirs = [tmp_path.joinpath(name) for name in ("first", "failed", "second")]
+    for root_dir in root_dirs:
+        root_dir.mkdir()
+
+    responses = io.StringIO()
+    serve(io.StringIO("".join(f"{root_dir}\n" for root_dir in root_dirs)), responses)
+
+    results = [json.loads(line) for line in responses.getvalue().splitlines()]
+    started, finished = results[::2], results[1::2]
+    assert [r["root_dir"] for r in started] == [str(root_dir) for root_dir in root_dirs]
+    assert all(r["pid"] > 0 for r in started)
+    assert finished == [{"root_dir": str(root_dir), "exit_code": code} for root_dir, code in zip(root_dirs, (0, 1, 0))]
+
+    assert not hasattr(rbfoptgo.main, "leaked")
+    assert root_dirs[0].joinpath("optimizer.log").read_text() == "session first\n"
+    assert "session failed" in root_dirs[1].joinpath("optimizer.log").read_text()
@@ -0,0 +1,134 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import rbfopt
+
+from rbfoptgo.checkpoint import CheckpointingAlgorithm
+from rbfoptgo.common import Timing
+from rbfoptgo.config import (Bound, Config, InvalidParameterCombinationRenderPolicy, Parameter, PlotConfig,
+                             RBFOptConfig, Transport)
+from rbfoptgo.evaluator import Evaluator
+from rbfoptgo.main import resume_session, start_session
+
+
+class FakeClient:
+    """
+    Replaces HTTP client with the simple cost function: -1 * (x*y + z), x < y is invalid
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.fast_requests = 0
+
+    @staticmethod
+    def __cost(parameter_values):
+        x, y, z = (pv.value for pv in parameter_values)
+        timing = Timing(transport=0.5, cost_function=1.)
+        if x < y:
+            return 10, True, False, timing
+        return -1 * (x * y + z), False, False, timing
+
+    def estimate_cost(self, parameter_values):
+        """
+        Evaluates single point
+        """
+        self.requests += 1
+        return self.__cost(parameter_values)
+
+    def estimate_fast_cost(self, parameter_values):
+        """
+        Evaluates single point approximately
+        """
+        self.fast_requests += 1
+        cost, invalid_parameter_combination, timed_out, timing = self.__cost(parameter_values)
+        return cost if invalid_parameter_combination else cost + 1, invalid_parameter_combination, timed_out, timing
+
+    def estimate_cost_batch(self, batch):
+        """
+        Evaluates several points
+        """
+        self.requests += 1
+        # emulate arbitrary order of completion
+        for i in reversed(range(len(batch))):
+            yield (i, *self.__cost(batch[i]))
+
+    def register_report(self, report):
+        """
+        Does nothing
+        """
+
+
+def make_config(root_dir) -> Config:
+    """
+    Makes configuration for three parameters from [0; 10]
+    """
+    parameters = [Parameter(Bound(0, 10), name) for name in ("x", "y", "z")]
+    policy = InvalidParameterCombinationRenderPolicy.omit
+    return Config(
+        root_dir=root_dir,
+        endpoint="localhost:8080",
+        rbfopt=RBFOptConfig(parameters, 25, 25, "lhd_maximin", 10, 1, 1),
+        plot=PlotConfig(policy, policy),
+        evaluation_cache=True,
+        transport=Transport.http,
+        checkpoint_interval=1,
+        resume=False,
+        log_sync_interval=0,
+        session_id="",
+        profile=False,
+    )
+
+
+@dataclass
+class Session:
+    """
+    Optimization session made by run_session
+    """
+    evaluator: Evaluator
+    alg: CheckpointingAlgorithm
+    result: Optional[Tuple] = None  # the result of CheckpointingAlgorithm.optimize
+
+
+def run_session(
+        config: Config,
+        iters: Optional[int] = None,
+        *,
+        client: Optional[FakeClient] = None,
+        evaluator: Optional[Evaluator] = None,
+        user_black_box: Optional[Dict] = None,
+        design: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> Session:
+    """
+    Starts the session (or resumes it, if configured) in config.root_dir
+    :param config: configuration
+    :param iters: number of iterations to optimize; if None, the session is only started
+    :param client: client for the new evaluator
+    :param evaluator: evaluator to use instead of the new one (e.g. the one used for screening)
+    :param user_black_box: the area of the function scope, if it differs from the configured one
+    :param design: points and costs evaluated by screening
+    :return: session
+    """
+    if evaluator is None:
+        evaluator = Evaluator(config, client or FakeClient(), config.rbfopt.var_names, config.root_dir)
+
+    state_file = config.root_dir.joinpath("rbfopt_state.dat")
+    user_black_box = user_black_box or config.rbfopt.user_black_box
+    obj_funct_noisy = evaluator.estimate_fast_cost if config.rbfopt.fast_cost_function else None
+    bb = rbfopt.RbfoptUserBlackBox(obj_funct=evaluator.estimate_cost, obj_funct_noisy=obj_funct_noisy,
+                                   **user_black_box)
+    if config.resume:
+        alg = resume_session(config, evaluator, bb, state_file)
+    else:
+        alg = start_session(config, evaluator, bb, state_file, design)
+
+    session = Session(evaluator, alg)
+    if iters is not None:
+        # global search steps only, local ones require MINLP solver
+        session.result = alg.optimize(pause_after_iters=iters)
+
+    return session
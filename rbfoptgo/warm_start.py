@@ -0,0 +1,124 @@
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import pathlib
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+import rbfopt
+
+from rbfoptgo import names
+from rbfoptgo.config import Parameter
+from rbfoptgo.evaluation_log import read_evaluation_log
+from rbfoptgo.report import Report
+
+
+def prior_points(root_dirs: List[pathlib.Path], parameters: List[Parameter]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Collects the points explored by the previous sessions: their optima go first, then all the valid
+    evaluations from the best one. The sessions optimizing other parameters are skipped.
+    :param root_dirs: directories with the artifacts of the previous sessions
+    :param parameters: parameters of the current session
+    :return: matrix with points in the optimizer space (see Parameter.scale) in rows, and their costs
+    """
+    parameter_names = [p.name for p in parameters]
+    optima, costs, evaluations = [], [], []
+
+    for root_dir in root_dirs:
+        file_path = root_dir.joinpath("evaluations.csv")
+        if not file_path.exists():
+            print(f"warm start: {file_path} does not exist, skipping it")
+            continue
+
+        df = read_evaluation_log(file_path)
+        if not set(parameter_names).issubset(df.columns):
+            print(f"warm start: {root_dir} belongs to the session with different parameters, skipping it")
+            continue
+
+        evaluations.append(df.loc[~df[names.InvalidParameterCombination], parameter_names + [names.Cost]])
+
+        # the report is missing if the session was interrupted
+        report_path = root_dir.joinpath("report.json")
+        if report_path.exists():
+            report = Report.load_from_file(report_path)
+            optima.append([report.optimum_argument(name) for name in parameter_names])
+            costs.append(report.cost)
+
+    if evaluations:
+        df = pd.concat(evaluations).sort_values(names.Cost, kind="stable")
+        optima.extend(df[parameter_names].to_numpy().tolist())
+        costs.extend(df[names.Cost].tolist())
+
+    # the points that don't exist in the current space (e.g. out of bounds) are dropped
+    kept = [i for i, values in enumerate(optima) if exists(parameters, values)]
+    points = [[p.encode(v) for p, v in zip(parameters, optima[i])] for i in kept]
+    return np.array(points).reshape(-1, len(parameters)), np.array([costs[i] for i in kept], dtype=float)
+
+
+def exists(parameters: List[Parameter], values: List[int]) -> bool:
+    """
+    Checks if optimizer is able to propose the point
+    :param parameters: parameters of the current session
+    :param values: parameter values
+    :return: True if all the values are within bounds, and match the scales of parameters
+    """
+    return all(p.bound.left <= v <= p.bound.right and p.decode(p.encode(v)) == v for p, v in zip(parameters, values))
+
+
+def warm_start_sample(
+        settings: rbfopt.RbfoptSettings,
+        black_box: rbfopt.RbfoptBlackBox,
+        sample: Tuple[np.ndarray, np.ndarray],
+        candidates: Tuple[np.ndarray, np.ndarray],
+        max_share: float = 0.5,
+) -> Tuple[Tuple[np.ndarray, np.ndarray], np.ndarray]:
+    """
+    Replaces the points of initial sample with the best points of the previous sessions. RBFOpt needs
+    linearly independent points to build the model, so the candidates that would break it are skipped,
+    and the rest of the sample is taken from the original one. The best points are usually clustered,
+    so they replace a part of the sample only, and the rest of it keeps covering the whole space.
+    :param settings: RBFOpt settings
+    :param black_box: black box to optimize
+    :param sample: initial sample made by initial_sample
+    :param candidates: points and their costs made by prior_points
+    :param max_share: the maximal share of the sample taken from the previous sessions
+    :return: initial sample in the same format, and the costs of the points taken from the previous sessions
+             (these points go first); the cost is NaN if the point has been moved to the fixed parameters values,
+             since it has never been evaluated then
+    """
+    _, points = sample
+    candidates, candidate_costs = candidates
+    var_lower, var_upper = black_box.get_var_lower(), black_box.get_var_upper()
+    free = ~np.isclose(var_lower, var_upper, 0, settings.eps_zero)
+
+    # the previous sessions may have explored the parameters that are fixed now
+    moved = ~np.isclose(candidates[:, ~free], var_lower[~free], 0, settings.eps_zero).all(axis=1)
+    candidates = candidates.copy()
+    candidates[:, ~free] = var_lower[~free]
+    candidate_costs = np.where(moved, np.nan, candidate_costs)
+
+    chosen, chosen_costs = [], []
+    max_candidates = int(len(points) * max_share)
+    for i, point in enumerate(np.concatenate((candidates, points))):
+        if len(chosen) == len(points):
+            break
+        if i < len(candidates) and len(chosen_costs) == max_candidates:
+            continue
+
+        # the same check as RBFOpt performs for its own sample
+        matrix = np.array(chosen + [point])[:, free]
+        matrix = matrix[np.linalg.norm(matrix, axis=1) > settings.eps_zero]
+        independent = np.linalg.matrix_rank(matrix, tol=settings.eps_linear_dependence) == min(len(matrix), free.sum())
+        if independent and not any(np.array_equal(point, c) for c in chosen):
+            chosen.append(point)
+            if i < len(candidates):
+                chosen_costs.append(candidate_costs[i])
+
+    # it's hardly possible, but the original sample is better than the degenerate one
+    if len(chosen) < len(points):
+        return sample, np.empty(0)
+
+    points = np.array(chosen)
+    return (points[:, free], points), np.array(chosen_costs, dtype=float)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+#  Copyright (c) New Cloud Technologies, Ltd. 2013-2022.
+#  Author: Vitaly Isaev <vitaly.isaev@myoffice.team>
+#  License: https://github.com/newcloudtechnologies/rbfopt-go/blob/master/LICENSE
+
+import io
+import json
+import multiprocessing
+import os
+import pathlib
+import sys
+from typing import Dict, Sequence, TextIO
+
+# loading these modules is the most expensive part of optimizer startup,
+# sessions forked from the worker get them for free
+import rbfoptgo.main
+import rbfoptgo.plot  # pylint: disable=unused-import
+
+
+def run_session(root_dir: pathlib.Path, inherited_fds: Sequence[int] = ()):
+    """
+    Runs optimization session with output redirected to the file in the root directory
+    :param root_dir: directory with configuration, and for artifacts
+    :param inherited_fds: descriptors of the worker that the session must not hold
+    :return:
+    """
+    # the session leads its own process group, so Go side is able to kill it with all its children
+    os.setsid()
+
+    # otherwise the worker output wouldn't be closed until the orphaned session exits
+    for fd in inherited_fds:
+        os.close(fd)
+
+    with open(root_dir.joinpath("optimizer.log"), "w") as log:
+        os.dup2(log.fileno(), sys.stdout.fileno())
+        os.dup2(log.fileno(), sys.stderr.fileno())
+        rbfoptgo.main.run(root_dir)
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+def serve(requests: TextIO, responses: TextIO):
+    """
+    Reads root directories of the sessions from requests (one per line), runs them one by one
+    and writes JSON responses: the pid of the session when it's started (it's also the id of its process group,
+    so the session may be cancelled by killing the group), and its exit code when it's finished.
+    Every session runs in the forked process, so it can't affect neither the worker, nor the later sessions.
+    :param requests: input stream
+    :param responses: output stream
+    :return:
+    """
+    context = multiprocessing.get_context("fork")
+
+    try:
+        inherited_fds = (responses.fileno(),)
+    except io.UnsupportedOperation:
+        inherited_fds = ()
+
+    for line in requests:
+        root_dir = line.strip()
+        if not root_dir:
+            continue
+
+        process = context.Process(target=run_session, args=(pathlib.Path(root_dir), inherited_fds))
+        process.start()
+        respond(responses, {"root_dir": root_dir, "pid": process.pid})
+
+        process.join()
+        respond(responses, {"root_dir": root_dir, "exit_code": process.exitcode})
+
+
+def respond(responses: TextIO, response: Dict):
+    """
+    Writes a response line
+    :param responses: output stream
+    :param response: JSON-serializable response
+    :return:
+    """
+    responses.write(json.dumps(response) + "\n")
+    responses.flush()
+
+
+def main():
+    """
+    An entrypoint to long-lived optimizer worker; it exits when its input is closed
+    :return:
+    """
+    # the rest of the output belongs to the sessions
+    responses = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    serve(sys.stdin, responses)
+
+
+if __name__ == "__main__":
+    main()
@@ -48,6 +48,7 @@ setup(name='rbfopt-go',
       entry_points={
           'console_scripts': [
               'rbfopt-go-wrapper = rbfoptgo.main:main',
+              'rbfopt-go-worker = rbfoptgo.worker:main',
           ]
       },
       zip_safe=False,